@@ -0,0 +1,222 @@
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Tuple
+
+from .config import settings
+
+
+class Shed(Exception):
+    """The request was not admitted; respond 503 with Retry-After."""
+
+    def __init__(self, reason: str, retry_after_s: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class AdmissionController:
+    """
+    Per-worker admission control for expensive endpoints.
+
+    At most `max_in_flight` requests run at once; up to `max_queue` more wait in FIFO
+    order for at most `queue_timeout_s`. Anything beyond that is shed immediately, so
+    under overload a few requests fail fast instead of all of them timing out.
+    Runs on the worker's event loop; no locking needed.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue: int, queue_timeout_s: float):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout_s = queue_timeout_s
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.max_queue_depth = 0
+        self._service_ewma_s = 10.0
+        self._recent_waits: Deque[float] = deque(maxlen=512)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        # time for the queue ahead to drain at the current service rate
+        backlog = (self.queue_depth + 1) / self.max_in_flight
+        return max(1, math.ceil(self._service_ewma_s * backlog))
+
+    async def acquire(self) -> float:
+        """
+        Wait for a slot. Returns the time spent queued; raises Shed.
+        """
+        start = time.monotonic()
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self._admit(0.0)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            raise Shed("queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout_s)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as the deadline hit: give it back
+                self.release(0.0)
+            else:
+                waiter.cancel()
+            self._discard(waiter)
+            self.shed_timeout += 1
+            raise Shed("queue_timeout", self.retry_after())
+        except BaseException:
+            # client went away while queued
+            if waiter.done() and not waiter.cancelled():
+                self.release(0.0)
+            else:
+                waiter.cancel()
+            self._discard(waiter)
+            raise
+        waited = time.monotonic() - start
+        self._recent_waits.append(waited)
+        return waited
+
+    def _admit(self, waited: float) -> None:
+        self.in_flight += 1
+        self.admitted += 1
+        self._recent_waits.append(waited)
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def release(self, service_s: Optional[float] = None) -> None:
+        if service_s:
+            self._service_ewma_s = 0.8 * self._service_ewma_s + 0.2 * service_s
+        self.in_flight -= 1
+        # hand the slot straight to the oldest live waiter
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                self.admitted += 1
+                waiter.set_result(None)
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        waits = sorted(self._recent_waits)
+        p95 = waits[min(len(waits) - 1, int(0.95 * (len(waits) - 1)))] if waits else 0.0
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout_s,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "queue_wait_ms_p95": round(1000 * p95, 3),
+            "service_time_ewma_s": round(self._service_ewma_s, 3),
+        }
+
+
+class AdmissionSlot:
+    """
+    One admitted request's slot, freed when its last holder releases it. The
+    middleware holds it for the request; work that outlives the request (a shielded
+    analysis) takes its own hold so the in-flight cap still counts it.
+    """
+
+    def __init__(self, controller: AdmissionController):
+        self.controller = controller
+        self.started = time.monotonic()
+        self.holders = 1
+
+    def hold(self) -> None:
+        self.holders += 1
+
+    def release(self) -> None:
+        self.holders -= 1
+        if self.holders == 0:
+            self.controller.release(time.monotonic() - self.started)
+
+
+# scope key under which AdmissionMiddleware exposes the request's AdmissionSlot
+SLOT_SCOPE_KEY = "admission_slot"
+
+
+analyze_admission = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout_s=settings.ADMISSION_QUEUE_TIMEOUT_S,
+)
+
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI middleware gating selected (method, path) routes through an
+    AdmissionController before the request body is read. Other routes (health
+    checks, GET /analysis/{id}) are never queued behind analyses. The admitted
+    request's AdmissionSlot is in scope[SLOT_SCOPE_KEY].
+    """
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        routes: Iterable[Tuple[str, str]],
+        enabled: bool = True,
+    ):
+        self.app = app
+        self.controller = controller
+        self.routes = set(routes)
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if (
+            not self.enabled
+            or scope["type"] != "http"
+            or (scope["method"], scope["path"]) not in self.routes
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire()
+        except Shed as e:
+            await self._reject(send, e)
+            return
+
+        slot = scope[SLOT_SCOPE_KEY] = AdmissionSlot(self.controller)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            slot.release()
+
+    @staticmethod
+    async def _reject(send, shed: Shed) -> None:
+        body = json.dumps(
+            {"detail": "Server is busy, please retry later", "reason": shed.reason}
+        ).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(shed.retry_after_s).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -14,6 +14,152 @@ class Settings(BaseSettings):
     LLM_PROVIDER: str = "gemini"
     GOOGLE_API_KEY: str | None = None
     GEMINI_MODEL: str = "gemini-2.5-flash"
+    OPENAI_API_KEY: str | None = None
+    OPENAI_MODEL: str = "gpt-4o-mini"
+    ANTHROPIC_API_KEY: str | None = None
+    ANTHROPIC_MODEL: str = "claude-3-5-haiku-latest"
+
+    # Latency-aware routing across providers, e.g. LLM_PROVIDERS='["gemini", "openai"]'
+    # (empty = LLM_PROVIDER only). Calls go to the provider with the lowest latency EWMA
+    # (scaled by its error-rate EWMA); optional hedging duplicates a call to the
+    # runner-up once it runs past the primary's p95 latency.
+    LLM_PROVIDERS: list[str] = []
+    LLM_ROUTING_EWMA_ALPHA: float = 0.2
+    LLM_ROUTING_MIN_SAMPLES: int = 3  # providers with fewer samples are tried first
+    LLM_ROUTING_MAX_ERROR_RATE: float = 0.5  # unhealthy above this error-rate EWMA
+    LLM_HEDGE_ENABLED: bool = False
+    # at most this many hedged duplicates per routed call
+    LLM_HEDGE_BUDGET: float = 0.05
+    LLM_HEDGE_MIN_DELAY_S: float = 1.0
+
+    # PDF parsing: "fast" = PDFium text layer (+ pdfplumber for empty pages), "layout" = pdfplumber
+    PDF_EXTRACT_MODE: str = "fast"
+    PDF_PARALLEL_MIN_PAGES: int = 16  # split into page ranges from this many pages on
+    PDF_PAGES_PER_TASK: int = 8
+    PDF_WORKERS: int = 0  # 0 = min(4, CPU cores)
+
+    # Skill extraction: optional fuzzy (char n-gram) matching on top of exact matching
+    SKILL_FUZZY_ENABLED: bool = False
+    SKILL_FUZZY_THRESHOLD: float = 0.75
+    # n-grams are packed 8 bits per char into int64 codes alongside the row id
+    SKILL_FUZZY_NGRAM: int = Field(3, ge=1, le=5)
+
+    # Reuse roadmap/projects of a near-identical prior run (MinHash/LSH over skill sets)
+    RUN_REUSE_ENABLED: bool = False
+    RUN_REUSE_JACCARD_THRESHOLD: float = 0.85
+    RUN_REUSE_NUM_PERM: int = 64
+    RUN_REUSE_BANDS: int = 16
+
+    # Recruiter mode (POST /recruiter/rank): in-memory candidate x skill matrix
+    RECRUITER_INDEX_ENABLED: bool = True  # load it at startup and index new runs
+    RECRUITER_JD_CACHE_SIZE: int = 256  # job descriptions whose skills are cached
+
+    # Next-skill suggestions (GET /mentor/next-skills, fallback roadmap) from a sparse
+    # skill x skill co-occurrence matrix over persisted runs
+    SKILL_COOCCURRENCE_ENABLED: bool = True
+    SKILL_COOCCURRENCE_ROLE_WEIGHT: float = 0.5  # role frequency vs. co-occurrence
+    # suggest skills seen in at least this many runs
+    SKILL_COOCCURRENCE_MIN_RUNS: int = 3
+    # catch up on other workers' runs this often
+    SKILL_COOCCURRENCE_SYNC_S: float = 30.0
+
+    # In-process cache of serialized GET /analysis/{run_id} responses
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 1024
+    ANALYSIS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # analysis_runs partitioning (Postgres) and retention
+    ANALYSIS_PARTITION_MONTHS_AHEAD: int = 3
+    ANALYSIS_RETENTION_MONTHS: int = 12
+    ANALYSIS_RETENTION_MODE: str = "archive"  # archive | export
+    ANALYSIS_EXPORT_DIR: str = "exports"
+
+    # Admission control for POST /mentor/analyze (per worker)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_IN_FLIGHT: int = 8
+    ADMISSION_MAX_QUEUE: int = 16
+    ADMISSION_QUEUE_TIMEOUT_S: float = 5.0
+
+    # Idempotency-Key handling for POST /mentor/analyze
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_TIMEOUT_S: float = 120.0  # duplicates wait this long for the first
+    IDEMPOTENCY_POLL_INTERVAL_S: float = 0.5
+    # in-progress keys older than this are taken over
+    IDEMPOTENCY_STALE_AFTER_S: float = 600.0
+
+    # Startup warm-up; GET /ready returns 200 once it has finished
+    WARMUP_ENABLED: bool = True
+    # opened at once to fill the pool (capped at its size)
+    WARMUP_DB_CONNECTIONS: int = 5
+    WARMUP_LLM_PRIME: bool = False  # send a tiny prompt to each provider (costs tokens)
+    # retry interval while the DB or data files are not usable
+    WARMUP_RETRY_S: float = 5.0
+
+    # Per-request tracing: one JSON line per pipeline span, see app/core/tracing.py
+    TRACING_ENABLED: bool = True
+    TRACE_FILE: str = "/tmp/careergenai-traces.jsonl"  # "-" = stdout
+    TRACE_FILE_MAX_MB: float = 100.0  # then rotated to <TRACE_FILE>.1 (0 = never)
+
+    # Opt-in cProfile of single requests, kept in a ring of files under PROFILING_DIR.
+    # A request is profiled when it carries X-Profile: <ADMIN_TOKEN>, or at random
+    # (PROFILING_SAMPLE_RATE) for POST /mentor/analyze. Listed at GET /admin/profiles.
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "/tmp/careergenai-profiles"
+    PROFILING_MAX_FILES: int = 100
+
+    # Token for /admin and /export (X-Admin-Token header); empty = both are off
+    ADMIN_TOKEN: str = ""
+
+    # Pre-forking server (python -m app.server)
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 0  # 0 = one per CPU core
+    # recycle a worker after this many requests (0 = never)
+    SERVER_MAX_REQUESTS: int = 5000
+    SERVER_MAX_REQUESTS_JITTER: int = 500
+    SERVER_MAX_WORKER_MB: float = 1024.0  # recycle above this private memory (0 = off)
+    SERVER_GRACEFUL_TIMEOUT_S: float = 30.0
+    SERVER_LOG_LEVEL: str = "info"
+
+    # Ask for roadmap + projects in one structured LLM call instead of two
+    LLM_COMBINED_GENERATION: bool = False
+    # Request bare JSON through the provider's JSON mode where it has one
+    LLM_JSON_MODE: bool = True
+
+    # Prompt building: token budget for the candidate-data part of each prompt
+    PROMPT_CONTEXT_TOKEN_BUDGET: int = 1200
+    PROMPT_MAX_LIST_ITEMS: int = 60
+    PROMPT_MIN_LIST_ITEMS: int = 5
+
+    # LLM call resilience (deadlines, retries, circuit breaker)
+    LLM_TIMEOUT_S: float = 20.0  # per attempt
+    LLM_TOTAL_DEADLINE_S: float = 45.0  # across all attempts of one call
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BACKOFF_S: float = 0.5
+    LLM_RETRY_BACKOFF_MAX_S: float = 4.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_S: float = 30.0
+    LLM_EXECUTOR_WORKERS: int = 32
+
+    # Client-side LLM rate limiting (token buckets + AIMD concurrency)
+    LLM_RATE_LIMITS: dict[str, dict[str, float]] = {}  # per-provider rpm/tpm overrides
+    LLM_LIMITER_POLICY: str = "queue"  # queue | degrade
+    LLM_LIMITER_MAX_WAIT_S: float = 2.0
+    LLM_EXPECTED_OUTPUT_TOKENS: int = 800
+    LLM_CONCURRENCY_INITIAL: int = 4
+    LLM_AIMD_LATENCY_TARGET_S: float = 15.0
+    LLM_AIMD_DECREASE: float = 0.5
+    LLM_AIMD_DECREASE_COOLDOWN_S: float = 1.0
+
+    # Local stub provider (LLM_PROVIDER=stub) for offline load tests
+    STUB_LLM_LATENCY_MS: float = 800.0
+    STUB_LLM_LATENCY_DIST: str = "lognormal"  # fixed | uniform | lognormal
+    STUB_LLM_LATENCY_SIGMA: float = 0.5
+    STUB_LLM_TTFT_MS: float = 150.0
+    STUB_LLM_OUTPUT_TOKENS: int = 400
+    STUB_LLM_ERROR_RATE: float = 0.0
+    STUB_LLM_STREAM_CHUNK_TOKENS: int = 20
+    STUB_LLM_SEED: int | None = None
 
     class Config:
         # We read from ENV only; docker-compose sets env vars.
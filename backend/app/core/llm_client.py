@@ -1,11 +1,61 @@
+import threading
+from typing import Any, Dict, Tuple
+
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
 from .config import settings
+from .stub_llm import build_stub_llm
+
+# Built clients per (provider, configuration); each keeps its HTTP connection pool,
+# so calls reuse open TLS connections instead of handshaking every time.
+_clients: Dict[Tuple[Any, ...], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def json_mode_options(provider: str, shape: str) -> dict:
+    """
+    Per-call invoke() options that make the provider return bare JSON of the given
+    shape ("object" or "array"). OpenAI's JSON mode only produces objects and
+    Anthropic has no JSON mode; their output is parsed as returned.
+    """
+    if provider == "openai" and shape == "object":
+        return {"response_format": {"type": "json_object"}}
+    if provider == "gemini":
+        return {"generation_config": {"response_mime_type": "application/json"}}
+    return {}
+
+
+def _client_key(provider: str) -> Tuple[Any, ...]:
+    if provider == "openai":
+        config = (settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+    elif provider == "anthropic":
+        config = (settings.ANTHROPIC_API_KEY, settings.ANTHROPIC_MODEL)
+    elif provider == "gemini":
+        config = (settings.GOOGLE_API_KEY, settings.GEMINI_MODEL)
+    else:
+        config = ()
+    return (provider, settings.LLM_TIMEOUT_S, *config)
+
+
+def get_llm(provider: str | None = None):
+    """
+    Chat client for `provider` (default LLM_PROVIDER), cached per configuration.
+    """
+    provider = (provider or settings.LLM_PROVIDER).lower().strip()
+    if provider == "stub":
+        # Offline provider for load tests; see STUB_LLM_* settings
+        return build_stub_llm()
+
+    key = _client_key(provider)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = _build_client(provider)
+        return client
 
-def get_llm():
-    provider = settings.LLM_PROVIDER.lower().strip()
 
+def _build_client(provider: str):
     if provider == "openai":
         if not settings.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY is not set")
@@ -13,6 +63,9 @@ def get_llm():
             api_key=settings.OPENAI_API_KEY,
             model=settings.OPENAI_MODEL,
             temperature=0.2,
+            # deadlines and retries are owned by llm_resilience.invoke_llm
+            request_timeout=settings.LLM_TIMEOUT_S,
+            max_retries=0,
         )
 
     if provider == "anthropic":
@@ -22,6 +75,8 @@ def get_llm():
             api_key=settings.ANTHROPIC_API_KEY,
             model=settings.ANTHROPIC_MODEL,
             temperature=0.2,
+            default_request_timeout=settings.LLM_TIMEOUT_S,
+            max_retries=0,
         )
 
     if provider == "gemini":
@@ -33,6 +88,8 @@ def get_llm():
             google_api_key=settings.GOOGLE_API_KEY,
             model=settings.GEMINI_MODEL,
             temperature=0.2,
+            timeout=settings.LLM_TIMEOUT_S,
+            max_retries=0,
         )
 
-    raise ValueError(f"Unsupported LLM_PROVIDER: {settings.LLM_PROVIDER}")
+    raise ValueError(f"Unsupported LLM provider: {provider}")
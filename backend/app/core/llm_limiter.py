@@ -0,0 +1,273 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from .config import settings
+
+# Conservative per-provider defaults; override with LLM_RATE_LIMITS, e.g.
+# LLM_RATE_LIMITS='{"gemini": {"rpm": 15, "tpm": 250000, "max_concurrency": 4}}'
+# rpm/tpm of 0 disable that bucket.
+DEFAULT_LIMITS: Dict[str, Dict[str, float]] = {
+    "gemini": {"rpm": 60, "tpm": 1_000_000, "max_concurrency": 8},
+    "openai": {"rpm": 500, "tpm": 200_000, "max_concurrency": 16},
+    "anthropic": {"rpm": 50, "tpm": 40_000, "max_concurrency": 8},
+    "stub": {"rpm": 0, "tpm": 0, "max_concurrency": 64},
+}
+
+# Chars-per-token heuristic used to pre-charge the TPM bucket before a call.
+CHARS_PER_TOKEN = 4
+
+
+class RateLimitedError(RuntimeError):
+    """No LLM capacity within the allowed wait; the caller should degrade."""
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` tokens per second,
+    holding at most one minute of budget. Not thread-safe; guarded by the limiter lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.enabled:
+            self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        # correct a pre-charge once actual usage is known (may go negative = debt)
+        if self.enabled:
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+    def drain(self) -> None:
+        if self.enabled:
+            self.tokens = min(self.tokens, 0.0)
+
+
+class Permit:
+    def __init__(self, limiter: "ProviderLimiter", tokens: int, wait_s: float):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.wait_s = wait_s
+        self.started = time.monotonic()
+        self._released = False
+
+    def release(
+        self, throttled: bool = False, actual_tokens: Optional[int] = None
+    ) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.limiter._release(
+            self, time.monotonic() - self.started, throttled, actual_tokens
+        )
+
+
+class ProviderLimiter:
+    """
+    Shared client-side limiter for one LLM provider.
+
+    - RPM and TPM token buckets keep us under the provider's published quotas.
+    - The concurrency limit follows AIMD: +1/limit per fast success, multiplied by
+      LLM_AIMD_DECREASE on a 429 or when latency exceeds LLM_AIMD_LATENCY_TARGET_S.
+    - Callers queue for at most LLM_LIMITER_MAX_WAIT_S ("queue" policy) or fail
+      immediately ("degrade" policy) with RateLimitedError.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: float,
+        tpm: float,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+    ):
+        self.name = name
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.min_concurrency = max(min_concurrency, 1)
+        self.max_concurrency = max(max_concurrency, self.min_concurrency)
+        self.limit = float(
+            min(self.max_concurrency, max(settings.LLM_CONCURRENCY_INITIAL, 1))
+        )
+        self.in_flight = 0
+        self.queued = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+        self.granted = 0
+        self.rejected = 0
+        self.throttled = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self._recent_waits: deque = deque(maxlen=512)
+
+    def acquire(self, est_tokens: int, max_wait_s: Optional[float] = None) -> Permit:
+        if max_wait_s is None:
+            max_wait_s = settings.LLM_LIMITER_MAX_WAIT_S
+        if settings.LLM_LIMITER_POLICY == "degrade":
+            max_wait_s = 0.0
+        start = time.monotonic()
+        deadline = start + max_wait_s
+
+        with self._cond:
+            self.queued += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(
+                        self.rpm.wait_time(1, now), self.tpm.wait_time(est_tokens, now)
+                    )
+                    if self.in_flight < int(self.limit) and wait == 0.0:
+                        self.rpm.take(1)
+                        self.tpm.take(est_tokens)
+                        self.in_flight += 1
+                        waited = now - start
+                        self.granted += 1
+                        self.total_wait_s += waited
+                        self.max_wait_s = max(self.max_wait_s, waited)
+                        self._recent_waits.append(waited)
+                        return Permit(self, est_tokens, waited)
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise RateLimitedError(
+                            f"No LLM capacity for provider '{self.name}' within {max_wait_s:.2f}s"
+                        )
+                    # bucket refill is time-driven; concurrency frees up via notify
+                    self._cond.wait(
+                        timeout=min(remaining, wait) if wait > 0 else remaining
+                    )
+            finally:
+                self.queued -= 1
+
+    def _release(
+        self,
+        permit: Permit,
+        latency_s: float,
+        throttled: bool,
+        actual_tokens: Optional[int],
+    ) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                self.tpm.adjust(actual_tokens - permit.tokens)
+
+            now = time.monotonic()
+            congested = throttled or latency_s > settings.LLM_AIMD_LATENCY_TARGET_S
+            if throttled:
+                self.throttled += 1
+                # the provider is already over quota: stop new calls until refill
+                self.rpm.drain()
+            if congested:
+                # at most one multiplicative decrease per congestion window
+                if now - self._last_decrease >= settings.LLM_AIMD_DECREASE_COOLDOWN_S:
+                    self.limit = max(
+                        float(self.min_concurrency),
+                        self.limit * settings.LLM_AIMD_DECREASE,
+                    )
+                    self._last_decrease = now
+            else:
+                self.limit = min(
+                    float(self.max_concurrency), self.limit + 1.0 / self.limit
+                )
+            self._cond.notify_all()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            waits = sorted(self._recent_waits)
+            p95 = (
+                waits[min(len(waits) - 1, int(0.95 * (len(waits) - 1)))]
+                if waits
+                else 0.0
+            )
+            now = time.monotonic()
+            for bucket in (self.rpm, self.tpm):
+                if bucket.enabled:
+                    bucket._refill(now)
+            return {
+                "provider": self.name,
+                "concurrency_limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "queued": self.queued,
+                "rpm_available": (
+                    round(self.rpm.tokens, 1) if self.rpm.enabled else None
+                ),
+                "tpm_available": round(self.tpm.tokens) if self.tpm.enabled else None,
+                "granted": self.granted,
+                "rejected": self.rejected,
+                "throttled": self.throttled,
+                "queue_wait_ms": {
+                    "mean": (
+                        round(1000 * self.total_wait_s / self.granted, 3)
+                        if self.granted
+                        else 0.0
+                    ),
+                    "p95": round(1000 * p95, 3),
+                    "max": round(1000 * self.max_wait_s, 3),
+                },
+            }
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _limits_for(provider: str) -> Dict[str, float]:
+    limits = dict(
+        DEFAULT_LIMITS.get(provider, {"rpm": 60, "tpm": 0, "max_concurrency": 8})
+    )
+    limits.update(settings.LLM_RATE_LIMITS.get(provider, {}))
+    return limits
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limits = _limits_for(provider)
+            limiter = ProviderLimiter(
+                provider,
+                rpm=limits.get("rpm", 0),
+                tpm=limits.get("tpm", 0),
+                max_concurrency=int(limits.get("max_concurrency", 8)),
+                min_concurrency=int(limits.get("min_concurrency", 1)),
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+
+def estimate_tokens(prompt: str) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
+
+def limiter_status() -> Dict[str, Any]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {
+        "policy": settings.LLM_LIMITER_POLICY,
+        "limiters": [lim.snapshot() for lim in limiters],
+    }
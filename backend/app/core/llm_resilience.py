@@ -0,0 +1,332 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from tenacity import (
+    RetryCallState,
+    Retrying,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_random_exponential,
+)
+
+from .config import settings
+from .llm_client import get_llm, json_mode_options
+from .llm_limiter import estimate_tokens, get_limiter
+from .tracing import current_trace_id, span
+
+# HTTP statuses worth retrying: timeouts, throttling and transient server errors.
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+# SDK exception names that carry no status code but are transient.
+RETRYABLE_NAMES = {
+    "APIConnectionError",
+    "APITimeoutError",
+    "ConnectError",
+    "ConnectTimeout",
+    "ReadTimeout",
+    "RemoteProtocolError",
+    "ServiceUnavailable",
+    "DeadlineExceeded",
+    "ResourceExhausted",
+}
+
+
+class LLMTimeoutError(TimeoutError):
+    """An LLM attempt did not finish within its deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit is open; the caller should use its fallback."""
+
+
+def _status_of(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        response = getattr(exc, "response", None)
+        status = getattr(response, "status_code", None)
+    if status is None:
+        # google.api_core exceptions expose the HTTP status as `.code`
+        code = getattr(exc, "code", None)
+        status = code if isinstance(code, int) else None
+    return status
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (LLMTimeoutError, TimeoutError, ConnectionError)):
+        return True
+    status = _status_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(exc).__name__ in RETRYABLE_NAMES
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    -> calls pass; `failure_threshold` consecutive failures open the circuit
+    open      -> calls are rejected until `reset_timeout_s` has elapsed
+    half_open -> a single probe call is let through; success closes, failure re-opens
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout_s: float):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout_s = reset_timeout_s
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.total_successes = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open":
+                if time.monotonic() - (self.opened_at or 0.0) >= self.reset_timeout_s:
+                    self.state = "half_open"
+                    self._probe_in_flight = False
+                else:
+                    self.total_rejected += 1
+                    return False
+            # half_open: only one probe at a time
+            if self._probe_in_flight:
+                self.total_rejected += 1
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.total_successes += 1
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            self.total_failures += 1
+            self.consecutive_failures += 1
+            self.last_error = repr(exc)[:300]
+            if (
+                self.state == "half_open"
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        # an admitted call never reached the provider (e.g. shed by the rate limiter)
+        with self._lock:
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            retry_in = None
+            if self.state == "open" and self.opened_at is not None:
+                retry_in = max(
+                    self.reset_timeout_s - (time.monotonic() - self.opened_at), 0.0
+                )
+            return {
+                "provider": self.name,
+                "state": self.state,
+                "consecutive_failures": self.consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "reset_timeout_s": self.reset_timeout_s,
+                "retry_in_s": round(retry_in, 3) if retry_in is not None else None,
+                "total_successes": self.total_successes,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "last_error": self.last_error,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+# Attempts run here so a hung provider call can be abandoned at its deadline.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.LLM_EXECUTOR_WORKERS, thread_name_prefix="llm-call"
+)
+
+
+def current_provider() -> str:
+    return settings.LLM_PROVIDER.lower().strip()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(provider)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                provider,
+                failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout_s=settings.LLM_BREAKER_RESET_S,
+            )
+            _breakers[provider] = breaker
+        return breaker
+
+
+def breaker_status() -> Dict[str, Any]:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {
+        "provider": current_provider(),
+        "breakers": [b.snapshot() for b in breakers],
+    }
+
+
+def _response_text(resp: Any) -> str:
+    return getattr(resp, "content", None) or str(resp)
+
+
+def _usage_tokens(resp: Any) -> Optional[int]:
+    usage = getattr(resp, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    return None
+
+
+def _call_once(
+    llm: Any, prompt: str, timeout_s: float, options: Optional[Dict[str, Any]] = None
+) -> Any:
+    # Support both LangChain-style and direct client usage
+    fn: Callable[..., Any] = llm.invoke if hasattr(llm, "invoke") else llm
+    future = _executor.submit(fn, prompt, **(options or {}))
+    try:
+        return future.result(timeout=timeout_s)
+    except FutureTimeoutError:
+        future.cancel()
+        raise LLMTimeoutError(f"LLM call exceeded {timeout_s:.1f}s deadline")
+
+
+def invoke_llm(
+    prompt: str,
+    get_client: Optional[Callable[[], Any]] = None,
+    json_shape: Optional[str] = None,
+) -> str:
+    """
+    Call the LLM with a per-attempt deadline, jittered exponential retries for
+    retryable errors only, a per-provider circuit breaker and the shared client-side
+    rate limiter.
+
+    With several LLM_PROVIDERS the call is routed by llm_router (fastest healthy
+    provider, optional hedging); otherwise it goes to LLM_PROVIDER. Raises
+    CircuitOpenError immediately (without building a client) when the circuit is
+    open, and RateLimitedError when no capacity frees up within the limiter's wait
+    budget, so callers can go straight to their deterministic fallback.
+    json_shape ("object" | "array") requests the provider's JSON mode, if any.
+    """
+    if get_client is None:
+        from .llm_router import get_router
+
+        router = get_router()
+        if router.active:
+            return router.invoke(prompt, json_shape)
+    return invoke_provider(current_provider(), prompt, get_client, json_shape)
+
+
+def invoke_provider(
+    provider: str,
+    prompt: str,
+    get_client: Optional[Callable[[], Any]] = None,
+    json_shape: Optional[str] = None,
+) -> str:
+    """
+    invoke_llm against one specific provider.
+    """
+    options = json_mode_options(provider, json_shape) if json_shape else None
+    breaker = get_breaker(provider)
+    limiter = get_limiter(provider)
+    if not breaker.allow():
+        raise CircuitOpenError(f"LLM circuit open for provider '{provider}'")
+
+    try:
+        llm = get_client() if get_client else get_llm(provider)
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+
+    started = time.monotonic()
+    total_deadline = settings.LLM_TOTAL_DEADLINE_S
+    first_attempt = [True]
+    attempt_no = [0]
+
+    def attempt() -> str:
+        # checked before the breaker: a retry past the deadline must not take (and
+        # then leak) the half-open probe
+        remaining = total_deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            if first_attempt[0]:
+                breaker.release_probe()
+            raise LLMTimeoutError(
+                f"LLM total deadline of {total_deadline:.1f}s exhausted"
+            )
+
+        # the first attempt was admitted above; later ones re-check the breaker
+        if not first_attempt[0] and not breaker.allow():
+            raise CircuitOpenError(f"LLM circuit open for provider '{provider}'")
+        first_attempt[0] = False
+        try:
+            permit = limiter.acquire(
+                estimate_tokens(prompt),
+                max_wait_s=min(settings.LLM_LIMITER_MAX_WAIT_S, remaining),
+            )
+        except Exception:
+            breaker.release_probe()
+            raise
+
+        remaining = total_deadline - (time.monotonic() - started)
+        attempt_no[0] += 1
+        with span(
+            "llm.attempt",
+            provider=provider,
+            attempt=attempt_no[0],
+            prompt_tokens_est=estimate_tokens(prompt),
+            json_mode=bool(options),
+        ) as s:
+            try:
+                resp = _call_once(
+                    llm, prompt, min(settings.LLM_TIMEOUT_S, remaining), options
+                )
+            except Exception as e:
+                permit.release(throttled=_status_of(e) == 429)
+                breaker.record_failure(e)
+                s.set(http_status=_status_of(e))
+                raise
+            tokens = _usage_tokens(resp)
+            s.set(total_tokens=tokens, limiter_wait_s=round(permit.wait_s, 3))
+            permit.release(actual_tokens=tokens)
+            breaker.record_success()
+            return _response_text(resp)
+
+    def log_retry(state: RetryCallState) -> None:
+        exc = state.outcome.exception() if state.outcome else None
+        print(
+            f"LLM_RETRY: provider={provider} attempt={state.attempt_number} "
+            f"trace_id={current_trace_id() or '-'} error={exc!r}"
+        )
+
+    retrying = Retrying(
+        stop=stop_after_attempt(settings.LLM_MAX_ATTEMPTS)
+        | stop_after_delay(total_deadline),
+        wait=wait_random_exponential(
+            multiplier=settings.LLM_RETRY_BACKOFF_S,
+            max=settings.LLM_RETRY_BACKOFF_MAX_S,
+        ),
+        retry=retry_if_exception(is_retryable),
+        before_sleep=log_retry,
+        reraise=True,
+    )
+    return retrying(attempt)
@@ -0,0 +1,272 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .config import settings
+from .llm_limiter import RateLimitedError
+from .llm_resilience import CircuitOpenError, get_breaker, invoke_provider
+from .tracing import run_in_context
+
+# Hedge budget tokens that can pile up while traffic is quiet.
+HEDGE_BURST = 5.0
+
+# Share of routed calls sent to a random healthy provider, so the ranking notices
+# when a slower provider gets faster again.
+EXPLORE_RATE = 0.02
+
+# Half-life of the error-rate EWMA while a provider gets no calls. Routing avoids an
+# unhealthy provider, so without it the rate would never come back down.
+ERROR_HALF_LIFE_S = 60.0
+
+# Successful latencies kept per provider for its p95 (the hedging deadline).
+LATENCY_WINDOW = 200
+MIN_P95_SAMPLES = 20
+
+
+class ProviderStats:
+    """
+    Latency and error-rate EWMAs of one provider, measured around whole
+    invoke_provider() calls (what a request actually waits for). The error rate
+    also decays with time (ERROR_HALF_LIFE_S), so an unhealthy provider is tried
+    again once it has been left alone for a while.
+    """
+
+    def __init__(self, name: str, alpha: float):
+        self.name = name
+        self.alpha = alpha
+        self.latency_ewma_s: Optional[float] = None
+        self.error_ewma = 0.0  # as of _error_at; read it through error_rate()
+        self._error_at = time.monotonic()
+        self.samples = 0
+        self.calls = 0
+        self.errors = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, latency_s: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.error_ewma = self.error_rate()
+            self._error_at = time.monotonic()
+            self.error_ewma += self.alpha * ((0.0 if ok else 1.0) - self.error_ewma)
+            if not ok:
+                self.errors += 1
+                return
+            self.samples += 1
+            self._latencies.append(latency_s)
+            if self.latency_ewma_s is None:
+                self.latency_ewma_s = latency_s
+            else:
+                self.latency_ewma_s += self.alpha * (latency_s - self.latency_ewma_s)
+
+    def error_rate(self) -> float:
+        idle_s = time.monotonic() - self._error_at
+        return self.error_ewma * 0.5 ** (idle_s / ERROR_HALF_LIFE_S)
+
+    def healthy(self) -> bool:
+        if self.error_rate() > settings.LLM_ROUTING_MAX_ERROR_RATE:
+            return False
+        breaker = get_breaker(self.name).snapshot()
+        # an open circuit past its reset timeout will admit a probe
+        return breaker["state"] != "open" or breaker["retry_in_s"] == 0
+
+    def score(self) -> float:
+        """
+        Expected seconds per useful answer; 0 until the provider has been measured.
+        """
+        if self.samples < settings.LLM_ROUTING_MIN_SAMPLES or not self.latency_ewma_s:
+            return 0.0
+        return self.latency_ewma_s / max(1.0 - self.error_rate(), 0.05)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._latencies) < MIN_P95_SAMPLES:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "provider": self.name,
+            "healthy": self.healthy(),
+            "score_s": round(self.score(), 3),
+            "latency_ewma_s": (
+                round(self.latency_ewma_s, 3) if self.latency_ewma_s else None
+            ),
+            "latency_p95_s": round(p95, 3) if p95 is not None else None,
+            "error_rate_ewma": round(self.error_rate(), 4),
+            "calls": self.calls,
+            "errors": self.errors,
+        }
+
+
+class LLMRouter:
+    """
+    Sends each call to the fastest healthy provider and, with LLM_HEDGE_ENABLED,
+    duplicates it to the runner-up once it runs past the primary's p95 latency;
+    the first successful answer wins. Every routed call earns LLM_HEDGE_BUDGET
+    hedge tokens (up to HEDGE_BURST) and a hedge spends one, so hedged duplicates
+    stay a bounded share of traffic even when a provider slows down for everyone.
+    """
+
+    def __init__(self, providers: List[str]):
+        self.providers = providers
+        self.stats = {
+            p: ProviderStats(p, settings.LLM_ROUTING_EWMA_ALPHA) for p in providers
+        }
+        self.routed = 0
+        self.failovers = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.hedges_skipped = 0  # past the p95 deadline, but no budget left
+        self._hedge_tokens = 1.0
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self._pool = ThreadPoolExecutor(
+            max_workers=settings.LLM_EXECUTOR_WORKERS, thread_name_prefix="llm-route"
+        )
+
+    @property
+    def active(self) -> bool:
+        return len(self.providers) > 1
+
+    def ranked(self, explore: bool = False) -> List[str]:
+        """
+        Providers in routing order: healthy ones by score, then the unhealthy ones.
+        """
+        healthy = [p for p in self.providers if self.stats[p].healthy()]
+        unhealthy = [p for p in self.providers if p not in healthy]
+        healthy.sort(key=lambda p: self.stats[p].score())
+        if explore and len(healthy) > 1 and self._rng.random() < EXPLORE_RATE:
+            healthy.insert(0, healthy.pop(self._rng.randrange(1, len(healthy))))
+        return healthy + unhealthy
+
+    def _call(self, provider: str, prompt: str, json_shape: Optional[str]) -> str:
+        started = time.monotonic()
+        try:
+            text = invoke_provider(provider, prompt, json_shape=json_shape)
+        except (CircuitOpenError, RateLimitedError):
+            # rejected before reaching the provider: says nothing about its latency
+            raise
+        except Exception:
+            self.stats[provider].record(time.monotonic() - started, ok=False)
+            raise
+        self.stats[provider].record(time.monotonic() - started, ok=True)
+        return text
+
+    def _call_with_failover(
+        self, order: List[str], prompt: str, json_shape: Optional[str]
+    ) -> str:
+        # circuit open / over our rate limit fail fast, so trying the next is cheap
+        for i, provider in enumerate(order):
+            try:
+                return self._call(provider, prompt, json_shape)
+            except (CircuitOpenError, RateLimitedError):
+                if i == len(order) - 1:
+                    raise
+                with self._lock:
+                    self.failovers += 1
+        raise CircuitOpenError("no LLM provider available")
+
+    def _take_hedge_token(self) -> bool:
+        with self._lock:
+            if self._hedge_tokens >= 1.0:
+                self._hedge_tokens -= 1.0
+                self.hedged += 1
+                return True
+            self.hedges_skipped += 1
+            return False
+
+    def _hedge_plan(self, order: List[str]) -> Tuple[Optional[str], Optional[float]]:
+        if not settings.LLM_HEDGE_ENABLED or len(order) < 2:
+            return None, None
+        backup = order[1]
+        delay = self.stats[order[0]].p95()
+        if delay is None or not self.stats[backup].healthy():
+            return None, None
+        return backup, max(delay, settings.LLM_HEDGE_MIN_DELAY_S)
+
+    def invoke(self, prompt: str, json_shape: Optional[str] = None) -> str:
+        order = self.ranked(explore=True)
+        with self._lock:
+            self.routed += 1
+            self._hedge_tokens = min(
+                HEDGE_BURST, self._hedge_tokens + settings.LLM_HEDGE_BUDGET
+            )
+        backup, delay = self._hedge_plan(order)
+        if backup is None:
+            return self._call_with_failover(order, prompt, json_shape)
+
+        # run_in_context: attempt spans stay in the caller's trace
+        first = self._pool.submit(
+            run_in_context(self._call), order[0], prompt, json_shape
+        )
+        try:
+            return first.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        except (CircuitOpenError, RateLimitedError):
+            with self._lock:
+                self.failovers += 1
+            return self._call_with_failover(order[1:], prompt, json_shape)
+
+        if not self._take_hedge_token():
+            return first.result()
+
+        # the slower call keeps running in its thread; its result only feeds the stats
+        second = self._pool.submit(
+            run_in_context(self._call), backup, prompt, json_shape
+        )
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is second:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    return future.result()
+        return first.result()  # both failed: raise the primary's error
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "routed": self.routed,
+                "failovers": self.failovers,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedges_skipped": self.hedges_skipped,
+                "hedge_tokens": round(self._hedge_tokens, 3),
+            }
+        return {
+            "providers": [self.stats[p].snapshot() for p in self.providers],
+            "order": self.ranked(),
+            "hedging": settings.LLM_HEDGE_ENABLED,
+            **counters,
+        }
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def routing_providers() -> List[str]:
+    providers = [p.lower().strip() for p in settings.LLM_PROVIDERS if p.strip()]
+    return list(dict.fromkeys(providers)) or [settings.LLM_PROVIDER.lower().strip()]
+
+
+def get_router() -> LLMRouter:
+    """
+    The process-wide router, rebuilt if LLM_PROVIDERS changed.
+    """
+    global _router
+    providers = routing_providers()
+    with _router_lock:
+        if _router is None or _router.providers != providers:
+            _router = LLMRouter(providers)
+        return _router
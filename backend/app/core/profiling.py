@@ -0,0 +1,280 @@
+import contextvars
+import cProfile
+import functools
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from .config import settings
+
+# Functions listed in a profile's metadata (by own time).
+TOP_FUNCTIONS = 15
+
+
+def admin_token_matches(token: Optional[str]) -> bool:
+    expected = settings.ADMIN_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token, expected)
+
+
+class RequestProfile:
+    """
+    cProfile profiles of one request: one for the event loop thread plus one per
+    threadpool call made on its behalf (see `profiled`), merged when it is saved.
+    """
+
+    def __init__(self) -> None:
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def add(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            self.profiles.append(profile)
+
+    def stats(self) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self.profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+
+_current: contextvars.ContextVar[Optional[RequestProfile]] = contextvars.ContextVar(
+    "request_profile", default=None
+)
+
+
+def profiled(fn):
+    """
+    Profile calls of a blocking function that runs in the threadpool (contextvars
+    are copied there) when its request is being profiled. Otherwise a plain call.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        current = _current.get()
+        if current is None or sys.getprofile() is not None:
+            return fn(*args, **kwargs)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile.disable()
+            current.add(profile)
+
+    return wrapper
+
+
+def _new_id() -> str:
+    # sorts chronologically; unique across workers sharing the directory
+    now = datetime.now(timezone.utc)
+    return f"{now:%Y%m%dT%H%M%S%f}-{os.getpid()}-{random.getrandbits(24):06x}"
+
+
+def _top_functions(stats: pstats.Stats, limit: int) -> List[Dict[str, Any]]:
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{os.path.basename(filename)}:{line}({name})",
+                "calls": calls,
+                "tottime_s": round(tottime, 4),
+                "cumtime_s": round(cumtime, 4),
+            }
+        )
+    rows.sort(key=lambda r: r["tottime_s"], reverse=True)
+    return rows[:limit]
+
+
+class ProfileStore:
+    """
+    Bounded ring of saved profiles: `<id>.prof` (pstats format, open with pstats or
+    snakeviz) plus `<id>.json` metadata. Saving beyond `max_files` deletes the
+    oldest. Several workers may share the directory.
+    """
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max(max_files, 1)
+
+    def _path(self, profile_id: str, ext: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{ext}")
+
+    def ids(self) -> List[str]:
+        """
+        Saved profile ids, newest first.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted((n[:-5] for n in names if n.endswith(".json")), reverse=True)
+
+    def save(self, stats: pstats.Stats, meta: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = meta.get("id") or _new_id()
+        meta = {
+            **meta,
+            "id": profile_id,
+            "total_calls": stats.total_calls,
+            "top": _top_functions(stats, TOP_FUNCTIONS),
+        }
+        prof_path = self._path(profile_id, "prof")
+        stats.dump_stats(prof_path + ".tmp")
+        os.replace(prof_path + ".tmp", prof_path)
+        # metadata last: a profile is listed only once both files exist
+        meta_path = self._path(profile_id, "json")
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        self.prune()
+        return profile_id
+
+    def prune(self) -> int:
+        removed = 0
+        for profile_id in self.ids()[self.max_files :]:
+            for ext in ("json", "prof"):
+                try:
+                    os.remove(self._path(profile_id, ext))
+                except FileNotFoundError:  # another worker got there first
+                    pass
+            removed += 1
+        return removed
+
+    def meta(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(profile_id, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        metas = (self.meta(profile_id) for profile_id in self.ids())
+        return [m for m in metas if m is not None]
+
+    def prof_path(self, profile_id: str) -> Optional[str]:
+        if profile_id not in self.ids():  # also rejects path tricks in the id
+            return None
+        path = self._path(profile_id, "prof")
+        return path if os.path.exists(path) else None
+
+    def render(self, profile_id: str, sort: str = "cumulative", limit: int = 60):
+        path = self.prof_path(profile_id)
+        if path is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(path, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+
+def profile_store() -> ProfileStore:
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware that profiles single requests with cProfile: those sending
+    `X-Profile: <ADMIN_TOKEN>` (any route) and a `sample_rate` share of
+    `sampled_routes`. The event loop thread is profiled from the start of the
+    request to its last response byte (parsing runs there); threadpool work goes
+    through `profiled`. LLM calls show up as time waiting on their futures.
+
+    One request per worker is profiled at a time, since a thread has a single
+    profiler hook and other requests' event-loop work would show up in it. The
+    response carries `X-Profile-Id`; the profile is written after it was sent.
+    Only added to the app with PROFILING_ENABLED, so it costs nothing otherwise.
+    """
+
+    def __init__(
+        self,
+        app,
+        store: Optional[ProfileStore] = None,
+        sampled_routes: Iterable[Tuple[str, str]] = (),
+        sample_rate: float = 0.0,
+    ):
+        self.app = app
+        self.store = store
+        self.sampled_routes = set(sampled_routes)
+        self.sample_rate = sample_rate
+        self.busy = False
+        self.saved = 0
+        self.skipped_busy = 0
+
+    def _trigger(self, scope) -> Optional[str]:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                if admin_token_matches(value.decode("latin-1")):
+                    return "header"
+                return None
+        key = (scope["method"], scope["path"])
+        if key in self.sampled_routes and random.random() < self.sample_rate:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+        if self.busy or sys.getprofile() is not None:
+            self.skipped_busy += 1
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = _new_id()
+        status = {"code": None}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        request_profile = RequestProfile()
+        token = _current.set(request_profile)
+        loop_profile = cProfile.Profile()
+        self.busy = True
+        started = time.monotonic()
+        loop_profile.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            loop_profile.disable()
+            duration = time.monotonic() - started
+            self.busy = False
+            _current.reset(token)
+            request_profile.add(loop_profile)
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status["code"],
+                "trigger": trigger,
+                "duration_ms": round(1000 * duration, 1),
+                "threads": len(request_profile.profiles),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+            await run_in_threadpool(self._save, request_profile, meta)
+
+    def _save(self, request_profile: RequestProfile, meta: Dict[str, Any]) -> None:
+        stats = request_profile.stats()
+        try:
+            (self.store or profile_store()).save(stats, meta)
+            self.saved += 1
+        except OSError as e:
+            print(f"PROFILE_SAVE_FAILED: id={meta['id']} error={e!r}")
@@ -0,0 +1,214 @@
+import asyncio
+import json
+import math
+import random
+import time
+from functools import lru_cache
+from typing import AsyncIterator, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from .config import settings
+
+# Rough words-per-token factor, only used to size the fake output.
+_WORDS_PER_TOKEN = 0.75
+
+_ROADMAP_PHASES = [
+    "Phase 0 – Foundations",
+    "Phase 1 – Close Core Gaps",
+    "Phase 2 – Nice-to-have Skills",
+    "Phase 3 – Portfolio",
+    "Phase 4 – Continuous Improvement",
+]
+
+
+class StubLLMError(RuntimeError):
+    """
+    Simulated provider error. status_code mimics the HTTP status a real SDK would expose.
+    """
+
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class StubChatModel:
+    """
+    Local, offline stand-in for a LangChain chat model (LLM_PROVIDER=stub).
+
+    Exposes invoke/ainvoke/stream/astream like the real providers, with configurable
+    latency distribution, output size, error rate and streaming behaviour, so the
+    analysis pipeline can be load-tested without network access or API spend.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 800.0,
+        latency_dist: str = "lognormal",
+        latency_sigma: float = 0.5,
+        ttft_ms: float = 150.0,
+        output_tokens: int = 400,
+        error_rate: float = 0.0,
+        stream_chunk_tokens: int = 20,
+        seed: Optional[int] = None,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist.lower().strip()
+        self.latency_sigma = latency_sigma
+        self.ttft_ms = ttft_ms
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.stream_chunk_tokens = max(stream_chunk_tokens, 1)
+        self.model_name = "stub"
+        self._rng = random.Random(seed)
+
+    # ----- simulation helpers -----
+
+    def _sample_latency_s(self) -> float:
+        mean = max(self.latency_ms, 0.0)
+        if self.latency_dist == "fixed" or mean == 0:
+            ms = mean
+        elif self.latency_dist == "uniform":
+            spread = mean * self.latency_sigma
+            ms = self._rng.uniform(mean - spread, mean + spread)
+        elif self.latency_dist == "lognormal":
+            # parametrized so the distribution mean equals latency_ms
+            mu = math.log(mean) - self.latency_sigma**2 / 2
+            ms = self._rng.lognormvariate(mu, self.latency_sigma)
+        else:
+            raise ValueError(f"Unsupported STUB_LLM_LATENCY_DIST: {self.latency_dist}")
+        return max(ms, 0.0) / 1000.0
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            status = self._rng.choice([429, 500, 503])
+            raise StubLLMError(
+                f"Stub provider simulated HTTP {status}", status_code=status
+            )
+
+    def _filler(self, n_words: int) -> str:
+        words = "practice build measure document review iterate deploy learn".split()
+        return " ".join(words[i % len(words)] for i in range(max(n_words, 1)))
+
+    def _render(self, prompt: str) -> str:
+        n_words = int(self.output_tokens * _WORDS_PER_TOKEN)
+
+        # Combined prompts ask for {"roadmap_md": ..., "projects": [...]}
+        if '"roadmap_md"' in prompt:
+            return json.dumps(
+                {
+                    "roadmap_md": self._roadmap(n_words // 2),
+                    "projects": self._projects(n_words // 2),
+                }
+            )
+
+        # Project prompts ask for a bare JSON array; keep the output parseable.
+        if "JSON array" in prompt:
+            return json.dumps(self._projects(n_words))
+
+        return self._roadmap(n_words)
+
+    def _projects(self, n_words: int) -> List[dict]:
+        per_item = max(n_words // 4, 5)
+        return [
+            {
+                "title": f"Stub Project {i + 1}",
+                "description": self._filler(per_item),
+                "skills": ["Python", "SQL", "Docker"],
+                "difficulty": "intermediate",
+                "estimated_duration_weeks": 3,
+            }
+            for i in range(4)
+        ]
+
+    def _roadmap(self, n_words: int) -> str:
+        per_phase = max(n_words // len(_ROADMAP_PHASES), 5)
+        lines: List[str] = ["# Personalized Learning Roadmap", ""]
+        for phase in _ROADMAP_PHASES:
+            lines.append(f"## {phase}")
+            lines.append(f"- {self._filler(per_phase)}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def _chunks(self, text: str) -> List[str]:
+        words = text.split(" ")
+        step = max(int(self.stream_chunk_tokens * _WORDS_PER_TOKEN), 1)
+        return [
+            " ".join(words[i : i + step]) + (" " if i + step < len(words) else "")
+            for i in range(0, len(words), step)
+        ]
+
+    def _message(self, prompt: str, text: str, latency_s: float) -> AIMessage:
+        input_tokens = int(len(prompt.split()) / _WORDS_PER_TOKEN)
+        output_tokens = int(len(text.split()) / _WORDS_PER_TOKEN)
+        return AIMessage(
+            content=text,
+            response_metadata={
+                "model_name": self.model_name,
+                "stub_latency_ms": round(latency_s * 1000, 3),
+            },
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    # ----- LangChain-style interface -----
+
+    def invoke(self, prompt, **kwargs) -> AIMessage:
+        prompt = str(prompt)
+        latency = self._sample_latency_s()
+        time.sleep(latency)
+        self._maybe_fail()
+        text = self._render(prompt)
+        return self._message(prompt, text, latency)
+
+    async def ainvoke(self, prompt, **kwargs) -> AIMessage:
+        prompt = str(prompt)
+        latency = self._sample_latency_s()
+        await asyncio.sleep(latency)
+        self._maybe_fail()
+        text = self._render(prompt)
+        return self._message(prompt, text, latency)
+
+    def stream(self, prompt, **kwargs) -> Iterator[AIMessageChunk]:
+        prompt = str(prompt)
+        total = self._sample_latency_s()
+        ttft = min(self.ttft_ms / 1000.0, total)
+        time.sleep(ttft)
+        self._maybe_fail()
+        chunks = self._chunks(self._render(prompt))
+        per_chunk = (total - ttft) / max(len(chunks), 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(per_chunk)
+            yield AIMessageChunk(content=chunk)
+
+    async def astream(self, prompt, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        prompt = str(prompt)
+        total = self._sample_latency_s()
+        ttft = min(self.ttft_ms / 1000.0, total)
+        await asyncio.sleep(ttft)
+        self._maybe_fail()
+        chunks = self._chunks(self._render(prompt))
+        per_chunk = (total - ttft) / max(len(chunks), 1)
+        for i, chunk in enumerate(chunks):
+            if i:
+                await asyncio.sleep(per_chunk)
+            yield AIMessageChunk(content=chunk)
+
+
+@lru_cache
+def build_stub_llm() -> StubChatModel:
+    # one shared instance so a seeded RNG produces a single reproducible sequence
+    return StubChatModel(
+        latency_ms=settings.STUB_LLM_LATENCY_MS,
+        latency_dist=settings.STUB_LLM_LATENCY_DIST,
+        latency_sigma=settings.STUB_LLM_LATENCY_SIGMA,
+        ttft_ms=settings.STUB_LLM_TTFT_MS,
+        output_tokens=settings.STUB_LLM_OUTPUT_TOKENS,
+        error_rate=settings.STUB_LLM_ERROR_RATE,
+        stream_chunk_tokens=settings.STUB_LLM_STREAM_CHUNK_TOKENS,
+        seed=settings.STUB_LLM_SEED,
+    )
@@ -0,0 +1,270 @@
+"""
+Lightweight per-request tracing.
+
+Each analysis gets a trace id; every stage runs inside `span(name, **attributes)`
+and is written, when it ends, as one JSON line (trace and parent ids, duration,
+attributes, error events) to TRACE_FILE. Spans nest through a contextvar, which
+FastAPI copies into threadpool calls, so stages running off the event loop land in
+the same trace. `log_error` replaces bare prints of handled errors: the line carries
+the trace id and the error is attached to the current span; `log_event` does the
+same for notable non-error events.
+
+Offline analysis: `python -m app.manage slow-traces` (or jq on the file).
+"""
+
+import contextvars
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .config import settings
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "_t0",
+        "attributes",
+        "events",
+        "status",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.attributes: Dict[str, Any] = dict(attributes)
+        self.events: List[Dict[str, Any]] = []
+        self.status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, tag: str, **fields: Any) -> None:
+        self.events.append({"name": tag, **fields})
+
+    def add_error(self, tag: str, exc: BaseException, stack: bool = False) -> None:
+        event = {"name": tag, "error": repr(exc)}
+        if stack:
+            event["stack"] = "".join(traceback.format_exception(exc))
+        self.events.append(event)
+
+    def to_dict(self, duration_s: float) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": round(self.start, 6),
+            "duration_ms": round(1000 * duration_s, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "pid": os.getpid(),
+        }
+        if self.events:
+            record["events"] = self.events
+        return record
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled."""
+
+    trace_id = None
+    status = "ok"
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add_error(self, tag: str, exc: BaseException, stack: bool = False) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class JsonLinesExporter:
+    """
+    Appends one JSON object per line to `path` ("-" = stdout). Beyond `max_bytes`
+    the file is rotated to `<path>.1` (one generation is kept).
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.exported = 0
+        self.failed = 0
+        self._file = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        if self.path == "-":
+            return sys.stdout
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        if self.path == "-" or self.max_bytes <= 0 or self._file is None:
+            return
+        if self._file.tell() < self.max_bytes:
+            return
+        self._file.close()
+        os.replace(self.path, self.path + ".1")
+        self._file = self._open()
+
+    def export(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, default=str, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = self._open()
+                self._file.write(line)
+                self._file.flush()
+                self._rotate()
+                self.exported += 1
+            except (OSError, ValueError) as e:
+                self.failed += 1
+                if self.failed == 1:
+                    print(f"TRACE_EXPORT_FAILED: path={self.path} error={e!r}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None and self._file is not sys.stdout:
+                self._file.close()
+            self._file = None
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "trace_span", default=None
+)
+_exporter: Optional[JsonLinesExporter] = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter() -> JsonLinesExporter:
+    """
+    The process-wide exporter, reopened if TRACE_FILE changed.
+    """
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None or _exporter.path != settings.TRACE_FILE:
+            if _exporter is not None:
+                _exporter.close()
+            _exporter = JsonLinesExporter(
+                settings.TRACE_FILE, int(settings.TRACE_FILE_MAX_MB * 1024 * 1024)
+            )
+        return _exporter
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current.get()
+    return current.trace_id if current else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a stage as a child of the current span (or as the root of a new trace).
+    An exception leaving the block marks the span as failed and propagates.
+    """
+    if not settings.TRACING_ENABLED:
+        yield _NOOP
+        return
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.add_error("exception", e, stack=True)
+        raise
+    finally:
+        _current.reset(token)
+        get_exporter().export(current.to_dict(time.perf_counter() - current._t0))
+
+
+def log_error(tag: str, exc: BaseException, stack: bool = False) -> None:
+    """
+    Print a handled error with the current trace id and attach it to the current
+    span; `stack` also records (and prints) the traceback.
+    """
+    current = _current.get()
+    trace_id = current.trace_id if current else "-"
+    print(f"{tag}: trace_id={trace_id} {exc!r}")
+    if stack:
+        traceback.print_exception(exc)
+    if current is not None:
+        current.add_error(tag, exc, stack)
+
+
+def log_event(tag: str, **fields: Any) -> None:
+    """
+    Print an event with the current trace id and attach it to the current span.
+    """
+    current = _current.get()
+    trace_id = current.trace_id if current else "-"
+    details = "".join(f" {k}={v}" for k, v in fields.items())
+    print(f"{tag}: trace_id={trace_id}{details}")
+    if current is not None:
+        current.add_event(tag, **fields)
+
+
+def run_in_context(fn):
+    """
+    Bind `fn` to the caller's context (current span), for work submitted to plain
+    ThreadPoolExecutors, which do not copy contextvars.
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+
+def read_spans(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:  # partially written last line
+                continue
+
+
+def slowest_traces(
+    path: str, root: str = "analysis", limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    The `limit` slowest traces rooted at a `root` span, each with its root span and
+    the total duration per child stage name.
+    """
+    roots: Dict[str, Dict[str, Any]] = {}
+    stages: Dict[str, Dict[str, float]] = {}
+    for record in read_spans(path):
+        trace_id = record.get("trace_id")
+        if record.get("parent_id") is None:
+            if record.get("name") == root:
+                roots[trace_id] = record
+            continue
+        by_name = stages.setdefault(trace_id, {})
+        name = record.get("name", "?")
+        by_name[name] = by_name.get(name, 0.0) + record.get("duration_ms", 0.0)
+    slowest = sorted(roots.values(), key=lambda r: r["duration_ms"], reverse=True)
+    return [
+        {**record, "stages_ms": stages.get(record["trace_id"], {})}
+        for record in slowest[:limit]
+    ]
@@ -0,0 +1,238 @@
+"""
+Startup warm-up: pay the one-off costs of the first analysis (data files and matcher
+indexes, DB connections, LLM clients, reportlab) before traffic arrives.
+
+Runs in a background thread started by the app lifespan, so /health answers while
+it runs; GET /ready returns 200 only once it has finished. Loading the indexes and
+connecting to the DB are required and retried every WARMUP_RETRY_S until they work;
+the remaining steps are best effort and only recorded when they fail.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import settings
+
+_SAMPLE_CV = (
+    "Software engineer with 4 years of Python, FastAPI and PostgreSQL. "
+    "Built REST APIs, Docker images and CI pipelines; some React and AWS."
+)
+_SAMPLE_ROLE = "Backend Developer"
+
+
+class WarmupState:
+    def __init__(self) -> None:
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.ready = False
+            self.started_at = time.monotonic()
+            self.finished_at = None
+            self.steps = {}
+
+    def record(self, step: str, ok: bool, ms: float, error: str = "") -> None:
+        with self._lock:
+            entry = self.steps.setdefault(step, {"attempts": 0})
+            entry.update(ok=ok, ms=round(ms, 1), attempts=entry["attempts"] + 1)
+            if error:
+                entry["error"] = error
+            else:
+                entry.pop("error", None)
+
+    def mark_ready(self) -> None:
+        with self._lock:
+            self.ready = True
+            self.finished_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = None
+            if self.started_at is not None:
+                end = self.finished_at or time.monotonic()
+                elapsed = round(end - self.started_at, 3)
+            return {
+                "ready": self.ready,
+                "elapsed_s": elapsed,
+                "steps": {name: dict(entry) for name, entry in self.steps.items()},
+            }
+
+
+warmup_state = WarmupState()
+
+
+def load_indexes() -> None:
+    """
+    Build everything read-only that requests would otherwise build on first use.
+    """
+    from .role_intel import load_roles_map, load_skills_taxonomy
+
+    load_roles_map()
+    load_skills_taxonomy()
+
+    if settings.SKILL_FUZZY_ENABLED:
+        from ..services.fuzzy_matcher import get_fuzzy_index
+
+        get_fuzzy_index()
+
+    if settings.RUN_REUSE_ENABLED:
+        from ..db.session import SessionLocal
+        from ..services.run_reuse import sync_reuse_index
+
+        db = SessionLocal()
+        try:
+            print(f"RUN_REUSE_INDEX_LOADED: runs={sync_reuse_index(db)}")
+        finally:
+            db.close()
+
+    if settings.RECRUITER_INDEX_ENABLED:
+        from ..db.session import SessionLocal
+        from ..services.candidate_ranking import sync_candidate_index
+
+        db = SessionLocal()
+        try:
+            print(f"CANDIDATE_INDEX_LOADED: runs={sync_candidate_index(db)}")
+        finally:
+            db.close()
+
+    if settings.SKILL_COOCCURRENCE_ENABLED:
+        from ..db.session import SessionLocal
+        from ..services.skill_cooccurrence import sync_cooccurrence
+
+        db = SessionLocal()
+        try:
+            runs = sync_cooccurrence(db, force=True)
+            print(f"SKILL_COOCCURRENCE_LOADED: runs={runs}")
+        finally:
+            db.close()
+
+
+def fill_db_pool() -> int:
+    """
+    Open up to WARMUP_DB_CONNECTIONS pooled connections at once, so the first
+    concurrent requests find them established. Returns how many were opened.
+    """
+    from sqlalchemy import text
+
+    from ..db.session import engine
+
+    size = getattr(engine.pool, "size", None)
+    wanted = settings.WARMUP_DB_CONNECTIONS
+    if callable(size):
+        wanted = min(wanted, size())
+    conns = []
+    try:
+        for _ in range(max(wanted, 1)):
+            conn = engine.connect()
+            conns.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in conns:
+            conn.close()  # back to the pool, still open
+    return len(conns)
+
+
+def exercise_pipeline() -> None:
+    # first calls compile the matcher regexes and import the lazy parts
+    from ..services.gap_service import compute_gap_report
+    from ..services.skill_service import extract_skills_pipeline
+
+    compute_gap_report(extract_skills_pipeline(_SAMPLE_CV), _SAMPLE_ROLE)
+
+
+def render_dummy_report() -> None:
+    """
+    Render a report PDF (reportlab font and page setup) and read it back (PDFium).
+    """
+    from ..schemas.analysis import AnalysisRunOut
+    from ..services.pdf_extractor import extract_pdf_text
+    from ..services.report_service import build_pdf_report
+
+    run = AnalysisRunOut(
+        id=0,
+        target_role=_SAMPLE_ROLE,
+        skills={"raw_skills": ["Python"], "validated_skills": ["Python"]},
+        gap_report={"strengths": ["Python"], "missing_core": ["Docker"]},
+        roadmap_md="# Roadmap\n\n- Week 1: Docker basics",
+        projects=[],
+    )
+    extract_pdf_text(build_pdf_report(run).getvalue())
+
+
+def warm_llm(prime: bool) -> None:
+    """
+    Build the client of every routed provider (its HTTP connection pool is kept,
+    see llm_client.get_llm). With `prime`, send each one a tiny prompt so DNS, TLS
+    and the provider's first-request latency are paid here.
+    """
+    from .llm_client import get_llm
+    from .llm_resilience import invoke_provider
+    from .llm_router import routing_providers
+
+    errors = []
+    for provider in routing_providers():
+        try:
+            get_llm(provider)
+            if prime:
+                invoke_provider(provider, "Reply with OK.")
+        except Exception as e:
+            errors.append(f"{provider}: {e!r}")
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+
+def _steps() -> List[Tuple[str, Callable[[], Any], bool]]:
+    # (name, step, required)
+    return [
+        ("indexes", load_indexes, True),
+        ("db", fill_db_pool, True),
+        ("pipeline", exercise_pipeline, False),
+        ("report", render_dummy_report, False),
+        ("llm", lambda: warm_llm(settings.WARMUP_LLM_PRIME), False),
+    ]
+
+
+def _run_step(name: str, step: Callable[[], Any]) -> bool:
+    started = time.monotonic()
+    try:
+        step()
+    except Exception as e:
+        warmup_state.record(name, False, 1000 * (time.monotonic() - started), repr(e))
+        print(f"WARMUP_STEP_FAILED: step={name} error={e!r}")
+        return False
+    warmup_state.record(name, True, 1000 * (time.monotonic() - started))
+    return True
+
+
+def run_warmup(stop: Optional[threading.Event] = None) -> bool:
+    """
+    Run all warm-up steps, then mark the process ready. Returns False when `stop`
+    was set before the required steps succeeded (shutdown during warm-up).
+    """
+    stop = stop or threading.Event()
+    warmup_state.reset()
+    for name, step, required in _steps():
+        while not _run_step(name, step) and required:
+            if stop.wait(settings.WARMUP_RETRY_S):
+                return False
+        if stop.is_set():
+            return False
+    warmup_state.mark_ready()
+    print(f"WARMUP_DONE: {warmup_state.snapshot()['elapsed_s']}s")
+    return True
+
+
+def start_warmup() -> threading.Event:
+    """
+    Run the warm-up in a daemon thread. Set the returned event to abandon it.
+    """
+    stop = threading.Event()
+    threading.Thread(
+        target=run_warmup, args=(stop,), name="warmup", daemon=True
+    ).start()
+    return stop
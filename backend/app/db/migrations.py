@@ -0,0 +1,37 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from . import models  # noqa: F401  (registers tables on Base.metadata)
+from .session import Base
+
+# Columns added to existing tables after their first release:
+# (table, column, DDL type, indexed). create_all() only creates missing tables, so
+# these are added in place.
+ADDED_COLUMNS = [
+    ("analysis_runs", "cv_document_id", "INTEGER REFERENCES cv_documents(id)", True),
+    ("idempotency_keys", "response", "TEXT", False),
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    """
+    Create missing tables and add columns introduced since a table was created.
+    Idempotent; runs at startup (this project has no migration tool).
+    """
+    Base.metadata.create_all(bind=engine)
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table, column, ddl, indexed in ADDED_COLUMNS:
+            if not inspector.has_table(table):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table)}
+            if column in existing:
+                continue
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+            if indexed:
+                conn.execute(
+                    text(
+                        f"CREATE INDEX IF NOT EXISTS ix_{table}_{column} "
+                        f"ON {table} ({column})"
+                    )
+                )
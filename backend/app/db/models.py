@@ -1,7 +1,33 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Text
+import zlib
+
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Text, LargeBinary, ForeignKey
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from .session import Base
 
+
+class CVDocument(Base):
+    __tablename__ = "cv_documents"
+    # Extracted CV text, stored once per distinct content and compressed
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of the text
+
+    codec = Column(String(16), nullable=False, default="zlib")
+    # deferred: only loaded when .text is accessed
+    text_compressed = deferred(Column(LargeBinary, nullable=False))
+    original_size = Column(Integer, nullable=False)  # bytes of UTF-8 text
+    compressed_size = Column(Integer, nullable=False)
+    page_count = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def text(self) -> str:
+        if self.codec != "zlib":
+            raise ValueError(f"Unsupported CV text codec: {self.codec}")
+        return zlib.decompress(self.text_compressed).decode("utf-8")
+
+
 class AnalysisRun(Base):
     __tablename__ = "analysis_runs"
     #Related to Database
@@ -15,4 +41,35 @@ class AnalysisRun(Base):
 
     roadmap_md = Column(Text, nullable=True)
 
+    cv_document_id = Column(Integer, ForeignKey("cv_documents.id"), nullable=True, index=True)
+    # lazy="select": the document row is only fetched when run.cv_document is accessed
+    cv_document = relationship(CVDocument, lazy="select")
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ArchivedAnalysisRun(Base):
+    __tablename__ = "analysis_runs_archive"
+    # Runs moved out of analysis_runs by the retention job; the whole row is one
+    # zlib-compressed JSON document (same shape as the NDJSON export)
+    id = Column(Integer, primary_key=True)  # original analysis_runs.id
+    target_role = Column(String, nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), nullable=True, index=True)
+
+    payload = deferred(Column(LargeBinary, nullable=False))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    # One row per Idempotency-Key sent to POST /mentor/analyze
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of role, filename and upload
+    status = Column(String(16), nullable=False)  # in_progress | completed | failed
+    # no FK: runs can be archived by the retention job while the key is still kept
+    run_id = Column(Integer, nullable=True)
+    # the owner's serialized AnalyzeResponse: replays return exactly the same body
+    response = deferred(Column(Text, nullable=True))
+
+    created_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
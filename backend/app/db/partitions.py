@@ -0,0 +1,203 @@
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+TABLE = "analysis_runs"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+# Monthly range partitions of analysis_runs on created_at (Postgres only).
+# Each partition is named analysis_runs_pYYYY_MM and covers [YYYY-MM-01, next month)
+# in UTC, the months the retention job archives by.
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_p{month.year:04d}_{month.month:02d}"
+
+
+def parse_partition_name(name: str) -> Optional[date]:
+    prefix = f"{TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        year, month = name[len(prefix) :].split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def months_between(start: date, end: date) -> List[date]:
+    """
+    Month starts covering [start, end).
+    """
+    months, current = [], month_start(start)
+    while current < end:
+        months.append(current)
+        current = add_months(current, 1)
+    return months
+
+
+def supports_partitioning(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    relkind = conn.execute(
+        text(
+            "SELECT c.relkind FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE c.relname = :name AND n.nspname = current_schema()"
+        ),
+        {"name": TABLE},
+    ).scalar()
+    return relkind == "p"
+
+
+def list_partitions(conn: Connection) -> List[Tuple[str, date]]:
+    """
+    (name, month) of the monthly partitions, oldest first. The default partition
+    is not included.
+    """
+    names = conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :name"
+        ),
+        {"name": TABLE},
+    ).scalars()
+    parsed = [(n, parse_partition_name(n)) for n in names]
+    return sorted(((n, m) for n, m in parsed if m is not None), key=lambda p: p[1])
+
+
+def utc_today() -> date:
+    return datetime.now(timezone.utc).date()
+
+
+def partition_bounds(month: date) -> str:
+    # explicit UTC offsets: bare dates on a timestamptz column would be read in the
+    # session TimeZone and miss the UTC month boundaries
+    return (
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+        f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def _create_partition(conn: Connection, month: date) -> None:
+    conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {TABLE} "
+            f"{partition_bounds(month)}"
+        )
+    )
+
+
+def ensure_partitions(
+    engine: Engine, months_ahead: int, today: Optional[date] = None
+) -> List[str]:
+    """
+    Create the partitions for the current month and the next `months_ahead` months
+    (plus the default partition). Idempotent; returns the partitions covered.
+
+    Run it from cron (python -m app.manage partitions create) so inserts never land
+    in the default partition.
+    """
+    first = month_start(today or utc_today())
+    months = months_between(first, add_months(first, months_ahead + 1))
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            raise RuntimeError(
+                f"{TABLE} is not partitioned; run `python -m app.manage partitions init`"
+            )
+        for month in months:
+            _create_partition(conn, month)
+        conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"
+            )
+        )
+    return [partition_name(m) for m in months]
+
+
+def convert_to_partitioned(engine: Engine, months_ahead: int) -> int:
+    """
+    One-off conversion of a plain analysis_runs table into a table partitioned by
+    created_at month. Copies existing rows into their partitions inside a single
+    transaction (the table is locked meanwhile). Returns the number of rows moved.
+
+    The primary key becomes (id, created_at) since Postgres requires the partition
+    key in every unique constraint; ids still come from the same sequence.
+    """
+    legacy = f"{TABLE}_legacy"
+    with engine.begin() as conn:
+        if is_partitioned(conn):
+            return 0
+        conn.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+        conn.execute(
+            text(f"UPDATE {TABLE} SET created_at = now() WHERE created_at IS NULL")
+        )
+        oldest = conn.execute(text(f"SELECT min(created_at) FROM {TABLE}")).scalar()
+
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME TO {legacy}"))
+        conn.execute(
+            text(
+                f"CREATE TABLE {TABLE} (LIKE {legacy} INCLUDING DEFAULTS) "
+                "PARTITION BY RANGE (created_at)"
+            )
+        )
+        conn.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)"))
+        conn.execute(
+            text(
+                f"ALTER TABLE {TABLE} ADD FOREIGN KEY (cv_document_id) "
+                "REFERENCES cv_documents (id)"
+            )
+        )
+        # keep the id sequence alive when the legacy table is dropped
+        seq = conn.execute(
+            text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": legacy}
+        ).scalar()
+        if seq:
+            conn.execute(text(f"ALTER SEQUENCE {seq} OWNED BY {TABLE}.id"))
+
+        today = utc_today()
+        if isinstance(oldest, datetime):
+            if oldest.tzinfo is not None:
+                oldest = oldest.astimezone(timezone.utc)
+            first = month_start(oldest.date())
+        else:
+            first = month_start(today)
+        for month in months_between(
+            first, add_months(month_start(today), months_ahead + 1)
+        ):
+            _create_partition(conn, month)
+        conn.execute(
+            text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT")
+        )
+
+        moved = conn.execute(
+            text(f"INSERT INTO {TABLE} SELECT * FROM {legacy}")
+        ).rowcount
+        conn.execute(text(f"DROP TABLE {legacy}"))
+
+        # partitioned indexes cascade to every partition
+        for column in ("created_at", "target_role", "cv_document_id"):
+            conn.execute(
+                text(f"CREATE INDEX ix_{TABLE}_{column} ON {TABLE} ({column})")
+            )
+    return moved
+
+
+def drop_partition(conn: Connection, name: str) -> None:
+    conn.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+    conn.execute(text(f"DROP TABLE {name}"))
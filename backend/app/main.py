@@ -1,25 +1,73 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.admission import AdmissionMiddleware, analyze_admission
 from app.core.config import settings
-from app.db.session import Base, engine
+from app.core.profiling import ProfilingMiddleware
+from app.core.warmup import load_indexes, start_warmup, warmup_state
+from app.db.migrations import upgrade_schema
+from app.db.session import engine
+from app.routers.admin import router as admin_router
 from app.routers.health import router as health_router
 from app.routers.mentor import router as mentor_router
 from app.routers.analysis import router as analysis_router
+from app.routers.export import router as export_router
+from app.routers.recruiter import router as recruiter_router
 
 # Create tables on startup (simple, non-migration setup)
-Base.metadata.create_all(bind=engine)
+upgrade_schema(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background; GET /ready turns 200 when it is done
+    if not settings.WARMUP_ENABLED:
+        load_indexes()
+        warmup_state.mark_ready()
+        yield
+        return
+    stop = start_warmup()
+    try:
+        yield
+    finally:
+        stop.set()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 
-app = FastAPI(title=settings.APP_NAME)
 
+# Innermost: the profile covers the request itself, not admission queueing
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sampled_routes=[("POST", "/mentor/analyze")],
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+    )
+
+# Shed excess analyses before their upload body is read
+app.add_middleware(
+    AdmissionMiddleware,
+    controller=analyze_admission,
+    routes=[("POST", "/mentor/analyze")],
+    enabled=settings.ADMISSION_ENABLED,
+)
+
+# Outermost, so admission 503s carry CORS headers too; Retry-After is not a
+# CORS-safelisted header, browsers only let the frontend read it when exposed
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
 app.include_router(health_router)
 app.include_router(mentor_router)
 app.include_router(analysis_router)
+app.include_router(export_router)
+app.include_router(recruiter_router)
+app.include_router(admin_router)
@@ -0,0 +1,158 @@
+"""
+Management commands.
+
+    python -m app.manage export-runs --format ndjson --role "Data Scientist" \
+        --since 2025-01-01 --until 2025-02-01 --output runs.ndjson
+    python -m app.manage partitions init      # one-off: partition analysis_runs by month
+    python -m app.manage partitions create    # cron: create upcoming monthly partitions
+    python -m app.manage partitions list
+    python -m app.manage retention --keep-months 12 --mode archive
+    python -m app.manage purge-idempotency-keys   # cron: drop expired Idempotency-Keys
+    python -m app.manage slow-traces --limit 20   # slowest analyses in TRACE_FILE
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.tracing import slowest_traces
+from app.db import partitions
+from app.db.migrations import upgrade_schema
+from app.db.session import engine
+from app.services.export_service import EXPORT_FORMATS, ExportError, export_runs
+from app.services.idempotency_service import purge_expired_keys
+from app.services.retention_service import RETENTION_MODES, apply_retention
+
+
+def _export_runs(args: argparse.Namespace) -> int:
+    try:
+        chunks = export_runs(
+            args.format, args.role, args.since, args.until, args.chunk_size
+        )
+        out = open(args.output, "wb") if args.output != "-" else sys.stdout.buffer
+        try:
+            written = 0
+            for chunk in chunks:
+                out.write(chunk)
+                written += len(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+    except ExportError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    print(f"exported {written} bytes to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _partitions(args: argparse.Namespace) -> int:
+    if not partitions.supports_partitioning(engine):
+        print(
+            f"error: partitioning needs Postgres, not {engine.dialect.name}",
+            file=sys.stderr,
+        )
+        return 2
+    upgrade_schema(engine)
+    if args.action == "init":
+        moved = partitions.convert_to_partitioned(engine, args.months_ahead)
+        print(f"analysis_runs is partitioned by month ({moved} rows moved)")
+    elif args.action == "create":
+        for name in partitions.ensure_partitions(engine, args.months_ahead):
+            print(name)
+    else:
+        with engine.connect() as conn:
+            for name, _ in partitions.list_partitions(conn):
+                print(name)
+    return 0
+
+
+def _retention(args: argparse.Namespace) -> int:
+    upgrade_schema(engine)
+    summary = apply_retention(engine, args.keep_months, args.mode, args.export_dir)
+    for item in summary:
+        print(
+            f"{item['month']}: {item['runs']} runs -> {item['target']}"
+            f" ({item['cv_documents']} CV documents deleted)"
+        )
+    if not summary:
+        print("nothing to do")
+    return 0
+
+
+def _purge_idempotency_keys(args: argparse.Namespace) -> int:
+    upgrade_schema(engine)
+    print(f"purged {purge_expired_keys(args.older_than_hours)} idempotency keys")
+    return 0
+
+
+def _slow_traces(args: argparse.Namespace) -> int:
+    try:
+        traces = slowest_traces(args.file, args.root, args.limit)
+    except FileNotFoundError:
+        print(f"error: no trace file at {args.file}", file=sys.stderr)
+        return 2
+    for trace in traces:
+        stages = ", ".join(
+            f"{name}={ms:.0f}ms"
+            for name, ms in sorted(trace["stages_ms"].items(), key=lambda kv: -kv[1])
+        )
+        print(
+            f"{trace['duration_ms']:.0f}ms trace_id={trace['trace_id']} "
+            f"status={trace['status']} {json.dumps(trace['attributes'])}"
+        )
+        print(f"    {stages}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CareerGENAI management commands")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export-runs", help="stream analysis runs to a file")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    export.add_argument("--role", help="only runs for this target role")
+    export.add_argument("--since", type=datetime.fromisoformat, help="created_at >=")
+    export.add_argument("--until", type=datetime.fromisoformat, help="created_at <")
+    export.add_argument("--chunk-size", type=int, default=1000)
+    export.add_argument("--output", default="-", help="file path, or - for stdout")
+    export.set_defaults(func=_export_runs)
+
+    parts = sub.add_parser("partitions", help="monthly partitions of analysis_runs")
+    parts.add_argument("action", choices=("init", "create", "list"))
+    parts.add_argument(
+        "--months-ahead", type=int, default=settings.ANALYSIS_PARTITION_MONTHS_AHEAD
+    )
+    parts.set_defaults(func=_partitions)
+
+    retention = sub.add_parser("retention", help="archive/export and drop old runs")
+    retention.add_argument(
+        "--keep-months", type=int, default=settings.ANALYSIS_RETENTION_MONTHS
+    )
+    retention.add_argument(
+        "--mode", choices=RETENTION_MODES, default=settings.ANALYSIS_RETENTION_MODE
+    )
+    retention.add_argument("--export-dir", default=settings.ANALYSIS_EXPORT_DIR)
+    retention.set_defaults(func=_retention)
+
+    purge = sub.add_parser(
+        "purge-idempotency-keys", help="delete Idempotency-Keys past their TTL"
+    )
+    purge.add_argument(
+        "--older-than-hours", type=int, default=settings.IDEMPOTENCY_KEY_TTL_HOURS
+    )
+    purge.set_defaults(func=_purge_idempotency_keys)
+
+    slow = sub.add_parser("slow-traces", help="slowest traces in the span file")
+    slow.add_argument("--file", default=settings.TRACE_FILE)
+    slow.add_argument("--root", default="analysis", help="root span name")
+    slow.add_argument("--limit", type=int, default=10)
+    slow.set_defaults(func=_slow_traces)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import FileResponse, PlainTextResponse
+
+from app.core.profiling import admin_token_matches, profile_store
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    if not admin_token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    Saved request profiles, newest first, with their slowest functions.
+    """
+    store = profile_store()
+    return {"max_files": store.max_files, "profiles": store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+def download_profile(
+    profile_id: str,
+    format: str = Query("prof", pattern="^(prof|text)$"),
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$"),
+):
+    """
+    The profile in pstats format (`python -m pstats`, snakeviz), or with
+    format=text the top of its pstats report.
+    """
+    store = profile_store()
+    if format == "text":
+        report = store.render(profile_id, sort=sort)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Profile not found")
+        return PlainTextResponse(report)
+
+    path = store.prof_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=f"{profile_id}.prof"
+    )
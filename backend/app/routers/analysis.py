@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-import json
 
+from app.core.profiling import profiled
+from app.core.tracing import span
 from app.db.session import get_db
-from app.db.models import AnalysisRun
+from app.schemas.analysis import AnalysisRunOut
+from app.services.analysis_service import dump_json, get_analysis_run
+from app.services.response_cache import (
+    MAX_AGE_S,
+    analysis_cache,
+    etag_matches,
+    private_cache_control,
+)
+from app.services.retention_service import retention_deadline
 
 from fastapi.responses import StreamingResponse
 from io import BytesIO
@@ -15,53 +27,53 @@ import textwrap
 router = APIRouter(prefix="/analysis", tags=["analysis"])
 
 
-def _maybe_json(value, default):
-  """
-  Safely convert JSONB/text field to Python object.
-  """
-  if value is None:
-      return default
-  if isinstance(value, (dict, list)):
-      return value
-  try:
-      return json.loads(value)
-  except Exception:
-      return default
-
-
-@router.get("/{run_id}")
-def get_analysis(run_id: int, db: Session = Depends(get_db)):
+@router.get("/{run_id}", response_model=AnalysisRunOut)
+def get_analysis(
+    run_id: int,
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+):
     """
     Fetch a persisted AnalysisRun by its primary key ID.
-    """
-    run = db.query(AnalysisRun).filter(AnalysisRun.id == run_id).first()
-
-    if not run:
-        raise HTTPException(status_code=404, detail="Analysis run not found")
 
-    skills = _maybe_json(getattr(run, "skills_json", None), {})
-    gap_report = _maybe_json(getattr(run, "gap_report_json", None), {})
-    projects = _maybe_json(getattr(run, "projects_json", None), [])
-
-    return {
-        "id": run.id,
-        "target_role": run.target_role,
-        "skills": skills,
-        "gap_report": gap_report,
-        "roadmap_md": run.roadmap_md or "",
-        "projects": projects,
-    }
+    Runs are immutable once written, so the serialized response is kept in an
+    in-process LRU (repeat reads never query the DB) and sent with a strong ETag and
+    a private Cache-Control; If-None-Match requests get a 304. Both caches expire
+    when the retention job may remove the run (it runs in another process).
+    """
+    cached = analysis_cache.get(run_id)
+    if cached is None:
+        run = get_analysis_run(db, run_id)
+
+        if not run:
+            raise HTTPException(status_code=404, detail="Analysis run not found")
+
+        expires_at = None
+        if run.created_at:
+            created_at = datetime.fromisoformat(run.created_at)
+            expires_at = retention_deadline(created_at).timestamp()
+        cached = analysis_cache.put(run_id, dump_json(run), expires_at)
+
+    body, etag, expires_at = cached
+    max_age = MAX_AGE_S if expires_at is None else expires_at - time.time()
+    headers = {"ETag": etag, "Cache-Control": private_cache_control(max_age)}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 #Generate a simple PDF report for the given analysis run_id.
 @router.get("/{run_id}/report")
+@profiled
 def get_analysis_report(run_id: int, db: Session = Depends(get_db)):
-    run = db.query(AnalysisRun).filter(AnalysisRun.id == run_id).first()
+    with span("report", run_id=run_id):
+        return _render_report(run_id, db)
+
+
+def _render_report(run_id: int, db: Session) -> StreamingResponse:
+    run = get_analysis_run(db, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Analysis run not found")
-
-    skills = _maybe_json(getattr(run, "skills_json", None), {})
-    gap_report = _maybe_json(getattr(run, "gap_report_json", None), {})
-    projects = _maybe_json(getattr(run, "projects_json", None), [])
+    gap_report = run.gap_report
 
     buffer = BytesIO()
     pdf = canvas.Canvas(buffer, pagesize=A4)
@@ -98,9 +110,8 @@ def get_analysis_report(run_id: int, db: Session = Depends(get_db)):
 
     # Summary / Gap overview
     write_line("1. Summary", bold=True)
-    summary = gap_report.get("summary") if isinstance(gap_report, dict) else None
-    if summary:
-        write_line(summary)
+    if gap_report.summary:
+        write_line(gap_report.summary)
     else:
         write_line(
             "No detailed summary available for this run. The engine compared your skills "
@@ -109,7 +120,7 @@ def get_analysis_report(run_id: int, db: Session = Depends(get_db)):
     y -= 10
 
     # Strengths
-    strengths = gap_report.get("strengths", []) if isinstance(gap_report, dict) else []
+    strengths = gap_report.strengths
     write_line("2. Strengths", bold=True)
     if strengths:
         write_line(f"Matched skills ({len(strengths)}): " + ", ".join(strengths[:40]))
@@ -118,14 +129,8 @@ def get_analysis_report(run_id: int, db: Session = Depends(get_db)):
     y -= 10
 
     # Gaps
-    missing_core = (
-        gap_report.get("missing_core", []) if isinstance(gap_report, dict) else []
-    )
-    missing_nice = (
-        gap_report.get("missing_nice_to_have", [])
-        if isinstance(gap_report, dict)
-        else []
-    )
+    missing_core = gap_report.missing_core
+    missing_nice = gap_report.missing_nice_to_have
 
     write_line("3. Gaps", bold=True)
     if missing_core:
@@ -145,12 +150,12 @@ def get_analysis_report(run_id: int, db: Session = Depends(get_db)):
 
     # Projects
     write_line("4. Suggested Projects", bold=True)
-    if projects:
-        for idx, p in enumerate(projects[:8], start=1):
-            title = p.get("title") or p.get("name") or f"Project {idx}"
-            desc = p.get("description") or ""
-            difficulty = p.get("difficulty") or ""
-            skills_list = p.get("skills") or []
+    if run.projects:
+        for idx, p in enumerate(run.projects[:8], start=1):
+            title = p.title or f"Project {idx}"
+            desc = p.description or ""
+            difficulty = p.difficulty or ""
+            skills_list = p.skills
 
             write_line(f"{idx}. {title}", bold=True)
             if desc:
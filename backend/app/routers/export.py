@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.routers.admin import require_admin
+from app.services.export_service import ExportError, export_runs
+
+# bulk access to every stored analysis: same X-Admin-Token check as /admin
+router = APIRouter(
+    prefix="/export", tags=["export"], dependencies=[Depends(require_admin)]
+)
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@router.get("/runs")
+def export_analysis_runs(
+    format: str = Query("ndjson", pattern="^(ndjson|parquet)$"),
+    role: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = Query(1000, ge=1, le=50_000),
+):
+    """
+    Stream all analysis runs (optionally filtered by target role and created_at
+    range [since, until)) as NDJSON or Parquet. Rows are read through a server-side
+    cursor and sent chunk by chunk, so memory use does not grow with the export.
+    """
+    try:
+        chunks = export_runs(format, role, since, until, chunk_size)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="analysis_runs.{format}"'
+        },
+    )
@@ -1,7 +1,60 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.admission import analyze_admission
+from app.core.llm_limiter import limiter_status
+from app.core.llm_resilience import breaker_status
+from app.core.llm_router import get_router
+from app.core.warmup import warmup_state
+from app.services.prompt_builder import prompt_stats
+from app.services.response_cache import analysis_cache
+from app.services.structured_output import output_stats
 
 router = APIRouter(tags=["health"])
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    """
+    Readiness for load balancers: 200 once startup warm-up has finished, 503 with
+    its progress until then. /health only says the process is up.
+    """
+    state = warmup_state.snapshot()
+    if not state["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **state})
+    return {"status": "ready", **state}
+
+
+@router.get("/health/llm")
+def llm_health():
+    """
+    Circuit breaker and rate limiter state per LLM provider, provider routing and
+    hedging, prompt token counts and structured-output parse/fallback counts.
+    """
+    return {
+        **breaker_status(),
+        "routing": get_router().snapshot(),
+        "rate_limiting": limiter_status(),
+        "prompts": prompt_stats.snapshot(),
+        "structured_output": output_stats.snapshot(),
+    }
+
+
+@router.get("/health/cache")
+def cache_health():
+    """
+    Occupancy and hit rate of the GET /analysis/{run_id} response cache.
+    """
+    return {"analysis": analysis_cache.snapshot()}
+
+
+@router.get("/health/admission")
+def admission_health():
+    """
+    In-flight analyses, wait queue depth and shed counts for this worker.
+    """
+    return {"analyze": analyze_admission.snapshot()}
@@ -1,66 +1,244 @@
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
+from typing import List, Optional
+
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    Form,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.core.admission import SLOT_SCOPE_KEY
+from app.core.config import settings
+from app.core.profiling import profiled
+from app.core.tracing import log_error, log_event, span
+from app.db.session import SessionLocal, get_db
 from app.db.models import AnalysisRun
-from app.services.parser_service import extract_text_from_file
+from app.schemas.analysis import AnalyzeResponse, NextSkillsResponse
+from app.services.analysis_service import create_analysis_run, dump_json
+from app.services.parser_service import parse_document
 from app.services.skill_service import extract_skills_pipeline
 from app.services.gap_service import compute_gap_report
 from app.services.roadmap_service import generate_roadmap
 from app.services.project_service import recommend_projects
+from app.services.plan_service import generate_plan
+from app.services.idempotency_service import (
+    KeyReused,
+    StillRunning,
+    execute_once,
+    request_fingerprint,
+)
+from app.services.candidate_ranking import index_candidate
+from app.services.run_reuse import adapt_roadmap, find_similar_run, index_run
+from app.services.skill_cooccurrence import (
+    get_cooccurrence_model,
+    next_skills,
+    record_run,
+    sync_cooccurrence,
+)
 
 router = APIRouter(prefix="/mentor", tags=["mentor"])
 
 
-@router.post("/analyze")
-async def analyze_cv(
-    file: UploadFile = File(...),
-    target_role: str = Form(...),
-    db: Session = Depends(get_db),
-):
+@profiled
+def run_analysis(
+    db: Session, text: str, page_count: int | None, target_role: str
+) -> AnalyzeResponse:
     """
-    Analyze a CV and persist the run in Postgres.
+    Steps 2-7 of the analysis. Blocking (CPU work and LLM calls), so the endpoint runs
+    it in the threadpool and the event loop stays free for cheap requests.
     """
-    try:
-        # 1) Parse CV
-        text = await extract_text_from_file(file)
-
-        # 2) Extract skills
+    # 2) Extract skills
+    with span("skills", chars=len(text)) as s:
         skills = extract_skills_pipeline(text)
+        s.set(
+            skills_found=len(skills.get("validated_skills", [])),
+            domains=len(skills.get("inferred_domains", [])),
+        )
 
-        # 3) Compute gaps for target role
+    # 3) Compute gaps for target role
+    with span("gap", target_role=target_role) as s:
         gap = compute_gap_report(skills, target_role)
+        s.set(
+            strengths=len(gap.get("strengths", [])),
+            missing_core=len(gap.get("missing_core", [])),
+            missing_nice_to_have=len(gap.get("missing_nice_to_have", [])),
+        )
 
+    # 4+5) Reuse a near-identical prior run (RUN_REUSE_ENABLED) instead of the LLM
+    reused_from = None
+    with span("reuse_lookup") as s:
+        similar = find_similar_run(db, target_role, skills, gap)
+        prior = db.get(AnalysisRun, similar[0]) if similar else None
+        s.set(found=prior is not None)
+    if prior is not None and prior.roadmap_md:
+        reused_from = {"run_id": prior.id, "jaccard": round(similar[1], 4)}
+        roadmap_md = adapt_roadmap(prior.roadmap_md, gap, prior.gap_report_json or {})
+        projects = prior.projects_json or []
+        log_event(
+            "ANALYSIS_REUSED", prior_run_id=prior.id, jaccard=round(similar[1], 3)
+        )
+    elif settings.LLM_COMBINED_GENERATION:
+        # 4+5) Roadmap and projects from a single LLM call
+        roadmap_md, projects = generate_plan(skills, gap, target_role)
+    else:
         # 4) Generate roadmap text
         roadmap_md = generate_roadmap(skills, gap, target_role)
 
         # 5) Recommend projects
         projects = recommend_projects(skills, gap, target_role)
 
-        # 6) Persist in DB
-        run = AnalysisRun(
-            target_role=target_role,
-            skills_json=skills,
-            gap_report_json=gap,
-            projects_json=projects,
-            roadmap_md=roadmap_md,
+    # 6) Persist in DB
+    with span("persist") as s:
+        run = create_analysis_run(
+            db,
+            {
+                "target_role": target_role,
+                "skills": skills,
+                "gap_report": gap,
+                "roadmap_md": roadmap_md,
+                "projects": projects,
+                "cv_text": text,
+                "page_count": page_count,
+            },
         )
-        db.add(run)
-        db.commit()
-        db.refresh(run)
-
-        print(f"ANALYSIS_PERSISTED: run.id={run.id}, target_role={target_role}")
-
-        # 7) Return run_id to frontend
-        return {
-            "run_id": run.id,
-            "target_role": target_role,
-            "skills": skills,
-            "gap_report": gap,
-            "roadmap_md": roadmap_md,
-            "projects": projects,
-        }
-
-    except Exception as e:
-        print("ANALYZE_ERROR:", repr(e))
-        raise HTTPException(status_code=500, detail="Failed to analyze CV")
+        s.set(run_id=run.id)
+
+        index_run(run.id, target_role, skills, gap)
+        index_candidate(run.id, target_role, skills)
+        record_run(run.id, target_role, skills)
+
+        log_event("ANALYSIS_PERSISTED", run_id=run.id, target_role=target_role)
+
+    # 7) Return run_id to frontend
+    return AnalyzeResponse(
+        run_id=run.id,
+        target_role=target_role,
+        skills=skills,
+        gap_report=gap,
+        roadmap_md=roadmap_md,
+        projects=projects,
+        reused=reused_from is not None,
+        reused_from=reused_from,
+    )
+
+
+def run_analysis_in_session(
+    text: str, page_count: int | None, target_role: str
+) -> AnalyzeResponse:
+    # on its own session: a shielded analysis outlives the request and the request's
+    # session (closed by get_db's teardown)
+    db = SessionLocal()
+    try:
+        return run_analysis(db, text, page_count, target_role)
+    finally:
+        db.close()
+
+
+@router.post("/analyze", response_model=AnalyzeResponse)
+async def analyze_cv(
+    request: Request,
+    file: UploadFile = File(...),
+    target_role: str = Form(...),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+):
+    """
+    Analyze a CV and persist the run in Postgres.
+
+    Admission-controlled (app.core.admission): when too many analyses are running
+    or queued in this worker, the request gets a 503 with Retry-After.
+
+    With an Idempotency-Key header the pipeline runs at most once per key: retries
+    get the first request's run (header Idempotent-Replayed: true), waiting for it
+    if it is still running.
+    """
+
+    # the pipeline is shielded under an Idempotency-Key and may outlive the request:
+    # it works on the upload's bytes and holds the admission slot until it is done
+    filename, data = file.filename, await file.read()
+    slot = request.scope.get(SLOT_SCOPE_KEY)
+
+    async def pipeline() -> AnalyzeResponse:
+        if slot is not None:
+            slot.hold()
+        try:
+            # 1) Parse CV
+            with span("parse", filename=filename) as s:
+                text, page_count = await parse_document(data, filename)
+                s.set(pages=page_count, chars=len(text))
+
+            return await run_in_threadpool(
+                run_analysis_in_session, text, page_count, target_role
+            )
+        finally:
+            if slot is not None:
+                slot.release()
+
+    with span("analysis", target_role=target_role) as root:
+        try:
+            if not idempotency_key:
+                result, replayed = await pipeline(), False
+            else:
+                fingerprint = request_fingerprint(target_role, filename, data)
+                result, replayed = await execute_once(
+                    idempotency_key, fingerprint, pipeline
+                )
+            root.set(run_id=result.run_id, replayed=replayed, reused=result.reused)
+
+            headers = {"Idempotent-Replayed": "true"} if replayed else {}
+            if root.trace_id:
+                headers["X-Trace-Id"] = root.trace_id
+            return Response(
+                content=dump_json(result),
+                media_type="application/json",
+                headers=headers,
+            )
+
+        except KeyReused:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request",
+            )
+        except StillRunning:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "5"},
+            )
+        except Exception as e:
+            log_error("ANALYZE_ERROR", e, stack=True)
+            root.status = "error"
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to analyze CV",
+                headers={"X-Trace-Id": root.trace_id} if root.trace_id else None,
+            )
+
+
+@router.get("/next-skills", response_model=NextSkillsResponse)
+def suggest_next_skills(
+    target_role: Optional[str] = None,
+    skills: List[str] = Query([]),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """
+    Skills to learn next for someone with `skills` aiming at `target_role`, without
+    an LLM: scored on the skill co-occurrence matrix of the persisted runs and the
+    role's most frequent skills. Runs from other workers are picked up every
+    SKILL_COOCCURRENCE_SYNC_S.
+    """
+    if settings.SKILL_COOCCURRENCE_ENABLED:
+        sync_cooccurrence(db)
+    return NextSkillsResponse(
+        target_role=target_role,
+        runs=get_cooccurrence_model().runs,
+        suggestions=next_skills(target_role, skills, limit),
+    )
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.core.tracing import span
+from app.db.session import get_db
+from app.schemas.analysis import RankRequest, RankResponse
+from app.services.candidate_ranking import rank_candidates
+
+router = APIRouter(prefix="/recruiter", tags=["recruiter"])
+
+
+@router.post("/rank", response_model=RankResponse)
+def rank(request: RankRequest, db: Session = Depends(get_db)):
+    """
+    Rank every stored analysis run against a job description.
+
+    The JD's skills come from the CV skill extractor (cached by JD hash); all runs
+    are scored at once on an in-memory candidate x skill matrix that picks up new
+    runs incrementally. Score = share of the JD's skills a run has; ties go to the
+    newest run.
+    """
+    with span("recruiter.rank", top_k=request.top_k) as s:
+        result = rank_candidates(
+            db, request.job_description, request.top_k, request.target_role
+        )
+        s.set(
+            jd_skills=len(result["jd_skills"]),
+            cached=result["cached"],
+            candidates=result["candidates_indexed"],
+        )
+        return result
@@ -29,17 +29,80 @@ class ProjectRecommendation(BaseModel):
   estimated_duration_weeks: Optional[int] = None
 
 
+#Response of GET /analysis/{run_id}
+
 class AnalysisRunOut(BaseModel):
   id: int
   target_role: str
-  cv_text: str
 
   skills: SkillProfile
   gap_report: GapReport
-  roadmap_md: str
-  projects: List[ProjectRecommendation]
+  roadmap_md: str = ""
+  projects: List[ProjectRecommendation] = Field(default_factory=list)
 
   created_at: Optional[str] = None
 
   class Config:
     from_attributes = True  #Allow objects to be used.
+
+
+#Prior run whose roadmap/projects were reused
+
+class ReusedRun(BaseModel):
+  run_id: int
+  jaccard: float
+
+
+#Response of POST /mentor/analyze
+
+class AnalyzeResponse(BaseModel):
+  run_id: int
+  target_role: str
+
+  skills: SkillProfile
+  gap_report: GapReport
+  roadmap_md: str = ""
+  projects: List[ProjectRecommendation] = Field(default_factory=list)
+
+  reused: bool = False
+  reused_from: Optional[ReusedRun] = None
+
+
+#Recruiter mode: rank stored runs against a job description
+
+class RankRequest(BaseModel):
+  job_description: str = Field(..., min_length=1, max_length=100_000)
+  top_k: int = Field(20, ge=1, le=500)
+  target_role: Optional[str] = None  #only runs analyzed for this role
+
+
+class RankedCandidate(BaseModel):
+  run_id: int
+  target_role: str
+  score: float  #share of the JD's skills the run has
+  matched: List[str] = Field(default_factory=list)
+  missing: List[str] = Field(default_factory=list)
+  created_at: Optional[str] = None
+
+
+class RankResponse(BaseModel):
+  jd_hash: str
+  jd_skills: List[str] = Field(default_factory=list)
+  cached: bool = False  #JD skills came from the JD cache
+  candidates_indexed: int = 0
+  candidates: List[RankedCandidate] = Field(default_factory=list)
+
+
+#Next-skill suggestions from the skill co-occurrence model
+
+class NextSkill(BaseModel):
+  skill: str
+  score: float
+  role_share: Optional[float] = None  #share of the role's runs listing the skill
+  because: Optional[str] = None  #known skill it most often comes with
+
+
+class NextSkillsResponse(BaseModel):
+  target_role: Optional[str] = None
+  runs: int = 0  #runs the model was built from
+  suggestions: List[NextSkill] = Field(default_factory=list)
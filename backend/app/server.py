@@ -0,0 +1,212 @@
+"""
+Production server: a pre-forking master in front of uvicorn workers.
+
+    python -m app.server                 # SERVER_WORKERS workers on SERVER_HOST:SERVER_PORT
+    python -m app.server --workers 8 --port 8000
+
+The master imports the app and loads the taxonomy, role map and matcher indexes once,
+freezes the GC so those objects are never touched by collections, binds the socket and
+forks. Workers inherit the loaded data through copy-on-write pages instead of each
+building a private copy. A worker is recycled (gracefully) after SERVER_MAX_REQUESTS
+requests or when its private memory exceeds SERVER_MAX_WORKER_MB; the master replaces
+it. SIGTERM/SIGINT drain all workers within SERVER_GRACEFUL_TIMEOUT_S.
+"""
+
+import argparse
+import gc
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def preload() -> None:
+    """
+    Build everything read-only that workers would otherwise build on first use.
+    """
+    from app.core.warmup import load_indexes
+
+    load_indexes()
+
+
+def private_memory_mb(pid: Optional[int] = None) -> Optional[float]:
+    """
+    Unique (non-shared) memory of a process: RSS minus pages still shared with the
+    master, so copy-on-write data does not count against every worker. Linux only.
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            private_kb = sum(
+                int(line.split()[1])
+                for line in f
+                if line.startswith(("Private_Clean:", "Private_Dirty:"))
+            )
+        return private_kb / 1024.0
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def worker_count(requested: int) -> int:
+    return requested if requested > 0 else (os.cpu_count() or 1)
+
+
+def _watch_memory(server: uvicorn.Server, limit_mb: float, interval_s: float) -> None:
+    while not server.should_exit:
+        used = private_memory_mb()
+        if used is not None and used > limit_mb:
+            print(
+                f"WORKER_RECYCLE: pid={os.getpid()} private_mb={used:.0f} > {limit_mb:.0f}"
+            )
+            server.should_exit = True  # finish in-flight requests, then exit
+            return
+        time.sleep(interval_s)
+
+
+def _run_worker(sock: socket.socket, app) -> None:
+    # connections opened by the master must not be shared with children
+    from app.db.session import engine
+
+    engine.dispose(close=False)
+    random.seed()
+
+    max_requests = settings.SERVER_MAX_REQUESTS
+    if max_requests > 0 and settings.SERVER_MAX_REQUESTS_JITTER > 0:
+        # stagger recycling so workers do not restart all at once
+        max_requests += random.randint(0, settings.SERVER_MAX_REQUESTS_JITTER)
+
+    config = uvicorn.Config(
+        app,
+        lifespan="on",
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_TIMEOUT_S,
+        limit_max_requests=max_requests or None,
+        log_level=settings.SERVER_LOG_LEVEL,
+    )
+    server = uvicorn.Server(config)
+    if settings.SERVER_MAX_WORKER_MB > 0:
+        threading.Thread(
+            target=_watch_memory,
+            args=(server, settings.SERVER_MAX_WORKER_MB, 5.0),
+            daemon=True,
+        ).start()
+    server.run(sockets=[sock])
+
+
+class PreforkMaster:
+    def __init__(self, app, host: str, port: int, workers: int):
+        self.app = app
+        self.workers = workers
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+        self.children: Dict[int, float] = {}  # pid -> started at
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                _run_worker(self.sock, self.app)
+            except BaseException as e:
+                print(f"WORKER_ERROR: pid={os.getpid()} {e!r}")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _stop(self, signum, frame) -> None:
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self.spawn()
+        print(f"SERVER_STARTED: master={os.getpid()} workers={list(self.children)}")
+
+        while not self.stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid and pid in self.children:
+                started = self.children.pop(pid)
+                print(f"WORKER_EXITED: pid={pid} status={status}")
+                if not self.stopping:
+                    # avoid a tight crash loop when workers die right after start
+                    if time.monotonic() - started < 1.0:
+                        time.sleep(1.0)
+                    self.spawn()
+                continue
+            time.sleep(0.2)
+
+        return self.shutdown()
+
+    def shutdown(self) -> int:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+        deadline = time.monotonic() + settings.SERVER_GRACEFUL_TIMEOUT_S + 5.0
+        while self.children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.children.pop(pid, None)
+            else:
+                time.sleep(0.1)
+
+        for pid in list(self.children):
+            print(f"WORKER_KILLED: pid={pid} (graceful timeout)")
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self.sock.close()
+        print("SERVER_STOPPED")
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CareerGENAI pre-forking server")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.SERVER_WORKERS,
+        help="0 = one per CPU core",
+    )
+    args = parser.parse_args(argv)
+
+    from app.main import app
+
+    preload()
+    # objects created so far are never collected; keeps GC from dirtying shared pages
+    gc.collect()
+    gc.freeze()
+
+    master = PreforkMaster(app, args.host, args.port, worker_count(args.workers))
+    return master.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
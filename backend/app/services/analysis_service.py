@@ -1,42 +1,112 @@
+import hashlib
+import json
+import zlib
+from typing import Any, List, Optional
+
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from ..db.models import AnalysisRun
-from ..schemas.analysis import AnalysisRunOut, SkillProfile, GapReport, ProjectRecommendation
+from ..db.models import AnalysisRun, CVDocument
+from ..schemas.analysis import (
+  AnalysisRunOut, AnalyzeResponse, SkillProfile, GapReport, ProjectRecommendation,
+)
+
+
+# zlib level 6 stores typical CV text at roughly a third of its size
+CV_TEXT_COMPRESSION_LEVEL = 6
+
+
+def get_or_create_cv_document(
+  db: Session, text: str, page_count: Optional[int] = None
+) -> CVDocument:
+  """
+  Store extracted CV text compressed, de-duplicated by its sha256 content hash.
+  Not committed here; the caller commits together with the run.
+  """
+  raw = text.encode("utf-8")
+  content_hash = hashlib.sha256(raw).hexdigest()
+  doc = db.query(CVDocument).filter(CVDocument.content_hash == content_hash).first()
+  if doc is not None:
+    return doc
+
+  compressed = zlib.compress(raw, CV_TEXT_COMPRESSION_LEVEL)
+  doc = CVDocument(
+    content_hash=content_hash,
+    codec="zlib",
+    text_compressed=compressed,
+    original_size=len(raw),
+    compressed_size=len(compressed),
+    page_count=page_count,
+  )
+  try:
+    # savepoint: a concurrent upload of the same CV may insert the hash first
+    with db.begin_nested():
+      db.add(doc)
+  except IntegrityError:
+    doc = db.query(CVDocument).filter(CVDocument.content_hash == content_hash).one()
+  return doc
 
 
-def create_analysis_run(db: Session, data: dict) -> int:
+def create_analysis_run(db: Session, data: dict) -> AnalysisRun:
   """
-  Persist a new analysis run and return its ID.
+  Persist a new analysis run and return it (with its ID).
+  `cv_text` (and optionally `page_count`) are stored in cv_documents.
   """
   run = AnalysisRun(
     target_role=data["target_role"],
-    cv_text=data["cv_text"],
-    skills=data["skills"],
-    gap_report=data["gap_report"],
+    skills_json=data["skills"],
+    gap_report_json=data["gap_report"],
     roadmap_md=data["roadmap_md"],
-    projects=data["projects"],
+    projects_json=data["projects"],
   )
+  if data.get("cv_text"):
+    run.cv_document = get_or_create_cv_document(db, data["cv_text"], data.get("page_count"))
   db.add(run)
   db.commit()
   db.refresh(run)
-  return run.id
+  return run
+
+
+def _maybe_json(value: Any, default: Any) -> Any:
+  """
+  JSON columns come back as dicts/lists; older rows may hold JSON text.
+  """
+  if value is None:
+    return default
+  if isinstance(value, (dict, list)):
+    return value
+  try:
+    return json.loads(value)
+  except Exception:
+    return default
+
+
+def _projects(raw: Any) -> List[ProjectRecommendation]:
+  # skip malformed items from older rows instead of failing the whole response
+  projects = []
+  for item in raw if isinstance(raw, list) else []:
+    try:
+      projects.append(ProjectRecommendation.model_validate(item))
+    except ValidationError:
+      continue
+  return projects
 
 
 def _to_schema(run: AnalysisRun) -> AnalysisRunOut:
   """
   Convert AnalysisRun ORM instance to AnalysisRunOut schema.
   """
-  skills = SkillProfile(**(run.skills or {}))
-  gap_report = GapReport(**(run.gap_report or {}))
-  projects = [ProjectRecommendation(**p) for p in (run.projects or [])]
+  skills = _maybe_json(run.skills_json, {})
+  gap_report = _maybe_json(run.gap_report_json, {})
 
   return AnalysisRunOut(
     id=run.id,
     target_role=run.target_role,
-    cv_text=run.cv_text,
-    skills=skills,
-    gap_report=gap_report,
-    roadmap_md=run.roadmap_md,
-    projects=projects,
+    skills=SkillProfile.model_validate(skills if isinstance(skills, dict) else {}),
+    gap_report=GapReport.model_validate(gap_report if isinstance(gap_report, dict) else {}),
+    roadmap_md=run.roadmap_md or "",
+    projects=_projects(_maybe_json(run.projects_json, [])),
     created_at=run.created_at.isoformat() if run.created_at else None,
   )
 
@@ -46,3 +116,39 @@ def get_analysis_run(db: Session, run_id: int) -> AnalysisRunOut | None:
   if not run:
     return None
   return _to_schema(run)
+
+
+def get_analyze_response(db: Session, run_id: int) -> AnalyzeResponse | None:
+  """
+  POST /mentor/analyze response rebuilt from a stored run (idempotent replays).
+  """
+  run = db.query(AnalysisRun).filter(AnalysisRun.id == run_id).first()
+  if not run:
+    return None
+  out = _to_schema(run)
+  return AnalyzeResponse(
+    run_id=out.id,
+    target_role=out.target_role,
+    skills=out.skills,
+    gap_report=out.gap_report,
+    roadmap_md=out.roadmap_md,
+    projects=out.projects,
+  )
+
+
+def get_cv_text(db: Session, run_id: int) -> str | None:
+  """
+  Decompressed CV text of a run, for re-analysis without a re-upload.
+  """
+  run = db.query(AnalysisRun).filter(AnalysisRun.id == run_id).first()
+  if not run or run.cv_document is None:
+    return None
+  return run.cv_document.text
+
+
+def dump_json(model: Any) -> bytes:
+  """
+  Serialize a response model straight to JSON bytes with pydantic-core,
+  skipping FastAPI's jsonable_encoder round trip.
+  """
+  return to_json(model)
@@ -0,0 +1,296 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .run_index import SyncedRuns, Vocab, skills_of, sync_runs
+from .skill_service import extract_skills_pipeline
+
+
+class CandidateIndex:
+    """
+    Boolean candidate x skill matrix over persisted runs (one candidate per run, one
+    skill per normalized name), so a job description is scored against every run
+    with a few vectorized operations instead of a loop over JSON.
+
+    Stored skill-major (`_matrix[skill, candidate]`): each of a JD's skills is one
+    contiguous row, and a run's match count is the sum of those rows. Both axes grow
+    by doubling, so adding a run is amortized O(skills). Removed runs (archived by
+    the retention job) are only masked out.
+    """
+
+    def __init__(self, rows: int = 1024, cols: int = 64):
+        self._matrix = np.zeros((cols, rows), dtype=bool)
+        self._run_ids = np.zeros(rows, dtype=np.int64)
+        self._role_codes = np.zeros(rows, dtype=np.int32)
+        self._alive = np.zeros(rows, dtype=bool)
+        self.size = 0
+        self.skills = Vocab()  # skill -> matrix row
+        self.roles = Vocab()  # role -> code in _role_codes
+        self.synced = SyncedRuns()
+        self._row_of: Dict[int, int] = {}  # run id -> candidate (matrix column)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, run_id: int) -> bool:
+        return run_id in self._row_of
+
+    def _skill(self, skill: str) -> int:
+        idx = self.skills.add(skill)
+        if idx >= self._matrix.shape[0]:
+            grown = np.zeros(
+                (2 * self._matrix.shape[0], self._matrix.shape[1]), dtype=bool
+            )
+            grown[: self._matrix.shape[0]] = self._matrix
+            self._matrix = grown
+        return idx
+
+    def _grow_candidates(self) -> None:
+        rows = 2 * self._matrix.shape[1]
+        matrix = np.zeros((self._matrix.shape[0], rows), dtype=bool)
+        matrix[:, : self.size] = self._matrix[:, : self.size]
+        self._matrix = matrix
+        for name in ("_run_ids", "_role_codes", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(rows, dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def add(self, run_id: int, role: str, skills: Iterable[str]) -> bool:
+        """
+        Index a run; False if it is already indexed.
+        """
+        with self._lock:
+            if run_id in self._row_of:
+                return False
+            idx = [self._skill(s) for s in skills if isinstance(s, str) and s.strip()]
+            if self.size == self._matrix.shape[1]:
+                self._grow_candidates()
+            row = self.size
+            self._matrix[idx, row] = True
+            self._run_ids[row] = run_id
+            self._role_codes[row] = self.roles.add(role or "")
+            self._alive[row] = True
+            self._row_of[run_id] = row
+            self.synced.add(run_id)
+            self.size += 1
+            return True
+
+    def remove(self, run_id: int) -> None:
+        with self._lock:
+            row = self._row_of.pop(run_id, None)
+            if row is not None:
+                self._alive[row] = False
+
+    def _top(self, score: np.ndarray, k: int) -> np.ndarray:
+        """
+        Candidates with the k highest scores (0 = not eligible), ties broken by the
+        newest run, best first. Finds the k-th score from a histogram, so only the
+        candidates tied at that score are ordered by run id.
+        """
+        hist = np.bincount(score)
+        above = 0
+        threshold = len(hist) - 1
+        while threshold > 1 and above + hist[threshold] < k:
+            above += hist[threshold]
+            threshold -= 1
+        winners = np.flatnonzero(score > threshold)
+        ties = np.flatnonzero(score == threshold)
+        need = k - len(winners)
+        if len(ties) > need:
+            cut = np.argpartition(self._run_ids[ties], len(ties) - need)
+            ties = ties[cut[len(ties) - need :]]
+        top = np.concatenate([winners, ties])
+        # lexsort: last key is primary
+        order = np.lexsort((-self._run_ids[top], -score[top].astype(np.int64)))
+        return top[order]
+
+    def rank(
+        self, required: List[str], top_k: int, role: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        The `top_k` runs covering most of `required`, best first (ties: newest run).
+        Each result has run_id, target_role, score (share of required skills
+        matched), matched and missing skills.
+        """
+        required = list(dict.fromkeys(s.strip() for s in required if s.strip()))
+        with self._lock:
+            n = self.size
+            eligible = self._alive[:n]
+            if role is not None:
+                code = self.roles.get(role)
+                if code is None:
+                    return []
+                eligible = eligible & (self._role_codes[:n] == code)
+            k = min(top_k, int(np.count_nonzero(eligible)))
+            if k <= 0:
+                return []
+            known = [(s, self.skills.get(s)) for s in required]
+            known = [(s, idx) for s, idx in known if idx is not None]
+            # score = 1 + matched skills for eligible runs, 0 for the rest
+            score = eligible.astype(np.uint16)
+            for _, idx in known:
+                score += self._matrix[idx, :n]
+            score *= eligible
+            top = self._top(score, k)
+            hits = self._matrix[np.ix_([idx for _, idx in known], top)].T
+            run_ids = self._run_ids[top].tolist()
+            roles = [self.roles.names[c] for c in self._role_codes[top]]
+
+        results = []
+        for i, run_id in enumerate(run_ids):
+            have = {s for (s, _), hit in zip(known, hits[i]) if hit}
+            results.append(
+                {
+                    "run_id": run_id,
+                    "target_role": roles[i],
+                    "score": round(len(have) / max(len(required), 1), 4),
+                    "matched": [s for s in required if s in have],
+                    "missing": [s for s in required if s not in have],
+                }
+            )
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "candidates": len(self._row_of),
+                "skills": len(self.skills),
+                "roles": len(self.roles),
+                "synced_id": self.synced.synced_id,
+                "matrix_mb": round(self._matrix.nbytes / 1024 / 1024, 2),
+            }
+
+
+_index: Optional[CandidateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_candidate_index() -> CandidateIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CandidateIndex()
+        return _index
+
+
+def sync_candidate_index(db) -> int:
+    """
+    Add runs persisted since the last sync (by this or any other worker), starting
+    with every run on the first call. Returns the number of runs added.
+    """
+    from ..db.models import AnalysisRun
+
+    index = get_candidate_index()
+    return sync_runs(
+        db,
+        index.synced,
+        (AnalysisRun.target_role, AnalysisRun.skills_json),
+        lambda run_id, role, skills: index.add(run_id, role, skills_of(skills)),
+    )
+
+
+def index_candidate(run_id: int, target_role: str, skills: Dict[str, Any]) -> None:
+    if settings.RECRUITER_INDEX_ENABLED:
+        get_candidate_index().add(run_id, target_role, skills_of(skills))
+
+
+class _JDCache:
+    """
+    LRU of job-description hash -> extracted skills.
+    """
+
+    def __init__(self) -> None:
+        self._data: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List[str]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: List[str]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > max(settings.RECRUITER_JD_CACHE_SIZE, 0):
+                self._data.popitem(last=False)
+
+
+jd_cache = _JDCache()
+
+
+def jd_hash(job_description: str) -> str:
+    # whitespace-insensitive: the same JD pasted twice hashes the same
+    text = re.sub(r"\s+", " ", job_description).strip().lower()
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def jd_requirements(job_description: str) -> Tuple[str, List[str], bool]:
+    """
+    Skills required by a job description, from the CV skill extractor.
+    Returns (jd hash, skills, served from cache).
+    """
+    key = jd_hash(job_description)
+    skills = jd_cache.get(key)
+    if skills is not None:
+        return key, skills, True
+    skills = extract_skills_pipeline(job_description)["validated_skills"]
+    jd_cache.put(key, skills)
+    return key, skills, False
+
+
+def rank_candidates(
+    db, job_description: str, top_k: int, target_role: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Rank every stored run against a job description.
+    """
+    from ..db.models import AnalysisRun
+
+    key, required, cached = jd_requirements(job_description)
+    index = get_candidate_index()
+    sync_candidate_index(db)
+
+    while True:
+        ranked = index.rank(required, top_k, target_role)
+        ids = [r["run_id"] for r in ranked]
+        created = (
+            dict(
+                db.query(AnalysisRun.id, AnalysisRun.created_at)
+                .filter(AnalysisRun.id.in_(ids))
+                .all()
+            )
+            if ids
+            else {}
+        )
+        gone = [run_id for run_id in ids if run_id not in created]
+        if not gone:
+            break
+        # archived or deleted since they were indexed
+        for run_id in gone:
+            index.remove(run_id)
+
+    for r in ranked:
+        value = created.get(r["run_id"])
+        r["created_at"] = value.isoformat() if value is not None else None
+    return {
+        "jd_hash": key,
+        "jd_skills": required,
+        "cached": cached,
+        "candidates_indexed": len(index),
+        "candidates": ranked,
+    }
@@ -0,0 +1,187 @@
+import io
+import re
+import zipfile
+from typing import Iterator, List, Optional
+
+from lxml import etree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+_W = "{%s}" % W_NS
+
+_P, _T, _TAB, _BR, _CR = _W + "p", _W + "t", _W + "tab", _W + "br", _W + "cr"
+_TBL, _TR, _TC = _W + "tbl", _W + "tr", _W + "tc"
+_PSTYLE, _VAL = _W + "pStyle", _W + "val"
+# Word saves drawing objects (text boxes) twice: as mc:Choice (DrawingML) and again
+# as mc:Fallback (VML) for older readers. Only the Choice copy is read.
+_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_TAGS = (_P, _T, _TAB, _BR, _CR, _TR, _TC, _PSTYLE, _FALLBACK)
+
+_HEADER_PART_RE = re.compile(r"^word/header\d*\.xml$")
+
+# Common CV section titles, matched against short stand-alone paragraphs.
+SECTION_TITLES = {
+    "summary": "Summary",
+    "profile": "Summary",
+    "about me": "Summary",
+    "objective": "Summary",
+    "skills": "Skills",
+    "technical skills": "Skills",
+    "core skills": "Skills",
+    "key skills": "Skills",
+    "competencies": "Skills",
+    "core competencies": "Skills",
+    "tools": "Skills",
+    "technologies": "Skills",
+    "tech stack": "Skills",
+    "experience": "Experience",
+    "work experience": "Experience",
+    "professional experience": "Experience",
+    "employment": "Experience",
+    "employment history": "Experience",
+    "education": "Education",
+    "projects": "Projects",
+    "personal projects": "Projects",
+    "certifications": "Certifications",
+    "certificates": "Certifications",
+    "publications": "Publications",
+    "languages": "Languages",
+    "awards": "Awards",
+}
+
+
+class DocxBlock:
+    """
+    One unit of document text in reading order.
+    kind: "heading" | "paragraph" | "table_row" | "header"
+    section: the canonical CV section the block belongs to (None before the first).
+    """
+
+    __slots__ = ("kind", "text", "section")
+
+    def __init__(self, kind: str, text: str, section: Optional[str]):
+        self.kind = kind
+        self.text = text
+        self.section = section
+
+    def __repr__(self) -> str:
+        return f"DocxBlock({self.kind!r}, {self.text!r}, section={self.section!r})"
+
+
+def section_of(text: str, style: Optional[str] = None) -> Optional[str]:
+    """
+    Canonical section name if the paragraph looks like a CV section heading.
+    """
+    key = re.sub(r"[^a-z ]", "", text.lower()).strip()
+    if key in SECTION_TITLES:
+        return SECTION_TITLES[key]
+    if style and style.lower().startswith(("heading", "title")) and len(key) <= 40:
+        return text.strip()
+    return None
+
+
+def _iter_part(stream) -> Iterator[tuple]:
+    """
+    Yield ("p", text, style) for body paragraphs and ("row", text, None) for table
+    rows (cells joined with " | "), in document order.
+
+    Stack-based so nested structures work: paragraphs inside text boxes get their own
+    buffer, paragraphs inside table cells go to the cell rather than the output.
+    mc:Fallback subtrees (duplicate copies of text boxes) are skipped.
+    Parsed elements are cleared as soon as they end, keeping memory flat.
+    """
+    paragraphs: List[List[str]] = []  # text buffers of the open w:p elements
+    styles: List[Optional[str]] = []
+    cells: List[List[str]] = []  # paragraphs of the open w:tc elements
+    rows: List[List[str]] = []  # cell texts of the open w:tr elements
+    fallback_depth = 0  # open mc:Fallback elements
+
+    for event, elem in etree.iterparse(stream, events=("start", "end"), tag=_TAGS):
+        tag = elem.tag
+        if tag == _FALLBACK:
+            fallback_depth += 1 if event == "start" else -1
+            if event == "start":
+                continue
+        elif fallback_depth:
+            continue
+        elif event == "start":
+            if tag == _P:
+                paragraphs.append([])
+                styles.append(None)
+            elif tag == _TC:
+                cells.append([])
+            elif tag == _TR:
+                rows.append([])
+            continue
+
+        if tag == _T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == _TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (_BR, _CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == _PSTYLE:
+            if styles:
+                styles[-1] = elem.get(_VAL)
+        elif tag == _P:
+            text = "".join(paragraphs.pop()).strip()
+            style = styles.pop()
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield "p", text, style
+        elif tag == _TC:
+            text = " ".join(cells.pop())
+            if rows:
+                rows[-1].append(text)
+        elif tag == _TR:
+            row = [c for c in rows.pop() if c]
+            if row:
+                text = " | ".join(row)
+                if cells:  # nested table: the row belongs to the outer cell
+                    cells[-1].append(text)
+                else:
+                    yield "row", text, None
+
+        if tag not in (_T, _TAB, _BR, _CR, _PSTYLE):
+            # drop the finished subtree and already-processed siblings
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def iter_docx_blocks(data: bytes) -> Iterator[DocxBlock]:
+    """
+    Stream a .docx: header parts first, then word/document.xml, with paragraphs and
+    table rows in reading order and each block tagged with its CV section.
+    """
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+        for name in sorted(n for n in names if _HEADER_PART_RE.match(n)):
+            with zf.open(name) as part:
+                for _, text, _ in _iter_part(part):
+                    yield DocxBlock("header", text, None)
+
+        section: Optional[str] = None
+        with zf.open("word/document.xml") as part:
+            for kind, text, style in _iter_part(part):
+                heading = section_of(text, style) if kind == "p" else None
+                if heading:
+                    section = heading
+                    yield DocxBlock("heading", text, section)
+                else:
+                    yield DocxBlock(
+                        "paragraph" if kind == "p" else "table_row", text, section
+                    )
+
+
+def extract_docx_text(data: bytes) -> str:
+    """
+    Plain text of a .docx including tables, text boxes and headers; one block per line.
+    """
+    return "\n".join(block.text for block in iter_docx_blocks(data))
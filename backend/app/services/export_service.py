@@ -0,0 +1,183 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from pydantic_core import to_json
+from sqlalchemy import select
+
+from ..db.models import AnalysisRun
+from ..db.session import SessionLocal
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+
+# Columns exported per run (the CV document is not part of the export).
+_COLUMNS = (
+    AnalysisRun.id,
+    AnalysisRun.target_role,
+    AnalysisRun.created_at,
+    AnalysisRun.skills_json,
+    AnalysisRun.gap_report_json,
+    AnalysisRun.projects_json,
+    AnalysisRun.roadmap_md,
+)
+
+
+class ExportError(ValueError):
+    """Invalid export request (unknown format, missing optional dependency)."""
+
+
+def _query(role: Optional[str], since: Optional[datetime], until: Optional[datetime]):
+    stmt = select(*_COLUMNS).order_by(AnalysisRun.id)
+    if role:
+        stmt = stmt.where(AnalysisRun.target_role == role)
+    if since:
+        stmt = stmt.where(AnalysisRun.created_at >= since)
+    if until:
+        stmt = stmt.where(AnalysisRun.created_at < until)
+    return stmt
+
+
+def iter_run_batches(
+    role: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield runs as lists of up to `chunk_size` dicts.
+
+    Uses a server-side cursor (stream_results + yield_per), so memory stays
+    constant however many rows match. Opens its own session: a streaming response
+    outlives the request's get_db() session.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            _query(role, since, until).execution_options(
+                stream_results=True, yield_per=chunk_size
+            )
+        )
+        for partition in result.partitions():
+            yield [
+                {
+                    "id": row.id,
+                    "target_role": row.target_role,
+                    "created_at": (
+                        row.created_at.isoformat() if row.created_at else None
+                    ),
+                    "skills": row.skills_json,
+                    "gap_report": row.gap_report_json,
+                    "projects": row.projects_json,
+                    "roadmap_md": row.roadmap_md,
+                }
+                for row in partition
+            ]
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """
+    One JSON object per line; one bytes chunk per batch.
+    """
+    for batch in batches:
+        yield b"".join(to_json(row) + b"\n" for row in batch)
+
+
+class _ChunkSink:
+    """
+    Write-only file object for pyarrow that hands out what has been written so far.
+    tell() keeps counting across drains, so the Parquet footer offsets stay valid.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def parquet_chunks(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """
+    Parquet file written one row group per batch. Nested fields are JSON strings.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ExportError("Parquet export requires pyarrow") from e
+
+    schema = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("target_role", pa.string()),
+            ("created_at", pa.string()),
+            ("skills", pa.string()),
+            ("gap_report", pa.string()),
+            ("projects", pa.string()),
+            ("roadmap_md", pa.string()),
+        ]
+    )
+    json_fields = ("skills", "gap_report", "projects")
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            columns = {name: [row[name] for row in batch] for name in schema.names}
+            for name in json_fields:
+                columns[name] = [
+                    to_json(v).decode() if v is not None else None
+                    for v in columns[name]
+                ]
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_runs(
+    fmt: str,
+    role: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    chunk_size: int = 1000,
+) -> Iterator[bytes]:
+    """
+    Stream matching runs as NDJSON or Parquet bytes.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown export format '{fmt}'. Use one of {EXPORT_FORMATS}")
+    if fmt == "parquet":
+        # fail before the response starts if pyarrow is missing
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ExportError("Parquet export requires pyarrow") from e
+    batches = iter_run_batches(role, since, until, chunk_size)
+    return ndjson_chunks(batches) if fmt == "ndjson" else parquet_chunks(batches)
@@ -0,0 +1,255 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from ..core.config import settings
+from ..core.role_intel import load_skills_taxonomy
+
+_WORD_RE = re.compile(r"[A-Za-z0-9+#.]+")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9+#]")
+
+# Skill names shorter than this (after normalization) are too ambiguous to fuzz
+# ("r", "go").
+MIN_FUZZY_LEN = 4
+
+
+def _norm(text: str) -> str:
+    # "Postgre SQL" / "postgre-sql" / "PostgreSQL" all become "postgresql"
+    return _NON_ALNUM_RE.sub("", text.lower())
+
+
+def _gram_pairs(names: List[str], n: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized character n-gram extraction.
+
+    Each name is padded as "^name$" and all names are laid out in one byte buffer.
+    Every window of n bytes is packed into an int64 code (8 bits per char), windows
+    that cross a name boundary are dropped, and duplicate (name, code) pairs are
+    removed. Returns (row ids, n-gram codes, distinct n-grams per row).
+
+    (row, code) pairs are packed into one int64 too, so n is bounded by the number
+    of names: ValueError if 8 * n plus the bits of the largest row id exceed 63.
+    """
+    if n < 1 or 8 * n + max(len(names) - 1, 1).bit_length() > 63:
+        raise ValueError(f"n-gram size {n} does not fit an int64 code")
+    padded = [f"^{name}$" for name in names]
+    lengths = np.fromiter((len(p) for p in padded), dtype=np.int64, count=len(padded))
+    buf = np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8).astype(
+        np.int64
+    )
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    n_windows = buf.size - n + 1
+    if n_windows <= 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(len(names), dtype=np.int64)
+    codes = np.zeros(n_windows, dtype=np.int64)
+    for k in range(n):
+        codes = (codes << 8) | buf[k : k + n_windows]
+
+    # a window is valid when it lies entirely inside one padded name
+    row_of = np.repeat(np.arange(len(names), dtype=np.int64), lengths)[:n_windows]
+    valid = np.arange(n_windows) + n <= (starts + lengths)[row_of]
+    rows, codes = row_of[valid], codes[valid]
+
+    # de-duplicate (row, code) pairs: binary n-gram sets
+    key = (rows << (8 * n)) | codes
+    key = np.unique(key)
+    rows = key >> (8 * n)
+    codes = key & ((1 << (8 * n)) - 1)
+    counts = np.bincount(rows, minlength=len(names))
+    return rows, codes, counts
+
+
+# l-prefix filtering: candidates must share this many prefix n-grams (AdaptJoin-style).
+PREFIX_OVERLAP = 2
+
+
+def _prefix_mask(rows: np.ndarray, ranks: np.ndarray, counts: np.ndarray, t2: float):
+    """
+    l-prefix filter for set-cosine >= t. Cosine >= t implies an overlap of at least
+    o = ceil(t^2 |S|) for each set S, and two sets with overlap >= o share at least l
+    of their |S| - o + l globally rarest elements. Returns the (row, rank) order and a
+    mask keeping each row's prefix.
+    """
+    order = np.lexsort((ranks, rows))
+    sorted_rows = rows[order]
+    row_start = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    pos = np.arange(sorted_rows.size) - row_start[sorted_rows]
+    prefix_len = counts - np.ceil(t2 * counts).astype(np.int64) + PREFIX_OVERLAP
+    return order, pos < prefix_len[sorted_rows]
+
+
+class FuzzySkillIndex:
+    """
+    Character n-gram index over every taxonomy canonical name and alias.
+
+    Names become binary, L2-normalized rows of a sparse (entries x n-grams) CSR matrix,
+    built once per taxonomy load; the score of a CV phrase against a name is the cosine
+    similarity of their n-gram sets. To stay in the millisecond range on large
+    taxonomies, candidate pairs are generated with one sparse product over the
+    *prefix* n-grams only (each set's rarest grams, sized from the threshold), must
+    share PREFIX_OVERLAP of them, and are then verified exactly. This is lossless
+    for thresholds >= the one the index was built for; lower thresholds fall back to
+    a full product.
+    """
+
+    def __init__(
+        self, taxonomy: Dict[str, Dict[str, Any]], n: int = 3, threshold: float = 0.75
+    ):
+        self.n = n
+        self.threshold = threshold
+        names: List[str] = []
+        canon: List[str] = []
+        for key, meta in taxonomy.items():
+            if not isinstance(meta, dict):
+                continue
+            canonical = meta.get("canonical") or key
+            for cand in [canonical, key] + list(meta.get("aliases", []) or []):
+                norm = _norm(cand or "")
+                if len(norm) >= MIN_FUZZY_LEN:
+                    names.append(norm)
+                    canon.append(canonical)
+
+        # one row per distinct normalized name
+        seen: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.canonicals: List[str] = []
+        for norm, c in zip(names, canon):
+            if norm not in seen:
+                seen[norm] = len(self.names)
+                self.names.append(norm)
+                self.canonicals.append(c)
+
+        rows, codes, counts = _gram_pairs(self.names, n)
+        self.vocab_codes, df = np.unique(codes, return_counts=True)
+        # global order for prefix filtering: rarest n-grams first (ties by code)
+        self.vocab_rank = np.empty(self.vocab_codes.size, dtype=np.int64)
+        self.vocab_rank[np.lexsort((self.vocab_codes, df))] = np.arange(
+            self.vocab_codes.size
+        )
+        self.sizes = counts
+
+        cols = np.searchsorted(self.vocab_codes, codes)
+        self.matrix = self._weighted(rows, cols, counts, len(self.names))
+        self.prefix_t = self._prefix_matrix(
+            rows, cols, self.vocab_rank[cols], counts
+        ).T.tocsr()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _weighted(self, rows, cols, counts, n_rows) -> sparse.csr_matrix:
+        weights = (1.0 / np.sqrt(np.maximum(counts, 1))).astype(np.float32)
+        return sparse.csr_matrix(
+            (weights[rows], (rows, cols)), shape=(n_rows, self.vocab_codes.size)
+        )
+
+    def _prefix_matrix(self, rows, cols, ranks, counts) -> sparse.csr_matrix:
+        order, keep = _prefix_mask(rows, ranks, counts, self.threshold**2)
+        r, c = rows[order][keep], cols[order][keep]
+        # out-of-vocabulary query grams (col -1) take part in the prefix but never match
+        hit = c >= 0
+        return sparse.csr_matrix(
+            (np.ones(int(hit.sum()), dtype=np.float32), (r[hit], c[hit])),
+            shape=(int(counts.size), self.vocab_codes.size),
+        )
+
+    def match(
+        self, phrases: List[str], threshold: float
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Score normalized phrases against all entries.
+        Returns (canonical, phrase, score) for entries whose best score >= threshold.
+        """
+        if not phrases or not self.names:
+            return []
+        rows, codes, counts = _gram_pairs(phrases, self.n)
+        cols = np.searchsorted(self.vocab_codes, codes)
+        cols = np.minimum(cols, self.vocab_codes.size - 1)
+        in_vocab = self.vocab_codes[cols] == codes
+        cols = np.where(in_vocab, cols, -1)
+        ranks = np.where(in_vocab, self.vocab_rank[np.maximum(cols, 0)], -1)
+
+        hit = cols >= 0
+        query = self._weighted(rows[hit], cols[hit], counts, len(phrases))
+
+        if threshold >= self.threshold:
+            # 1) candidates: pairs sharing >= PREFIX_OVERLAP prefix n-grams
+            cand = (
+                self._prefix_matrix(rows, cols, ranks, counts) @ self.prefix_t
+            ).tocoo()
+            shared = cand.data >= PREFIX_OVERLAP
+            q_idx, e_idx = cand.row[shared], cand.col[shared]
+            # 2) size filter: cos(A, B) <= sqrt(min(|A|,|B|) / max(|A|,|B|))
+            qa, eb = counts[q_idx], self.sizes[e_idx]
+            ok = np.minimum(qa, eb) >= threshold**2 * np.maximum(qa, eb)
+            q_idx, e_idx = q_idx[ok], e_idx[ok]
+            # 3) exact verification of the surviving pairs
+            vals = np.asarray(
+                query[q_idx].multiply(self.matrix[e_idx]).sum(axis=1)
+            ).ravel()
+        else:
+            scores = (query @ self.matrix.T).tocoo()
+            q_idx, e_idx, vals = scores.row, scores.col, scores.data
+
+        keep = vals >= threshold - 1e-6
+        if not keep.any():
+            return []
+        q_idx, e_idx, vals = q_idx[keep], e_idx[keep], vals[keep]
+
+        # best phrase per entry: sort by (entry, -score), take the first of each entry
+        order = np.lexsort((-vals, e_idx))
+        q_idx, e_idx, vals = q_idx[order], e_idx[order], vals[order]
+        first = np.ones(e_idx.size, dtype=bool)
+        first[1:] = e_idx[1:] != e_idx[:-1]
+
+        best: Dict[str, Tuple[str, float]] = {}
+        for r, c, v in zip(q_idx[first], e_idx[first], vals[first]):
+            canonical = self.canonicals[c]
+            if canonical not in best or v > best[canonical][1]:
+                best[canonical] = (phrases[r], min(float(v), 1.0))
+        return [(c, p, s) for c, (p, s) in best.items()]
+
+
+def candidate_phrases(text: str, max_words: int = 3) -> List[str]:
+    """
+    Normalized 1..max_words word n-grams from the CV text, de-duplicated.
+    Multi-word phrases catch split variants such as "Postgre SQL" or "scikit learn".
+    """
+    words = _WORD_RE.findall(text)
+    seen = set()
+    phrases: List[str] = []
+    for size in range(1, max_words + 1):
+        for i in range(len(words) - size + 1):
+            norm = _norm("".join(words[i : i + size]))
+            if len(norm) >= MIN_FUZZY_LEN and norm not in seen:
+                seen.add(norm)
+                phrases.append(norm)
+    return phrases
+
+
+@lru_cache
+def get_fuzzy_index() -> Optional[FuzzySkillIndex]:
+    taxonomy = load_skills_taxonomy()
+    if not taxonomy:
+        return None
+    return FuzzySkillIndex(
+        taxonomy, n=settings.SKILL_FUZZY_NGRAM, threshold=settings.SKILL_FUZZY_THRESHOLD
+    )
+
+
+def fuzzy_skill_match(text: str, threshold: Optional[float] = None) -> List[str]:
+    """
+    Canonical skill names whose names/aliases fuzzily match a CV word or phrase.
+    """
+    index = get_fuzzy_index()
+    if index is None:
+        return []
+    if threshold is None:
+        threshold = settings.SKILL_FUZZY_THRESHOLD
+    matches = index.match(candidate_phrases(text), threshold)
+    return sorted(c for c, _, _ in matches)
@@ -0,0 +1,304 @@
+import asyncio
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+
+from ..core.config import settings
+from ..db.models import IdempotencyKey
+from ..db.session import SessionLocal
+from ..schemas.analysis import AnalyzeResponse
+from .analysis_service import get_analyze_response
+
+OWNER, IN_PROGRESS, COMPLETED, FAILED = "owner", "in_progress", "completed", "failed"
+
+# Keys whose pipeline runs in this worker: duplicates here wake up as soon as it ends
+# instead of on the next poll.
+_local: Dict[str, asyncio.Event] = {}
+
+
+class IdempotencyError(Exception):
+    """Base class for requests that cannot be answered for their Idempotency-Key."""
+
+
+class KeyReused(IdempotencyError):
+    """The key was already used for a different request (role, file or content)."""
+
+
+class StillRunning(IdempotencyError):
+    """The first request with this key did not finish within the wait timeout."""
+
+
+class FirstAttemptFailed(IdempotencyError):
+    """The first attempt failed or its run is gone; the key can be claimed again."""
+
+
+def request_fingerprint(target_role: str, filename: str, data: bytes) -> str:
+    h = hashlib.sha256()
+    for part in (target_role.encode("utf-8"), (filename or "").encode("utf-8"), data):
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return h.hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _take_over(db, key: str, fingerprint: str, *conditions) -> bool:
+    """
+    Conditionally reset an existing key to in_progress for this request. Concurrent
+    callers race on the same conditions, so at most one of them gets rowcount 1.
+    """
+    now = _now()
+    result = db.execute(
+        update(IdempotencyKey)
+        .where(IdempotencyKey.key == key, *conditions)
+        .values(
+            fingerprint=fingerprint,
+            status=IN_PROGRESS,
+            run_id=None,
+            created_at=now,
+            updated_at=now,
+        )
+        # plain conditional UPDATE; no in-Python evaluation against loaded rows
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount == 1
+
+
+def claim_key(key: str, fingerprint: str) -> Tuple[str, Optional[int]]:
+    """
+    Register a request under its Idempotency-Key.
+
+    Returns (OWNER, None) when the caller must run the pipeline, (COMPLETED, run_id)
+    when a stored result exists and (IN_PROGRESS, None) while another request holds
+    the key. Raises KeyReused for a different request under a live key.
+    Expired keys (IDEMPOTENCY_KEY_TTL_HOURS), failed ones and in-progress ones not
+    updated for IDEMPOTENCY_STALE_AFTER_S (their worker died) are taken over.
+    """
+    db = SessionLocal()
+    try:
+        while True:
+            now = _now()
+            try:
+                with db.begin_nested():
+                    db.add(
+                        IdempotencyKey(
+                            key=key,
+                            fingerprint=fingerprint,
+                            status=IN_PROGRESS,
+                            created_at=now,
+                            updated_at=now,
+                        )
+                    )
+                db.commit()
+                return OWNER, None
+            except IntegrityError:
+                pass
+
+            record = (
+                db.query(IdempotencyKey)
+                .filter(IdempotencyKey.key == key)
+                .populate_existing()
+                .one_or_none()
+            )
+            if record is None:  # purged in between: insert again
+                continue
+
+            expires = now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+            if _as_utc(record.created_at) < expires:
+                expired = IdempotencyKey.created_at < expires
+                if _take_over(db, key, fingerprint, expired):
+                    return OWNER, None
+                continue
+            if record.fingerprint != fingerprint:
+                raise KeyReused(key)
+            if record.status == COMPLETED:
+                return COMPLETED, record.run_id
+            if record.status == FAILED:
+                if _take_over(db, key, fingerprint, IdempotencyKey.status == FAILED):
+                    return OWNER, None
+                continue
+
+            stale = now - timedelta(seconds=settings.IDEMPOTENCY_STALE_AFTER_S)
+            if _as_utc(record.updated_at) < stale:
+                taken = _take_over(
+                    db,
+                    key,
+                    fingerprint,
+                    IdempotencyKey.status == IN_PROGRESS,
+                    IdempotencyKey.updated_at < stale,
+                )
+                if taken:
+                    return OWNER, None
+                continue
+            db.rollback()
+            return IN_PROGRESS, None
+    finally:
+        db.close()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back naive
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def finish_key(
+    key: str, run_id: Optional[int], response: Optional[AnalyzeResponse] = None
+) -> None:
+    """
+    Record the outcome of the owner's pipeline: completed with run_id (and the
+    response, stored for replays), or failed.
+    """
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(
+                status=COMPLETED if run_id is not None else FAILED,
+                run_id=run_id,
+                response=response.model_dump_json() if response else None,
+                updated_at=_now(),
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def _load_state(key: str) -> Tuple[Optional[str], Optional[int]]:
+    db = SessionLocal()
+    try:
+        record = db.get(IdempotencyKey, key)
+        return (record.status, record.run_id) if record else (None, None)
+    finally:
+        db.close()
+
+
+def _replay(key: str, run_id: int) -> AnalyzeResponse:
+    db = SessionLocal()
+    try:
+        stored = (
+            db.query(IdempotencyKey.response)
+            .filter(IdempotencyKey.key == key, IdempotencyKey.run_id == run_id)
+            .scalar()
+        )
+        if stored:
+            return AnalyzeResponse.model_validate_json(stored)
+        # keys written before responses were stored: rebuild from the run
+        response = get_analyze_response(db, run_id)
+        if response is None:
+            # run archived since: mark the key failed so the next claim takes it over
+            db.execute(
+                update(IdempotencyKey)
+                .where(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.status == COMPLETED,
+                    IdempotencyKey.run_id == run_id,
+                )
+                .values(status=FAILED, updated_at=_now())
+            )
+            db.commit()
+            raise FirstAttemptFailed(f"run {run_id} is no longer available")
+        return response
+    finally:
+        db.close()
+
+
+async def _wait_for_run(key: str) -> int:
+    """
+    Wait for the request holding the key: woken directly when it runs in this worker,
+    otherwise by polling the key every IDEMPOTENCY_POLL_INTERVAL_S.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.IDEMPOTENCY_WAIT_TIMEOUT_S
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            raise StillRunning(key)
+        step = min(settings.IDEMPOTENCY_POLL_INTERVAL_S, remaining)
+        event = _local.get(key)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), step)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(step)
+
+        status, run_id = await run_in_threadpool(_load_state, key)
+        if status == COMPLETED:
+            return run_id
+        if status != IN_PROGRESS:
+            raise FirstAttemptFailed(key)
+
+
+async def _run_owned(
+    key: str, pipeline: Callable[[], Awaitable[AnalyzeResponse]]
+) -> AnalyzeResponse:
+    event = _local[key] = asyncio.Event()
+    response = None
+    try:
+        response = await pipeline()
+        return response
+    finally:
+        run_id = response.run_id if response is not None else None
+        await run_in_threadpool(finish_key, key, run_id, response)
+        _local.pop(key, None)
+        event.set()
+
+
+async def execute_once(
+    key: str,
+    fingerprint: str,
+    pipeline: Callable[[], Awaitable[AnalyzeResponse]],
+) -> Tuple[AnalyzeResponse, bool]:
+    """
+    Run `pipeline` at most once per Idempotency-Key. Returns (response, replayed).
+
+    The first request runs the pipeline; duplicates arriving meanwhile wait for it
+    and duplicates arriving later get the stored run. When the first attempt fails
+    (or its run was archived), a waiting duplicate claims the key and runs the
+    pipeline itself. The owner's pipeline is shielded, so a client that disconnects
+    cannot leave the key in progress while the analysis is still running.
+    """
+    while True:
+        state, run_id = await run_in_threadpool(claim_key, key, fingerprint)
+        if state == OWNER:
+            task = asyncio.ensure_future(_run_owned(key, pipeline))
+            return await asyncio.shield(task), False
+        try:
+            if state == IN_PROGRESS:
+                run_id = await _wait_for_run(key)
+            return await run_in_threadpool(_replay, key, run_id), True
+        except FirstAttemptFailed:
+            continue  # failed keys are taken over by the next claim
+
+
+def purge_expired_keys(older_than_hours: Optional[int] = None) -> int:
+    """
+    Delete keys past their TTL. Returns the number of rows removed.
+    """
+    hours = (
+        settings.IDEMPOTENCY_KEY_TTL_HOURS
+        if older_than_hours is None
+        else older_than_hours
+    )
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.created_at < _now() - timedelta(hours=hours),
+                IdempotencyKey.status != IN_PROGRESS,
+            )
+        )
+        db.commit()
+        return result.rowcount
+    finally:
+        db.close()
@@ -1,8 +1,12 @@
-import pdfplumber
 from docx import Document
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, Tuple
 import io
 
+from .docx_extractor import extract_docx_text
+from .pdf_extractor import extract_pdf_text
+
 
 async def extract_text_from_file(file: UploadFile) -> str:
     """
@@ -12,36 +16,66 @@ async def extract_text_from_file(file: UploadFile) -> str:
     - DOCX
     - TXT
     """
-    filename = file.filename.lower()
+    text, _ = await extract_document(file)
+    return text
+
+
+async def extract_document(file: UploadFile) -> Tuple[str, Optional[int]]:
+    """
+    Like extract_text_from_file, but also returns the page count (PDF only, else None).
+    """
+    return await parse_document(await file.read(), file.filename)
+
+
+async def parse_document(content: bytes, filename: str) -> Tuple[str, Optional[int]]:
+    """
+    extract_document on an upload that was already read (e.g. by work that must not
+    touch the request's UploadFile once the request has ended).
+    """
+    filename = filename.lower()
 
     if filename.endswith(".pdf"):
-        return await extract_text_from_pdf(file)
+        return await _pdf_text(content)
 
     elif filename.endswith(".docx"):
-        return await extract_text_from_docx(file)
+        return await run_in_threadpool(_docx_text, content), None
 
     elif filename.endswith(".txt"):
-        content = await file.read()
-        return content.decode("utf-8", errors="ignore")
+        return content.decode("utf-8", errors="ignore"), None
 
     else:
         raise ValueError("Unsupported file type. Upload PDF, DOCX or TXT.")
 
 
 async def extract_text_from_pdf(file: UploadFile) -> str:
-    content = await file.read()
-    text = ""
+    text, _ = await extract_pdf(file)
+    return text
+
+
+async def extract_pdf(file: UploadFile) -> Tuple[str, Optional[int]]:
+    return await _pdf_text(await file.read())
+
+
+async def _pdf_text(content: bytes) -> Tuple[str, Optional[int]]:
     try:
-        with pdfplumber.open(io.BytesIO(content)) as pdf:
-            for page in pdf.pages:
-                text += page.extract_text() or ""
+        # CPU-bound (and waits on the page-range process pool for long PDFs):
+        # keep it off the event loop
+        return await run_in_threadpool(extract_pdf_text, content)
     except Exception:
-        text = ""
-    return text
+        return "", None
 
 
 async def extract_text_from_docx(file: UploadFile) -> str:
-    content = await file.read()
+    return await run_in_threadpool(_docx_text, await file.read())
+
+
+def _docx_text(content: bytes) -> str:
+    # CPU-bound on large documents: callers run it in the threadpool
+    try:
+        # streaming parse: also covers tables, text boxes and headers
+        return extract_docx_text(content)
+    except Exception:
+        pass
     text = ""
     try:
         doc = Document(io.BytesIO(content))
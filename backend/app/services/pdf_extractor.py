@@ -0,0 +1,131 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+import pdfplumber
+import pypdfium2 as pdfium  # installed with pdfplumber
+
+from ..core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# PDFium is not thread-safe (and pypdfium2 does not serialize calls): in-process use
+# from threadpool threads and the warm-up thread goes through this lock
+_pdfium_lock = threading.Lock()
+
+
+def _pdfium_pages(data: bytes, start: int, end: int) -> List[str]:
+    """
+    Text layer of pages [start, end) via PDFium: no character-level layout analysis.
+    Runs in worker processes, so it opens its own document.
+    """
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            texts = []
+            for index in range(start, min(end, len(pdf))):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                texts.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+                textpage.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+
+def _page_count(data: bytes) -> int:
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+
+def _workers() -> int:
+    return settings.PDF_WORKERS or min(4, os.cpu_count() or 1)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = _workers()
+            # spawn: forking a threaded server process is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _drop_pool(pool: ProcessPoolExecutor) -> None:
+    # a worker process died (e.g. on a malformed PDF): the pool refuses all further
+    # work, so the next call builds a new one
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def page_ranges(pages: int, per_task: int) -> List[Tuple[int, int]]:
+    per_task = max(per_task, 1)
+    return [
+        (start, min(start + per_task, pages)) for start in range(0, pages, per_task)
+    ]
+
+
+def _fast_pages(data: bytes, pages: int) -> List[str]:
+    if pages < settings.PDF_PARALLEL_MIN_PAGES or _workers() < 2:
+        return _pdfium_pages(data, 0, pages)
+    ranges = page_ranges(pages, settings.PDF_PAGES_PER_TASK)
+    for retry in (True, False):
+        pool = _get_pool()
+        try:
+            futures = [
+                pool.submit(_pdfium_pages, data, start, end) for start, end in ranges
+            ]
+            # results come back per range; concatenating in submission order keeps
+            # page order
+            return [text for future in futures for text in future.result()]
+        except BrokenProcessPool:
+            # possibly broken by another document: retry once on a fresh pool
+            _drop_pool(pool)
+            if not retry:
+                raise
+
+
+def _layout_pages(data: bytes, indexes: Optional[List[int]] = None) -> List[str]:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        pages = pdf.pages if indexes is None else [pdf.pages[i] for i in indexes]
+        return [page.extract_text() or "" for page in pages]
+
+
+def extract_pdf_text(data: bytes, mode: Optional[str] = None) -> Tuple[str, int]:
+    """
+    Extract text from a PDF. Returns (text, page_count).
+
+    mode="fast" (PDF_EXTRACT_MODE default) reads the PDFium text layer, which is all
+    keyword matching needs; documents with PDF_PARALLEL_MIN_PAGES+ pages are split into
+    PDF_PAGES_PER_TASK page ranges extracted in parallel worker processes. Pages that
+    come back empty are retried with pdfplumber. mode="layout" uses pdfplumber's full
+    layout analysis for every page.
+    """
+    mode = mode or settings.PDF_EXTRACT_MODE
+    if mode == "layout":
+        texts = _layout_pages(data)
+        return "\n".join(texts), len(texts)
+
+    pages = _page_count(data)
+    texts = _fast_pages(data, pages)
+    empty = [i for i, text in enumerate(texts) if not text.strip()]
+    if empty:
+        for i, text in zip(empty, _layout_pages(data, empty)):
+            texts[i] = text
+    return "\n".join(texts), pages
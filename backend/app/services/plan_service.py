@@ -0,0 +1,115 @@
+from typing import Dict, Any, List, Tuple
+
+from ..core.llm_limiter import RateLimitedError
+from ..core.llm_resilience import CircuitOpenError
+from ..core.tracing import log_error, log_event, span
+from .prompt_builder import build_prompt, candidate_context
+from .project_service import _fallback_projects, normalize_projects, recommend_projects
+from .roadmap_service import _fallback_roadmap, generate_roadmap
+from .structured_output import StructuredOutputError, generate_json, output_stats
+
+PLAN_INSTRUCTIONS = """
+You are a senior career mentor for machine learning / data / AI roles.
+Both tasks below are for the candidate described under CANDIDATE DATA at the end of this prompt.
+
+TASK 1 – Learning roadmap (Markdown):
+- Use headings like: "Phase 0 – Foundations", "Phase 1 – Close Core Gaps", "Phase 2 – Nice-to-have Skills", "Phase 3 – Portfolio", "Phase 4 – Continuous Improvement".
+- For each phase, include 1–2 short sentences of goals and 3–6 bullet points of concrete actions or study topics.
+- Focus on the concrete skills listed in CANDIDATE DATA (do NOT invent random unrelated areas).
+- Make it realistic for someone learning while studying/working (not full-time).
+
+TASK 2 – Portfolio projects:
+- Design 3–5 concrete portfolio projects that show their strengths, close some of the core gaps and optionally touch some nice-to-have skills.
+- Each project should be realistic for an individual to complete in 2–6 weeks.
+- Focus on this candidate profile; avoid generic “hello world” projects.
+
+IMPORTANT OUTPUT FORMAT:
+Return only one valid JSON object with exactly these two keys, nothing else:
+
+{
+  "roadmap_md": "# Personalized Learning Roadmap\\n\\n## Phase 0 – Foundations\\n...",
+  "projects": [
+    {
+      "title": "End-to-End ML Pipeline on E-commerce Data",
+      "description": "Short description...",
+      "skills": ["Python", "Pandas", "Scikit-learn"],
+      "difficulty": "intermediate",
+      "estimated_duration_weeks": 4
+    }
+  ]
+}
+
+"roadmap_md" is the whole roadmap as one Markdown string (escape newlines as \\n).
+No extra keys, no comments, no markdown fences, no explanations. Only pure JSON.
+""".strip()
+
+
+def generate_plan(
+    skills: Dict[str, Any],
+    gap_report: Dict[str, Any],
+    target_role: str,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Generate the roadmap and project recommendations with a single LLM call
+    (LLM_COMBINED_GENERATION=true).
+
+    The response is one JSON object {"roadmap_md": str, "projects": [...]}; projects are
+    validated against ProjectRecommendation. If only one part is unusable, just that
+    part is re-requested through the regular single-purpose path.
+    """
+    with span("plan", fallback=False) as s:
+        try:
+            scalars, lists = candidate_context(skills, gap_report, target_role)
+            prompt = build_prompt("plan", PLAN_INSTRUCTIONS, scalars, lists)
+            data = generate_json("plan", prompt.text, "object")
+
+        except StructuredOutputError as e:
+            log_error("PLAN_PARSE_ERROR", e)
+            data = {}
+
+        except (CircuitOpenError, RateLimitedError) as e:
+            log_error("PLAN_LLM_SKIPPED", e)
+            s.set(fallback=True)
+            output_stats.record("plan", "fallbacks")
+            return (
+                _fallback_roadmap(skills, gap_report, target_role),
+                _fallback_projects(skills, gap_report, target_role),
+            )
+
+        except Exception as e:
+            # The provider already failed after retries; two more calls would only add latency.
+            log_error("PLAN_LLM_ERROR", e, stack=True)
+            s.set(fallback=True)
+            output_stats.record("plan", "fallbacks")
+            return (
+                _fallback_roadmap(skills, gap_report, target_role),
+                _fallback_projects(skills, gap_report, target_role),
+            )
+
+        partial = False
+        roadmap_md = data.get("roadmap_md")
+        if not isinstance(roadmap_md, str) or not roadmap_md.strip():
+            log_event("PLAN_PARTIAL", rerequested="roadmap")
+            s.set(roadmap_rerequested=True)
+            partial = True
+            roadmap_md = generate_roadmap(skills, gap_report, target_role)
+        else:
+            roadmap_md = roadmap_md.strip()
+
+        raw_projects = data.get("projects")
+        projects = (
+            normalize_projects(raw_projects, kind="plan")
+            if isinstance(raw_projects, list)
+            else []
+        )
+        if not projects:
+            log_event("PLAN_PARTIAL", rerequested="projects")
+            s.set(projects_rerequested=True)
+            partial = True
+            projects = recommend_projects(skills, gap_report, target_role)
+
+        if partial:
+            s.set(fallback=True)
+            output_stats.record("plan", "fallbacks")
+
+        return roadmap_md, projects
@@ -1,8 +1,46 @@
 from typing import Dict, Any, List
-import json
-import traceback
 
-from ..core.llm_client import get_llm
+from ..core.llm_limiter import RateLimitedError
+from ..core.llm_resilience import CircuitOpenError
+from ..core.tracing import log_error, span
+from ..schemas.analysis import ProjectRecommendation
+from .prompt_builder import build_prompt, candidate_context
+from .structured_output import (
+    StructuredOutputError,
+    generate_json,
+    output_stats,
+    validate_items,
+)
+
+PROJECTS_INSTRUCTIONS = """
+You are an AI career mentor for ML / Data / AI roles.
+
+TASK:
+Design 3–5 concrete portfolio projects for the candidate described under
+CANDIDATE DATA at the end of this prompt. The projects should help them:
+- show their strengths
+- close some of the core gaps
+- optionally touch some nice-to-have skills
+
+Constraints:
+- Each project should be realistic for an individual to complete in 2–6 weeks.
+- Focus on this candidate profile; avoid generic “hello world” projects.
+
+IMPORTANT OUTPUT FORMAT:
+Return only a valid JSON array, nothing else. Example shape:
+
+[
+  {
+    "title": "End-to-End ML Pipeline on E-commerce Data",
+    "description": "Short description...",
+    "skills": ["Python", "Pandas", "Scikit-learn"],
+    "difficulty": "intermediate",
+    "estimated_duration_weeks": 4
+  }
+]
+
+No extra keys, no comments, no markdown, no explanations. Only pure JSON.
+""".strip()
 
 
 def _fallback_projects(
@@ -107,31 +145,27 @@ def _fallback_projects(
 
     return projects
 
-def _extract_json_array_from_text(text: str) -> str:
-    """
-    Try to extract a JSON array substring from an LLM response.
-
-    Handles cases like:
-    - raw JSON
-    - text with explanation + JSON
-    - ```json ... ``` fences
-    """
-    cleaned = text.strip()
-
-    # Remove Markdown fences if present
-    if cleaned.startswith("```"):
-        # strip first line (``` or ```json)
-        cleaned = "\n".join(cleaned.splitlines()[1:])
-    if cleaned.endswith("```"):
-        cleaned = "\n".join(cleaned.splitlines()[:-1])
+def _project_defaults(idx: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **item,
+        "id": item.get("id") or f"llm_project_{idx+1}",
+        "skills": item.get("skills") or [],
+    }
 
-    start = cleaned.find("[")
-    end = cleaned.rfind("]")
 
-    if start == -1 or end == -1 or end <= start:
-        raise ValueError("Could not find JSON array in LLM response")
-
-    return cleaned[start : end + 1].strip()
+def normalize_projects(raw: List[Any], kind: str = "projects") -> List[Dict[str, Any]]:
+    """
+    Validate LLM project items against ProjectRecommendation one by one.
+    Items that are not objects or fail validation (e.g. no title) are dropped;
+    counts go to structured_output.output_stats under `kind`.
+    """
+    titled = [
+        item if isinstance(item, dict) and item.get("title") else None for item in raw
+    ]
+    projects, dropped = validate_items(titled, ProjectRecommendation, _project_defaults)
+    output_stats.record(kind, "items_valid", len(projects))
+    output_stats.record(kind, "items_dropped", dropped)
+    return [project.model_dump() for project in projects]
 
 
 def recommend_projects(
@@ -140,8 +174,9 @@ def recommend_projects(
     target_role: str,
 ) -> List[Dict[str, Any]]:
     """
-    Use an LLM to propose project ideas, but enforce a strict JSON schema.
-    Falls back to deterministic suggestions on any error.
+    Use an LLM to propose project ideas, but enforce a strict JSON schema
+    (structured_output: provider JSON mode, bracket scanner, per-item validation).
+    Falls back to deterministic suggestions on any error or when no item is valid.
 
     [
       {
@@ -155,101 +190,33 @@ def recommend_projects(
     ]
     """
 
-    llm = get_llm()
-
-    validated_skills = skills.get("validated_skills", []) or []
-    strengths: List[str] = gap_report.get("strengths", []) or []
-    missing_core: List[str] = gap_report.get("missing_core", []) or []
-    missing_nice: List[str] = gap_report.get("missing_nice_to_have", []) or []
-
-    # Build prompt in two parts to avoid { } issues in f-strings
-    prompt_header = f"""
-You are an AI career mentor for ML / Data / AI roles.
+    scalars, lists = candidate_context(
+        skills, gap_report, target_role, include_domains=False, include_summary=False
+    )
+    prompt = build_prompt("projects", PROJECTS_INSTRUCTIONS, scalars, lists)
 
-The candidate is targeting:
-- Target role: {target_role}
+    with span("projects", prompt_tokens=prompt.tokens, fallback=False) as s:
+        try:
+            raw = generate_json("projects", prompt.text, "array")
 
-Current profile:
-- Validated skills: {validated_skills}
+            normalized = normalize_projects(raw)
+            if not normalized:
+                raise StructuredOutputError("No valid project items after validation")
 
-Gap analysis:
-- Strengths: {strengths}
-- Missing core skills: {missing_core}
-- Missing nice-to-have skills: {missing_nice}
+            s.set(items=len(raw), valid=len(normalized))
+            return normalized
 
-TASK:
-Design 3–5 concrete portfolio projects that help this candidate:
-- show their strengths
-- close some of the core gaps
-- optionally touch some nice-to-have skills
+        except (CircuitOpenError, RateLimitedError) as e:
+            # Provider down or over our client-side budget: use deterministic projects
+            log_error("PROJECTS_LLM_SKIPPED", e)
 
-Constraints:
-- Each project should be realistic for an individual to complete in 2–6 weeks.
-- Focus on this candidate profile; avoid generic “hello world” projects.
-""".strip()
+        except StructuredOutputError as e:
+            log_error("PROJECTS_PARSE_ERROR", e)
 
-    prompt_format = """
-IMPORTANT OUTPUT FORMAT:
-Return only a valid JSON array, nothing else. Example shape:
-
-[
-  {
-    "title": "End-to-End ML Pipeline on E-commerce Data",
-    "description": "Short description...",
-    "skills": ["Python", "Pandas", "Scikit-learn"],
-    "difficulty": "intermediate",
-    "estimated_duration_weeks": 4
-  }
-]
-
-No extra keys, no comments, no markdown, no explanations. Only pure JSON.
-""".strip()
+        except Exception as e:
+            log_error("PROJECTS_LLM_ERROR", e, stack=True)
 
-    prompt = prompt_header + "\n\n" + prompt_format
-
-    try:
-        if hasattr(llm, "invoke"):
-            resp = llm.invoke(prompt)
-            text = getattr(resp, "content", None) or str(resp)
-        else:
-            resp = llm(prompt)
-            text = getattr(resp, "content", None) or str(resp)
-
-        text = text.strip()
-        if not text:
-            raise ValueError("Empty LLM project response")
-
-        json_str = _extract_json_array_from_text(text)
-        raw = json.loads(json_str)
-
-        if not isinstance(raw, list):
-            raise ValueError("Projects JSON is not a list")
-
-        normalized: List[Dict[str, Any]] = []
-        for idx, item in enumerate(raw):
-            if not isinstance(item, dict):
-                continue
-            title = item.get("title")
-            if not title:
-                continue
-            normalized.append(
-                {
-                    "id": item.get("id") or f"llm_project_{idx+1}",
-                    "title": title,
-                    "description": item.get("description"),
-                    "skills": item.get("skills") or [],
-                    "difficulty": item.get("difficulty"),
-                    "estimated_duration_weeks": item.get("estimated_duration_weeks"),
-                }
-            )
-
-        if not normalized:
-            raise ValueError("No valid project items after normalization")
-
-        return normalized
-
-    except Exception as e:
-        print("PROJECTS_LLM_ERROR:", repr(e))
-        traceback.print_exc()
+        s.set(fallback=True)
+        output_stats.record("projects", "fallbacks")
         return _fallback_projects(skills, gap_report, target_role)
     
\ No newline at end of file
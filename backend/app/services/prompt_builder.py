@@ -0,0 +1,208 @@
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import settings
+
+# Chars-per-token heuristics for providers without a local tokenizer.
+CHARS_PER_TOKEN = {
+    "gemini": 4.0,
+    "anthropic": 3.5,
+    "openai": 4.0,
+    "stub": 4.0,
+}
+
+
+@lru_cache
+def _openai_encoding(model: str):
+    # tiktoken may need to fetch BPE files on first use; fall back to the heuristic
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str, provider: Optional[str] = None) -> int:
+    provider = (provider or settings.LLM_PROVIDER).lower().strip()
+    if provider == "openai":
+        encoding = _openai_encoding(settings.OPENAI_MODEL)
+        if encoding is not None:
+            return len(encoding.encode(text))
+    ratio = CHARS_PER_TOKEN.get(provider, 4.0)
+    return int(len(text) / ratio) + 1
+
+
+def format_list(items: Sequence[str], limit: Optional[int] = None) -> str:
+    """
+    Render a list as a comma-separated line instead of a Python repr.
+    """
+    items = [str(i).strip() for i in items if str(i).strip()]
+    if not items:
+        return "(none)"
+    if limit is not None and len(items) > limit:
+        shown = items[:limit]
+        return ", ".join(shown) + f" (+{len(items) - limit} more)"
+    return ", ".join(items)
+
+
+class BuiltPrompt:
+    def __init__(
+        self,
+        kind: str,
+        text: str,
+        prefix_tokens: int,
+        context_tokens: int,
+        trimmed: Dict[str, int],
+    ):
+        self.kind = kind
+        self.text = text
+        self.prefix_tokens = prefix_tokens
+        self.context_tokens = context_tokens
+        self.trimmed = trimmed
+
+    @property
+    def tokens(self) -> int:
+        return self.prefix_tokens + self.context_tokens
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class _PromptStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_kind: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, prompt: BuiltPrompt) -> None:
+        with self._lock:
+            s = self._by_kind.setdefault(
+                prompt.kind,
+                {
+                    "prompts": 0,
+                    "total_tokens": 0,
+                    "max_tokens": 0,
+                    "trimmed_prompts": 0,
+                },
+            )
+            s["prompts"] += 1
+            s["total_tokens"] += prompt.tokens
+            s["max_tokens"] = max(s["max_tokens"], prompt.tokens)
+            s["prefix_tokens"] = prompt.prefix_tokens
+            if prompt.trimmed:
+                s["trimmed_prompts"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                kind: {**s, "mean_tokens": round(s["total_tokens"] / s["prompts"], 1)}
+                for kind, s in self._by_kind.items()
+            }
+
+
+prompt_stats = _PromptStats()
+
+
+def candidate_context(
+    skills: Dict[str, Any],
+    gap_report: Dict[str, Any],
+    target_role: str,
+    include_domains: bool = True,
+    include_summary: bool = True,
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, List[str]]]]:
+    """
+    Candidate fields shared by the roadmap/project prompts.
+    Lists are ordered by importance: the last ones are trimmed first.
+    """
+    scalars: List[Tuple[str, str]] = [("Target role", target_role)]
+    summary = gap_report.get("summary") or ""
+    if include_summary and summary:
+        scalars.append(("Gap summary", summary))
+
+    lists: List[Tuple[str, List[str]]] = [
+        ("Missing core skills", gap_report.get("missing_core", []) or []),
+        ("Strengths", gap_report.get("strengths", []) or []),
+        ("Validated skills", skills.get("validated_skills", []) or []),
+        (
+            "Missing nice-to-have skills",
+            gap_report.get("missing_nice_to_have", []) or [],
+        ),
+    ]
+    if include_domains:
+        lists.append(("Inferred domains", skills.get("inferred_domains", []) or []))
+    return scalars, lists
+
+
+def _render_context(
+    scalars: List[Tuple[str, str]],
+    lists: List[Tuple[str, List[str]]],
+    limits: Dict[str, int],
+) -> str:
+    lines = ["CANDIDATE DATA:"]
+    for label, value in scalars:
+        lines.append(f"- {label}: {value}")
+    for label, items in lists:
+        lines.append(f"- {label}: {format_list(items, limits.get(label))}")
+    return "\n".join(lines)
+
+
+def build_prompt(
+    kind: str,
+    instructions: str,
+    scalars: List[Tuple[str, str]],
+    lists: List[Tuple[str, List[str]]],
+    budget: Optional[int] = None,
+) -> BuiltPrompt:
+    """
+    Assemble a prompt as <static instructions><candidate data>.
+
+    The instructions are a fixed string per prompt kind (the *_INSTRUCTIONS constants
+    of the generating services; keep candidate data out of them), so every request
+    shares the same prefix and provider-side prompt caching can reuse it. Candidate
+    data comes last; if it exceeds `budget` tokens, list fields are trimmed, last-listed first
+    (so put the most important lists first), down to PROMPT_MIN_LIST_ITEMS each.
+    """
+    if budget is None:
+        budget = settings.PROMPT_CONTEXT_TOKEN_BUDGET
+    provider = settings.LLM_PROVIDER
+
+    limits: Dict[str, int] = {
+        label: min(len(items), settings.PROMPT_MAX_LIST_ITEMS) for label, items in lists
+    }
+    context = _render_context(scalars, lists, limits)
+    context_tokens = count_tokens(context, provider)
+
+    # trim lists starting from the least important until the context fits
+    for label, items in reversed(lists):
+        floor = min(len(items), settings.PROMPT_MIN_LIST_ITEMS)
+        while context_tokens > budget and limits[label] > floor:
+            # shrink by a quarter per step to keep the number of recounts small
+            limits[label] = max(floor, limits[label] - max(limits[label] // 4, 1))
+            context = _render_context(scalars, lists, limits)
+            context_tokens = count_tokens(context, provider)
+        if context_tokens <= budget:
+            break
+
+    trimmed = {
+        label: len(items) - limits[label]
+        for label, items in lists
+        if limits[label] < len(items)
+    }
+    prompt = BuiltPrompt(
+        kind=kind,
+        text=instructions.strip() + "\n\n" + context,
+        prefix_tokens=_prefix_tokens(instructions.strip(), provider),
+        context_tokens=context_tokens,
+        trimmed=trimmed,
+    )
+    prompt_stats.record(prompt)
+    return prompt
+
+
+@lru_cache(maxsize=64)
+def _prefix_tokens(instructions: str, provider: str) -> int:
+    return count_tokens(instructions, provider)
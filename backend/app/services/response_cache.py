@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+
+# Analysis runs are written once and never updated, but they hold personal data (no
+# shared caches) and the retention job removes them eventually.
+MAX_AGE_S = 31536000
+
+
+def private_cache_control(max_age_s: float) -> str:
+    return f"private, max-age={int(min(max(max_age_s, 0), MAX_AGE_S))}"
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    RFC 9110 weak comparison against an If-None-Match header value.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (t.strip() for t in if_none_match.split(","))
+    return any(t.removeprefix("W/") == etag for t in tags)
+
+
+class BytesLRU:
+    """
+    Thread-safe LRU of serialized response bodies, bounded by entry count and
+    total bytes. Values are (body, etag, expires_at): an entry with an expires_at
+    (epoch seconds) is dropped once it has passed.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Tuple[bytes, str, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Any) -> Optional[Tuple[bytes, str, Optional[float]]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None and value[2] is not None and time.time() >= value[2]:
+                del self._data[key]
+                self.size_bytes -= len(value[0])
+                value = None
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(
+        self, key: Any, body: bytes, expires_at: Optional[float] = None
+    ) -> Tuple[bytes, str, Optional[float]]:
+        value = (body, make_etag(body), expires_at)
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return value
+        if expires_at is not None and time.time() >= expires_at:
+            return value
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(old[0])
+            self._data[key] = value
+            self.size_bytes += len(body)
+            while (
+                len(self._data) > self.max_entries or self.size_bytes > self.max_bytes
+            ):
+                _, (evicted, _, _) = self._data.popitem(last=False)
+                self.size_bytes -= len(evicted)
+        return value
+
+    def pop(self, key: Any) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size_bytes -= len(old[0])
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self.size_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+analysis_cache = BytesLRU(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    max_bytes=settings.ANALYSIS_CACHE_MAX_BYTES,
+)
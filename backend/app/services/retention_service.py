@@ -0,0 +1,169 @@
+import gzip
+import os
+import zlib
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pydantic_core import to_json
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.engine import Engine
+
+from ..core.config import settings
+from ..db import partitions
+from ..db.models import AnalysisRun, ArchivedAnalysisRun, CVDocument
+from ..db.session import SessionLocal
+from .export_service import iter_run_batches, ndjson_chunks
+
+RETENTION_MODES = ("archive", "export")
+
+
+def _as_datetime(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def retention_deadline(created_at: datetime) -> datetime:
+    """
+    When the retention job (ANALYSIS_RETENTION_MONTHS) may remove a run created at
+    `created_at`: the start of the month after its last kept month, in UTC.
+    """
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    month = partitions.month_start(created_at.astimezone(timezone.utc).date())
+    return _as_datetime(
+        partitions.add_months(month, settings.ANALYSIS_RETENTION_MONTHS + 1)
+    )
+
+
+def _archive(batches) -> int:
+    archived = 0
+    db = SessionLocal()
+    try:
+        for batch in batches:
+            # re-running after an interrupted job must not trip over archived ids
+            db.execute(
+                delete(ArchivedAnalysisRun).where(
+                    ArchivedAnalysisRun.id.in_([row["id"] for row in batch])
+                )
+            )
+            db.add_all(
+                ArchivedAnalysisRun(
+                    id=row["id"],
+                    target_role=row["target_role"],
+                    created_at=(
+                        datetime.fromisoformat(row["created_at"])
+                        if row["created_at"]
+                        else None
+                    ),
+                    payload=zlib.compress(to_json(row), 9),
+                )
+                for row in batch
+            )
+            db.commit()
+            archived += len(batch)
+    finally:
+        db.close()
+    return archived
+
+
+def _export(batches, path: str) -> int:
+    exported = 0
+
+    def counted():
+        nonlocal exported
+        for batch in batches:
+            exported += len(batch)
+            yield batch
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with gzip.open(path, "wb") as f:
+        for chunk in ndjson_chunks(counted()):
+            f.write(chunk)
+    return exported
+
+
+def _delete_orphan_cv_documents(conn) -> int:
+    # CV text (PII) must not outlive the runs it belongs to; archives and exports
+    # never include it. Documents still shared with a kept run stay.
+    result = conn.execute(
+        delete(CVDocument).where(
+            ~exists().where(AnalysisRun.cv_document_id == CVDocument.id)
+        )
+    )
+    return result.rowcount
+
+
+def apply_retention(
+    engine: Engine,
+    keep_months: Optional[int] = None,
+    mode: Optional[str] = None,
+    export_dir: Optional[str] = None,
+    today: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Move runs created before the first day of (current month - keep_months) out of
+    analysis_runs, one month at a time: copy them into analysis_runs_archive
+    (mode="archive", zlib-compressed JSON per run) or into
+    <export_dir>/analysis_runs_YYYY_MM.ndjson.gz (mode="export"), then remove them.
+
+    On a partitioned Postgres table an expired month is removed by detaching and
+    dropping its partition (no row-by-row DELETE, no vacuum debt); elsewhere, and for
+    rows in the default partition, expired rows are deleted by created_at range.
+    CV documents no remaining run references are deleted in the same transaction.
+    Returns one summary dict per processed month.
+    """
+    keep_months = (
+        settings.ANALYSIS_RETENTION_MONTHS if keep_months is None else keep_months
+    )
+    mode = mode or settings.ANALYSIS_RETENTION_MODE
+    export_dir = export_dir or settings.ANALYSIS_EXPORT_DIR
+    if mode not in RETENTION_MODES:
+        raise ValueError(
+            f"Unknown retention mode '{mode}'. Use one of {RETENTION_MODES}"
+        )
+    cutoff = partitions.add_months(
+        partitions.month_start(today or partitions.utc_today()), -keep_months
+    )
+
+    with engine.connect() as conn:
+        oldest = conn.execute(select(func.min(AnalysisRun.created_at))).scalar()
+        dropped = {}
+        if partitions.supports_partitioning(engine) and partitions.is_partitioned(conn):
+            dropped = {m: n for n, m in partitions.list_partitions(conn) if m < cutoff}
+    if oldest is None and not dropped:
+        return []
+
+    first = partitions.month_start(oldest.date()) if oldest is not None else cutoff
+    months = sorted(set(partitions.months_between(first, cutoff)) | set(dropped))
+
+    summary = []
+    for month in months:
+        start, end = _as_datetime(month), _as_datetime(partitions.add_months(month, 1))
+        batches = iter_run_batches(since=start, until=end)
+        if mode == "archive":
+            moved = _archive(batches)
+            target = ArchivedAnalysisRun.__tablename__
+        else:
+            target = os.path.join(
+                export_dir,
+                f"analysis_runs_{month.year:04d}_{month.month:02d}.ndjson.gz",
+            )
+            moved = _export(batches, target)
+
+        with engine.begin() as conn:
+            if month in dropped:
+                partitions.drop_partition(conn, dropped[month])
+            conn.execute(
+                delete(AnalysisRun).where(
+                    AnalysisRun.created_at >= start, AnalysisRun.created_at < end
+                )
+            )
+            cv_documents = _delete_orphan_cv_documents(conn)
+        summary.append(
+            {
+                "month": month.isoformat()[:7],
+                "runs": moved,
+                "target": target,
+                "cv_documents": cv_documents,
+            }
+        )
+    return summary
@@ -1,7 +1,28 @@
 from typing import Dict, Any, List
-import traceback
 
-from ..core.llm_client import get_llm
+from ..core.llm_limiter import RateLimitedError
+from ..core.llm_resilience import CircuitOpenError, invoke_llm
+from ..core.tracing import log_error, span
+from .prompt_builder import build_prompt, candidate_context
+from .skill_cooccurrence import next_skills
+
+ROADMAP_INSTRUCTIONS = """
+You are a senior career mentor for machine learning / data / AI roles.
+
+TASK:
+Generate a **clear, structured learning roadmap** in **Markdown** for the candidate
+described under CANDIDATE DATA at the end of this prompt.
+
+Requirements:
+- Use headings like: "Phase 0 – Foundations", "Phase 1 – Close Core Gaps", "Phase 2 – Nice-to-have Skills", "Phase 3 – Portfolio", "Phase 4 – Continuous Improvement".
+- For each phase, include:
+  - 1–2 short sentences of goals
+  - 3–6 bullet points of concrete actions or study topics
+- Focus on the concrete skills listed in CANDIDATE DATA (do NOT invent random unrelated areas).
+- Make it realistic for someone learning while studying/working (not full-time).
+
+Respond with Markdown only, no extra explanations.
+""".strip()
 
 
 def _fallback_roadmap(skills: Dict[str, Any], gap_report: Dict[str, Any], target_role: str) -> str:
@@ -13,6 +34,13 @@ def _fallback_roadmap(skills: Dict[str, Any], gap_report: Dict[str, Any], target
     missing_nice: List[str] = gap_report.get("missing_nice_to_have", []) or []
     summary: str = gap_report.get("summary") or ""
     inferred_domains: List[str] = skills.get("inferred_domains", []) or []
+    # learned from past runs (co-occurrence model), no LLM involved
+    next_up = next_skills(
+        target_role,
+        skills.get("validated_skills", []) or [],
+        limit=5,
+        exclude=missing_core + missing_nice,
+    )
 
     def fmt(items: List[str]) -> str:
         if not items:
@@ -44,6 +72,17 @@ def _fallback_roadmap(skills: Dict[str, Any], gap_report: Dict[str, Any], target
     lines.append("## Phase 2 – Nice-to-have & differentiators (3–6 weeks)\n")
     lines.append("Nice-to-have gaps:\n")
     lines.append(fmt(missing_nice) + "\n")
+    if next_up:
+        lines.append("Skills that often come next for profiles like yours:\n")
+        lines.append(
+            "".join(
+                f"- {n['skill']}"
+                + (f" (often alongside {n['because']})" if n["because"] else "")
+                + "\n"
+                for n in next_up
+            )
+            + "\n"
+        )
 
     lines.append("## Phase 3 – Portfolio & storytelling (2–4 weeks)\n")
     lines.append("Leverage your strengths:\n")
@@ -68,65 +107,25 @@ def generate_roadmap(
     Falls back to a deterministic roadmap if LLM fails.
     """
 
-    llm = get_llm()
+    scalars, lists = candidate_context(skills, gap_report, target_role)
+    prompt = build_prompt("roadmap", ROADMAP_INSTRUCTIONS, scalars, lists)
 
-    validated_skills = skills.get("validated_skills", []) or []
-    inferred_domains = skills.get("inferred_domains", []) or []
-
-    strengths: List[str] = gap_report.get("strengths", []) or []
-    missing_core: List[str] = gap_report.get("missing_core", []) or []
-    missing_nice: List[str] = gap_report.get("missing_nice_to_have", []) or []
-    summary: str = gap_report.get("summary") or ""
-
-    prompt = f"""
-You are a senior career mentor for machine learning / data / AI roles.
-
-The candidate is targeting the role:
-- Target role: {target_role}
-
-Here is their current profile:
-
-- Validated skills: {validated_skills}
-- Inferred domains: {inferred_domains}
-
-Gap analysis for this role:
-
-- Strengths: {strengths}
-- Missing core skills: {missing_core}
-- Missing nice-to-have skills: {missing_nice}
-- Summary: {summary}
-
-TASK:
-Generate a **clear, structured learning roadmap** for this candidate in **Markdown**.
-
-Requirements:
-- Use headings like: "Phase 0 – Foundations", "Phase 1 – Close Core Gaps", "Phase 2 – Nice-to-have Skills", "Phase 3 – Portfolio", "Phase 4 – Continuous Improvement".
-- For each phase, include:
-  - 1–2 short sentences of goals
-  - 3–6 bullet points of concrete actions or study topics
-- Focus on the concrete skills listed above (do NOT invent random unrelated areas).
-- Make it realistic for someone learning while studying/working (not full-time).
-
-Respond with Markdown only, no extra explanations.
-""".strip()
+    with span("roadmap", prompt_tokens=prompt.tokens, fallback=False) as s:
+        try:
+            content = invoke_llm(prompt.text).strip()
+            if not content:
+                raise ValueError("Empty LLM roadmap response")
 
-    try:
-        # Support both LangChain-style and direct client usage
-        if hasattr(llm, "invoke"):
-            resp = llm.invoke(prompt)
-            content = getattr(resp, "content", None) or str(resp)
-        else:
-            resp = llm(prompt)
-            content = getattr(resp, "content", None) or str(resp)
+            s.set(chars=len(content))
+            return content
 
-        content = content.strip()
-        if not content:
-            raise ValueError("Empty LLM roadmap response")
+        except (CircuitOpenError, RateLimitedError) as e:
+            # Provider down or over our client-side budget: use deterministic roadmap
+            log_error("ROADMAP_LLM_SKIPPED", e)
 
-        return content
+        except Exception as e:
+            log_error("ROADMAP_LLM_ERROR", e, stack=True)
 
-    except Exception as e:
-        print("ROADMAP_LLM_ERROR:", repr(e))
-        traceback.print_exc()
         # Fallback deterministic roadmap
+        s.set(fallback=True)
         return _fallback_roadmap(skills, gap_report, target_role)
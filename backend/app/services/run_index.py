@@ -0,0 +1,105 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Run ids are taken at insert but become visible at commit, so a run can appear
+# after a higher id was synced; each sync re-checks this many ids below the mark.
+SYNC_RESCAN_IDS = 1000
+
+
+def norm(value: str) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def skills_of(skills_json: Any) -> List[str]:
+    if not isinstance(skills_json, dict):
+        return []
+    validated = skills_json.get("validated_skills") or []
+    return validated if isinstance(validated, list) else []
+
+
+class Vocab:
+    """
+    Interned names: normalized name -> dense code (a matrix row or column), and
+    code -> the first spelling seen.
+    """
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def get(self, name: str) -> Optional[int]:
+        return self.codes.get(norm(name))
+
+    def add(self, name: str) -> int:
+        key = norm(name)
+        code = self.codes.get(key)
+        if code is None:
+            code = self.codes[key] = len(self.names)
+            self.names.append(name.strip())
+        return code
+
+
+class SyncedRuns:
+    """
+    Which persisted runs an in-memory index has read: every run with id <=
+    synced_id - SYNC_RESCAN_IDS, and the listed ids above that. A run indexed right
+    after it is persisted is listed too, so later syncs skip it.
+    """
+
+    def __init__(self) -> None:
+        self.synced_id = 0
+        self._recent: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def __contains__(self, run_id: int) -> bool:
+        with self._lock:
+            return run_id in self._recent or run_id <= self.synced_id - SYNC_RESCAN_IDS
+
+    def add(self, run_id: int) -> None:
+        with self._lock:
+            self._recent.add(run_id)
+
+    def mark_synced(self, run_id: int) -> None:
+        with self._lock:
+            self.synced_id = max(self.synced_id, run_id)
+            floor = self.synced_id - SYNC_RESCAN_IDS
+            self._recent = {i for i in self._recent if i > floor}
+
+
+def sync_runs(
+    db, synced: SyncedRuns, columns, add: Callable[..., bool], *criteria
+) -> int:
+    """
+    Call add(run_id, *columns) for every run persisted since the last sync (by this
+    or any other worker) and for runs of the last SYNC_RESCAN_IDS ids that committed
+    late, skipping runs in `synced`; `criteria` filter analysis_runs further.
+    Returns how many calls returned True.
+    """
+    from ..db.models import AnalysisRun
+
+    synced_id = synced.synced_id
+    late = [
+        run_id
+        for (run_id,) in db.query(AnalysisRun.id).filter(
+            AnalysisRun.id > synced_id - SYNC_RESCAN_IDS,
+            AnalysisRun.id <= synced_id,
+            *criteria,
+        )
+        if run_id not in synced
+    ]
+    rows = (
+        db.query(AnalysisRun.id, *columns)
+        .filter((AnalysisRun.id > synced_id) | AnalysisRun.id.in_(late), *criteria)
+        .order_by(AnalysisRun.id)
+        .yield_per(1000)
+    )
+    added = 0
+    last = synced_id
+    for row in rows:
+        added += bool(add(*row))
+        last = max(last, row[0])
+    synced.mark_synced(last)
+    return added
@@ -0,0 +1,207 @@
+import hashlib
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .run_index import SyncedRuns, norm, sync_runs
+
+# Mersenne prime for the (a * x + b) mod p permutation family.
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def run_tokens(
+    target_role: str, skills: Dict[str, Any], gap_report: Dict[str, Any]
+) -> FrozenSet[str]:
+    """
+    The set a run is compared on: role, validated skills and missing core skills.
+    Prefixes keep "sql" as a skill distinct from "sql" as a gap.
+    """
+    tokens = {f"role:{norm(target_role)}"}
+    tokens.update(f"skill:{norm(s)}" for s in skills.get("validated_skills", []) or [])
+    tokens.update(f"gap:{norm(s)}" for s in gap_report.get("missing_core", []) or [])
+    return frozenset(tokens)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _token_hashes(tokens: Iterable[str]) -> np.ndarray:
+    # stable across processes (unlike hash()), 32 bits so a * x fits in uint64
+    return np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(t.encode(), digest_size=4).digest(), "little"
+            )
+            for t in tokens
+        ),
+        dtype=np.uint64,
+    )
+
+
+class MinHashLSH:
+    """
+    MinHash signatures + banded LSH over run token sets.
+
+    A signature has `num_perm` minimum hash values; it is cut into `bands` bands and
+    each band is a bucket key. Two sets with Jaccard similarity s share at least one
+    bucket with probability 1 - (1 - s^r)^b (r = rows per band), so near-duplicates
+    are found without scanning all runs. Candidates are then checked with the exact
+    Jaccard similarity of the stored token sets.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)[:, None]
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)[:, None]
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._entries: Dict[int, Tuple[str, FrozenSet[str]]] = {}
+        self.synced = SyncedRuns()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, tokens: FrozenSet[str]) -> np.ndarray:
+        x = _token_hashes(tokens)[None, :]
+        if x.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((self._a * x + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, sig: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (i, sig[i * self.rows : (i + 1) * self.rows].tobytes())
+            for i in range(self.bands)
+        ]
+
+    def add(self, run_id: int, role: str, tokens: FrozenSet[str]) -> bool:
+        """
+        Index a run; False if it is already indexed.
+        """
+        keys = self._band_keys(self.signature(tokens))
+        with self._lock:
+            if run_id in self._entries:
+                return False
+            self._entries[run_id] = (norm(role), tokens)
+            for key in keys:
+                self._buckets.setdefault(key, []).append(run_id)
+            self.synced.add(run_id)
+            return True
+
+    def query(
+        self, role: str, tokens: FrozenSet[str], threshold: float
+    ) -> Optional[Tuple[int, float]]:
+        """
+        Most similar indexed run for the same role with Jaccard >= threshold
+        (ties go to the most recent run), or None.
+        """
+        keys = self._band_keys(self.signature(tokens))
+        role = norm(role)
+        best: Optional[Tuple[int, float]] = None
+        with self._lock:
+            candidates = set()
+            for key in keys:
+                candidates.update(self._buckets.get(key, ()))
+            for run_id in candidates:
+                run_role, run_tokens_ = self._entries[run_id]
+                if run_role != role:
+                    continue
+                score = jaccard(tokens, run_tokens_)
+                if score >= threshold and (
+                    best is None or (score, run_id) > (best[1], best[0])
+                ):
+                    best = (run_id, score)
+        return best
+
+
+_index: Optional[MinHashLSH] = None
+_index_lock = threading.Lock()
+
+
+def get_reuse_index() -> MinHashLSH:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = MinHashLSH(
+                num_perm=settings.RUN_REUSE_NUM_PERM, bands=settings.RUN_REUSE_BANDS
+            )
+        return _index
+
+
+def sync_reuse_index(db) -> int:
+    """
+    Index runs with generated content persisted since the last sync (by this or any
+    other worker), starting with every run on the first call (at startup, in the
+    pre-forking master). Returns the number of runs added.
+    """
+    from ..db.models import AnalysisRun
+
+    index = get_reuse_index()
+
+    def add(run_id: int, role: str, skills: Any, gap: Any) -> bool:
+        if not isinstance(skills, dict) or not isinstance(gap, dict):
+            index.synced.add(run_id)  # nothing to compare on
+            return False
+        return index.add(run_id, role, run_tokens(role, skills, gap))
+
+    return sync_runs(
+        db,
+        index.synced,
+        (AnalysisRun.target_role, AnalysisRun.skills_json, AnalysisRun.gap_report_json),
+        add,
+        AnalysisRun.roadmap_md.isnot(None),
+    )
+
+
+def index_run(
+    run_id: int, target_role: str, skills: Dict[str, Any], gap_report: Dict[str, Any]
+) -> None:
+    if settings.RUN_REUSE_ENABLED:
+        get_reuse_index().add(
+            run_id, target_role, run_tokens(target_role, skills, gap_report)
+        )
+
+
+def find_similar_run(
+    db, target_role: str, skills: Dict[str, Any], gap_report: Dict[str, Any]
+) -> Optional[Tuple[int, float]]:
+    """
+    (run_id, jaccard) of a prior run whose roadmap/projects can be reused, or None.
+    Catches up on runs persisted by other workers first.
+    """
+    if not settings.RUN_REUSE_ENABLED:
+        return None
+    sync_reuse_index(db)
+    return get_reuse_index().query(
+        target_role,
+        run_tokens(target_role, skills, gap_report),
+        settings.RUN_REUSE_JACCARD_THRESHOLD,
+    )
+
+
+def adapt_roadmap(
+    roadmap_md: str, gap_report: Dict[str, Any], prior_gap_report: Dict[str, Any]
+) -> str:
+    """
+    Light adaptation of a reused roadmap: list core gaps the prior run did not have.
+    """
+    prior = {norm(s) for s in prior_gap_report.get("missing_core", []) or []}
+    extra = [
+        s for s in gap_report.get("missing_core", []) or [] if norm(s) not in prior
+    ]
+    if not extra:
+        return roadmap_md
+    bullets = "\n".join(f"- {s}" for s in extra)
+    return (
+        f"{roadmap_md.rstrip()}\n\n## Additional Core Gaps\n"
+        f"Also plan time for these core skills:\n{bullets}\n"
+    )
@@ -0,0 +1,278 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from ..core.config import settings
+from .run_index import SyncedRuns, Vocab, skills_of, sync_runs
+
+# pending increments are folded into the CSR matrices on write past this many
+# entries; queries read the few pending ones directly instead of folding
+_FOLD_ENTRIES = 16_384
+
+
+def _grown(values: np.ndarray, size: int) -> np.ndarray:
+    if size <= len(values):
+        return values
+    grown = np.zeros(max(size, 2 * len(values)), dtype=values.dtype)
+    grown[: len(values)] = values
+    return grown
+
+
+def _dense_rows(
+    matrix: sparse.csr_matrix, pending: List[np.ndarray], rows: List[int], n: int
+) -> np.ndarray:
+    # read CSR rows straight from indptr/indices: much cheaper than fancy indexing
+    # for the handful of rows a query needs; rows added since the last fold are
+    # past the matrix's shape
+    out = np.zeros((len(rows), n), dtype=np.float64)
+    for i, row in enumerate(rows):
+        if row < matrix.shape[0]:
+            start, end = matrix.indptr[row], matrix.indptr[row + 1]
+            out[i, matrix.indices[start:end]] = matrix.data[start:end]
+    if pending:
+        coords = np.concatenate(pending, axis=1)
+        for i, row in enumerate(rows):
+            np.add.at(out[i], coords[1][coords[0] == row], 1)
+    return out
+
+
+class CooccurrenceModel:
+    """
+    Which skills appear together in persisted runs, for LLM-free "what to learn
+    next" suggestions.
+
+    `_pairs[a, b]` counts the runs listing both skills a and b (the diagonal is the
+    number of runs with a skill), `_role_skill[r, a]` the runs for role r listing a.
+    Both are CSR int32 matrices holding only the nonzero counts. A new run's
+    increments are buffered as coordinates and folded in (duplicates summed) once
+    _FOLD_ENTRIES have piled up, or at the end of a sync; queries add the pending
+    ones for the rows they read. Persisting a run is O(skills^2) appends.
+
+    A candidate skill s is scored by the mean of P(s | k) over the known skills k,
+    blended (SKILL_COOCCURRENCE_ROLE_WEIGHT) with the share of the role's runs
+    listing s. Runs archived by the retention job stay counted.
+    """
+
+    def __init__(self) -> None:
+        self.skills = Vocab()  # skill -> matrix index
+        self.roles = Vocab()  # role -> row of _role_skill
+        self.runs = 0
+        self._df = np.zeros(64, dtype=np.int64)  # runs per skill
+        self._role_runs = np.zeros(16, dtype=np.int64)
+        self._pairs = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._role_skill = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._pending_pairs: List[np.ndarray] = []  # (2, n) coordinate blocks
+        self._pending_roles: List[np.ndarray] = []
+        self._pending_entries = 0
+        self.synced = SyncedRuns()
+        self.last_sync = 0.0
+        self._lock = threading.Lock()
+
+    def add(
+        self, run_id: int, role: str, skills: Iterable[str], fold: bool = True
+    ) -> bool:
+        """
+        Count a run's skills; False if the run was already counted. Bulk loads pass
+        fold=False and call fold() once at the end.
+        """
+        with self._lock:
+            if run_id in self.synced:
+                return False
+            idx = np.unique(
+                [self.skills.add(s) for s in skills if isinstance(s, str) and s.strip()]
+            ).astype(np.int32)
+            code = self.roles.add(role or "")
+            self._df = _grown(self._df, len(self.skills))
+            self._role_runs = _grown(self._role_runs, len(self.roles))
+            self._df[idx] += 1
+            self._role_runs[code] += 1
+            self.runs += 1
+            self.synced.add(run_id)
+            if len(idx):
+                m = len(idx)
+                self._pending_pairs.append(
+                    np.stack([np.repeat(idx, m), np.tile(idx, m)])
+                )
+                self._pending_roles.append(np.stack([np.full(m, code, np.int32), idx]))
+                self._pending_entries += m * m + m
+                if fold and self._pending_entries >= _FOLD_ENTRIES:
+                    self._fold()
+            return True
+
+    def fold(self) -> None:
+        with self._lock:
+            self._fold()
+
+    def _fold(self) -> None:
+        n, r = len(self.skills), len(self.roles)
+        self._pairs = self._folded(self._pairs, self._pending_pairs, (n, n))
+        self._role_skill = self._folded(self._role_skill, self._pending_roles, (r, n))
+        self._pending_pairs, self._pending_roles = [], []
+        self._pending_entries = 0
+
+    @staticmethod
+    def _folded(matrix, pending: List[np.ndarray], shape) -> sparse.csr_matrix:
+        matrix.resize(shape)
+        if not pending:
+            return matrix
+        rows, cols = np.concatenate(pending, axis=1)
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape
+        )  # duplicate coordinates are summed
+        return (matrix + counts).tocsr()
+
+    def suggest(
+        self,
+        role: Optional[str],
+        skills: Iterable[str],
+        limit: int = 10,
+        exclude: Iterable[str] = (),
+    ) -> List[Dict[str, Any]]:
+        """
+        Up to `limit` skills to learn next for someone with `skills` aiming at
+        `role`, best first (ties: the skill seen first). Each has skill, score,
+        role_share (share of the role's runs listing it, None for an unknown role)
+        and because (the known skill it most often comes with, if any).
+        """
+        with self._lock:
+            n = len(self.skills)
+            if n == 0 or limit <= 0:
+                return []
+            known = sorted({c for c in map(self.skills.get, skills) if c is not None})
+            df = self._df[:n]
+
+            code = self.roles.get(role) if role else None
+            role_share = None
+            if code is not None and self._role_runs[code]:
+                role_share = _dense_rows(
+                    self._role_skill, self._pending_roles, [code], n
+                )[0]
+                role_share /= self._role_runs[code]
+
+            cond = block = None
+            if known:
+                # block[i, s] = P(s | known[i]) = pairs[known[i], s] / df[known[i]]
+                pairs = _dense_rows(self._pairs, self._pending_pairs, known, n)
+                block = pairs / df[known][:, None]
+                cond = block.mean(axis=0)
+
+            if cond is not None and role_share is not None:
+                weight = settings.SKILL_COOCCURRENCE_ROLE_WEIGHT
+                score = weight * role_share + (1 - weight) * cond
+            elif cond is not None:
+                score = cond
+            elif role_share is not None:
+                score = role_share
+            else:
+                score = df / max(self.runs, 1)  # most common skills overall
+
+            score = np.array(score, dtype=np.float64)
+            score[df < settings.SKILL_COOCCURRENCE_MIN_RUNS] = 0.0
+            score[known] = 0.0
+            dropped = [c for c in map(self.skills.get, exclude) if c is not None]
+            score[dropped] = 0.0
+
+            k = min(limit, int(np.count_nonzero(score)))
+            if k == 0:
+                return []
+            # stable at the cut-off: of the skills tied at the k-th best score, the
+            # ones seen first are kept
+            kth = np.partition(score, n - k)[n - k]
+            above = np.flatnonzero(score > kth)
+            ties = np.flatnonzero(score == kth)[: k - len(above)]
+            top = np.concatenate([above, ties])
+            top = top[np.lexsort((top, -score[top]))]
+            because = None
+            if block is not None:
+                # the known skill with the highest P(s | k) for each suggestion
+                cols = block[:, top]
+                because = [
+                    self.skills.names[known[i]] if cols[i, j] > 0 else None
+                    for j, i in enumerate(cols.argmax(axis=0))
+                ]
+
+            return [
+                {
+                    "skill": self.skills.names[s],
+                    "score": round(float(score[s]), 4),
+                    "role_share": (
+                        round(float(role_share[s]), 4)
+                        if role_share is not None
+                        else None
+                    ),
+                    "because": because[j] if because else None,
+                }
+                for j, s in enumerate(top.tolist())
+            ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "skills": len(self.skills),
+                "roles": len(self.roles),
+                "pairs": int(self._pairs.nnz),
+                "pending": self._pending_entries,
+                "synced_id": self.synced.synced_id,
+            }
+
+
+_model: Optional[CooccurrenceModel] = None
+_model_lock = threading.Lock()
+
+
+def get_cooccurrence_model() -> CooccurrenceModel:
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = CooccurrenceModel()
+        return _model
+
+
+def sync_cooccurrence(db, force: bool = False) -> int:
+    """
+    Count runs persisted since the last sync (by this or any other worker), at most
+    every SKILL_COOCCURRENCE_SYNC_S unless `force`. Returns the number of runs added.
+    """
+    from ..db.models import AnalysisRun
+
+    model = get_cooccurrence_model()
+    if (
+        not force
+        and time.monotonic() - model.last_sync < settings.SKILL_COOCCURRENCE_SYNC_S
+    ):
+        return 0
+    added = sync_runs(
+        db,
+        model.synced,
+        (AnalysisRun.target_role, AnalysisRun.skills_json),
+        lambda run_id, role, skills: model.add(
+            run_id, role, skills_of(skills), fold=False
+        ),
+    )
+    if added:
+        model.fold()
+    model.last_sync = time.monotonic()
+    return added
+
+
+def record_run(run_id: int, target_role: str, skills: Dict[str, Any]) -> None:
+    if settings.SKILL_COOCCURRENCE_ENABLED:
+        get_cooccurrence_model().add(run_id, target_role, skills_of(skills))
+
+
+def next_skills(
+    target_role: Optional[str],
+    skills: Iterable[str],
+    limit: int = 10,
+    exclude: Iterable[str] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Next-skill suggestions from the co-occurrence model ([] while it is disabled).
+    """
+    if not settings.SKILL_COOCCURRENCE_ENABLED:
+        return []
+    return get_cooccurrence_model().suggest(target_role, skills, limit, exclude)
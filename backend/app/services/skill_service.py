@@ -1,4 +1,5 @@
 from typing import List, Dict, Any
+from ..core.config import settings
 from ..core.role_intel import load_skills_taxonomy, normalize_skill
 
 
@@ -38,6 +39,13 @@ def extract_skills_pipeline(text: str) -> Dict[str, Any]:
 
     validated = deterministic_skill_match(text, taxonomy)
 
+    # Optional: catch misspellings/variants ("Pytorch2", "Postgre SQL") via n-gram similarity
+    if settings.SKILL_FUZZY_ENABLED:
+        from .fuzzy_matcher import fuzzy_skill_match
+
+        fuzzy = {normalize_skill(s) for s in fuzzy_skill_match(text)}
+        validated = sorted(set(validated) | {s for s in fuzzy if s})
+
     # For now, raw_skills == validated_skills
     raw_skills = list(validated)
 
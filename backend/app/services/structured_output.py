@@ -0,0 +1,187 @@
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+
+from ..core.config import settings
+from ..core.llm_resilience import invoke_llm
+
+_CLOSER = {"{": "}", "[": "]"}
+_OPENER = {"object": "{", "array": "["}
+
+# Inside a candidate only strings, brackets and commas matter. The string branch is an
+# unrolled loop without nested ambiguity and its closing quote is optional, so an
+# unterminated string consumes the rest of the text once instead of backtracking.
+_TOKEN_RE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"?|[\[\]{},]', re.S)
+
+_DECODER = json.JSONDecoder()
+
+
+class StructuredOutputError(ValueError):
+    """No JSON value of the expected shape could be recovered from the output."""
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except RecursionError:  # absurdly deep nesting
+        raise ValueError("JSON nested too deeply")
+
+
+def _decode_at(text: str, start: int) -> Any:
+    try:
+        return _DECODER.raw_decode(text, start)[0]
+    except RecursionError:
+        raise ValueError("JSON nested too deeply")
+
+
+def scan_json(text: str, shape: str) -> Tuple[Any, str]:
+    """
+    Recover the first JSON value of `shape` ("object" or "array") from LLM output.
+    Returns (value, how) with how in "direct" | "scanned" | "truncated".
+
+    Single left-to-right pass: outside a candidate only the next opening bracket is
+    searched for (prose, fences and stray quotes are skipped). Each candidate is
+    first decoded in place by the C JSON decoder, which stops at the end of the
+    value or at the first error inside it. Only a candidate that fails is tokenized
+    (strings consumed whole, brackets matched on a stack) to find where it ends;
+    scanning resumes after it, so the work stays linear in the output length. An
+    array cut off mid-way (output token limit) is closed after its last complete
+    item.
+    """
+    if not text or not text.strip():
+        raise StructuredOutputError("empty LLM output")
+    opener = _OPENER[shape]
+    try:
+        value = _loads(text)
+        if isinstance(value, dict if shape == "object" else list):
+            return value, "direct"
+    except ValueError:
+        pass
+
+    pos = 0
+    while True:
+        start = text.find(opener, pos)
+        if start == -1:
+            raise StructuredOutputError(f"no JSON {shape} in LLM output")
+        try:
+            return _decode_at(text, start), "scanned"
+        except ValueError:
+            pass
+
+        stack = [_CLOSER[opener]]
+        last_item_end = -1  # end of the last complete top-level item
+        pos = start + 1
+        while stack:
+            token = _TOKEN_RE.search(text, pos)
+            if token is None:
+                break
+            pos = token.end()
+            tok = token.group()
+            if tok in "[{":
+                stack.append(_CLOSER[tok])
+            elif tok in "]}":
+                if tok != stack[-1]:
+                    stack = None  # mismatched bracket: not JSON
+                    break
+                stack.pop()
+                if len(stack) == 1:
+                    last_item_end = pos
+            elif tok == "," and len(stack) == 1:
+                last_item_end = token.start()
+
+        if stack is not None and stack:
+            break
+        # balanced but not JSON, or a mismatched bracket: skip past it
+
+    # ran out of text inside the candidate
+    if opener == "[" and last_item_end > start:
+        try:
+            return _loads(text[start:last_item_end] + "]"), "truncated"
+        except ValueError:
+            pass
+    raise StructuredOutputError(f"unterminated JSON {shape} in LLM output")
+
+
+def validate_items(
+    raw: List[Any],
+    model: Type[BaseModel],
+    prepare: Optional[Callable[[int, Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Tuple[List[BaseModel], int]:
+    """
+    Validate list items one by one; returns (valid items, number dropped).
+    `prepare(index, item)` can fill defaults before validation.
+    """
+    valid: List[BaseModel] = []
+    for idx, item in enumerate(raw):
+        if not isinstance(item, dict):
+            continue
+        try:
+            valid.append(model.model_validate(prepare(idx, item) if prepare else item))
+        except ValidationError:
+            continue
+    return valid, len(raw) - len(valid)
+
+
+class _OutputStats:
+    """
+    Per-kind counters for structured LLM output; fallback_rate is the share of
+    generations that ended in a deterministic fallback or re-request.
+    """
+
+    _FIELDS = (
+        "generations",
+        "direct",
+        "scanned",
+        "truncated",
+        "parse_failures",
+        "items_valid",
+        "items_dropped",
+        "fallbacks",
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_kind: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, field: str, n: int = 1) -> None:
+        with self._lock:
+            s = self._by_kind.setdefault(kind, dict.fromkeys(self._FIELDS, 0))
+            s[field] += n
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                kind: {
+                    **s,
+                    "fallback_rate": round(
+                        s["fallbacks"] / max(s["generations"], 1), 4
+                    ),
+                }
+                for kind, s in self._by_kind.items()
+            }
+
+
+output_stats = _OutputStats()
+
+
+def generate_json(kind: str, prompt: str, shape: str) -> Any:
+    """
+    Call the LLM for a JSON `shape`, using the provider's JSON mode when it has one
+    (LLM_JSON_MODE, see llm_client.json_mode_options), and recover the value with
+    scan_json.
+
+    Provider errors propagate unchanged; unusable output raises
+    StructuredOutputError. Counts go to output_stats under `kind`.
+    """
+    output_stats.record(kind, "generations")
+    text = invoke_llm(prompt, json_shape=shape if settings.LLM_JSON_MODE else None)
+    try:
+        value, how = scan_json(text, shape)
+    except StructuredOutputError:
+        output_stats.record(kind, "parse_failures")
+        raise
+    output_stats.record(kind, how)
+    return value
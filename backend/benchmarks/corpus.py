@@ -0,0 +1,137 @@
+import random
+from io import BytesIO
+from typing import Any, Dict, List
+
+from docx import Document
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Filler vocabulary for the non-skill part of a synthetic CV.
+_FILLER = (
+    "worked delivered team project results improved customer quality process "
+    "responsible stakeholders analysis built designed supported reporting weekly "
+    "led managed across company product growth internal tools clients using with"
+).split()
+
+_SECTIONS = ["Summary", "Experience", "Education", "Skills", "Projects"]
+
+
+def _random_name(rng: random.Random) -> str:
+    consonants, vowels = "bcdfghjklmnpqrstvwxz", "aeiouy"
+    return "".join(
+        rng.choice(consonants) + rng.choice(vowels) for _ in range(rng.randint(2, 5))
+    )
+
+
+def make_taxonomy(
+    n_skills: int, seed: int = 0, random_names: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build a synthetic skills taxonomy with the same shape as skills_taxonomy.json.
+    Every entry gets 0–2 aliases so alias lookups are exercised too.
+
+    random_names: use varied pseudo-words instead of "skillNNNNN" (closer to a real
+    taxonomy's n-gram distribution, for the fuzzy matcher).
+    """
+    rng = random.Random(seed)
+    categories = ["language", "library", "framework", "cloud", "database", "concept"]
+    taxonomy: Dict[str, Dict[str, Any]] = {}
+    for i in range(n_skills):
+        key = f"{_random_name(rng)}{i}" if random_names else f"skill{i:05d}"
+        aliases = [f"{key}-alias{a}" for a in range(rng.randint(0, 2))]
+        taxonomy[key] = {
+            "canonical": key.capitalize() if random_names else f"Skill{i:05d}",
+            "category": rng.choice(categories),
+            "aliases": aliases,
+        }
+    return taxonomy
+
+
+def make_role_profiles(
+    n_roles: int, skills_per_role: int, seed: int = 0
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Build synthetic role profiles in the gap_service.ROLE_PROFILES shape
+    ({"core": [...], "nice": [...]}), drawing skills from make_taxonomy() keys.
+    """
+    rng = random.Random(seed)
+    pool = [f"skill{i:05d}" for i in range(max(skills_per_role * 2, 1) * 4)]
+    profiles: Dict[str, Dict[str, List[str]]] = {}
+    for r in range(n_roles):
+        picked = rng.sample(pool, min(len(pool), skills_per_role * 2))
+        profiles[f"synthetic role {r}"] = {
+            "core": picked[:skills_per_role],
+            "nice": picked[skills_per_role:],
+        }
+    return profiles
+
+
+def make_cv_text(
+    n_words: int,
+    skill_density: float,
+    taxonomy: Dict[str, Dict[str, Any]],
+    seed: int = 0,
+) -> str:
+    """
+    Generate CV-like plain text.
+
+    n_words: approximate total word count
+    skill_density: fraction of words (0..1) drawn from taxonomy canonicals/aliases
+    """
+    rng = random.Random(seed)
+    names: List[str] = []
+    for key, meta in taxonomy.items():
+        names.append(meta.get("canonical") or key)
+        names.extend(meta.get("aliases", []) or [])
+
+    words: List[str] = []
+    section_every = max(n_words // len(_SECTIONS), 1)
+    for i in range(n_words):
+        if i % section_every == 0:
+            words.append("\n" + _SECTIONS[(i // section_every) % len(_SECTIONS)] + "\n")
+        if names and rng.random() < skill_density:
+            words.append(rng.choice(names))
+        else:
+            words.append(rng.choice(_FILLER))
+    return " ".join(words)
+
+
+def make_txt(text: str) -> bytes:
+    return text.encode("utf-8")
+
+
+def make_docx(text: str) -> bytes:
+    doc = Document()
+    for para in text.split("\n"):
+        para = para.strip()
+        if para:
+            doc.add_paragraph(para)
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(text: str, pages: int) -> bytes:
+    """
+    Render text across exactly `pages` pages (text is repeated/cut to fit).
+    """
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    words = text.split() or ["empty"]
+    lines_per_page = 50
+    words_per_line = 12
+    idx = 0
+    for _ in range(pages):
+        c.setFont("Helvetica", 9)
+        y = height - 40
+        for _ in range(lines_per_page):
+            line = []
+            for _ in range(words_per_line):
+                line.append(words[idx % len(words)])
+                idx += 1
+            c.drawString(40, y, " ".join(line))
+            y -= 14
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
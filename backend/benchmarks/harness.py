@@ -0,0 +1,185 @@
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+# A benchmark case yields (name, fn, meta) triples; fn is timed with no arguments.
+Measurement = Tuple[str, Callable[[], Any], Dict[str, Any]]
+CaseFn = Callable[[bool], Iterable[Measurement]]
+
+CASES: Dict[str, CaseFn] = {}
+
+
+def case(name: str) -> Callable[[CaseFn], CaseFn]:
+    """
+    Register a benchmark case. The function receives `quick` and yields measurements.
+    """
+
+    def decorator(fn: CaseFn) -> CaseFn:
+        CASES[name] = fn
+        return fn
+
+    return decorator
+
+
+def time_fn(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    samples.sort()
+    p95_idx = min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))
+    return {
+        "runs": len(samples),
+        "min_ms": round(samples[0], 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "p95_ms": round(samples[p95_idx], 4),
+    }
+
+
+def run_cases(selected: List[str], quick: bool, repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for case_name in selected:
+        for name, fn, meta in CASES[case_name](quick):
+            key = f"{case_name}.{name}"
+            stats = time_fn(fn, repeat=repeat)
+            results[key] = {**stats, **meta}
+            print(
+                f"{key:<60} median={stats['median_ms']:>10.3f} ms  p95={stats['p95_ms']:>10.3f} ms"
+            )
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare medians against a saved baseline.
+    A case regresses when current/baseline > 1 + threshold.
+    """
+    rows: List[Dict[str, Any]] = []
+    base_results = baseline.get("results", {})
+    for key, cur in current.get("results", {}).items():
+        base = base_results.get(key)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = cur["median_ms"] / base["median_ms"]
+        rows.append(
+            {
+                "case": key,
+                "baseline_ms": base["median_ms"],
+                "current_ms": cur["median_ms"],
+                "ratio": round(ratio, 3),
+                "regressed": ratio > 1.0 + threshold,
+            }
+        )
+    return rows
+
+
+def load_json(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+@contextmanager
+def use_taxonomy(taxonomy: Dict[str, Dict[str, Any]]) -> Iterator[None]:
+    """
+    Temporarily point role_intel at a synthetic taxonomy file.
+    """
+    from app.core import role_intel
+    from app.services.fuzzy_matcher import get_fuzzy_index
+
+    original = role_intel.TAXONOMY_PATH
+    fd, path = tempfile.mkstemp(suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(taxonomy, f)
+
+    role_intel.TAXONOMY_PATH = path
+    role_intel.load_skills_taxonomy.cache_clear()
+    get_fuzzy_index.cache_clear()
+    try:
+        yield
+    finally:
+        role_intel.TAXONOMY_PATH = original
+        role_intel.load_skills_taxonomy.cache_clear()
+        get_fuzzy_index.cache_clear()
+        os.remove(path)
+
+
+@contextmanager
+def use_role_profiles(profiles: Dict[str, Dict[str, List[str]]]) -> Iterator[None]:
+    """
+    Temporarily replace gap_service.ROLE_PROFILES with synthetic profiles.
+    """
+    from app.services import gap_service
+
+    original = gap_service.ROLE_PROFILES
+    gap_service.ROLE_PROFILES = profiles
+    try:
+        yield
+    finally:
+        gap_service.ROLE_PROFILES = original
+
+
+@contextmanager
+def use_settings(**overrides: Any) -> Iterator[None]:
+    """
+    Temporarily override attributes of app.core.config.settings.
+    """
+    from app.core.config import settings
+
+    original = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    try:
+        yield
+    finally:
+        for k, v in original.items():
+            setattr(settings, k, v)
+
+
+@contextmanager
+def use_stub_llm(latency_ms: float, output_tokens: int = 400) -> Iterator[None]:
+    """
+    Temporarily route get_llm() to the local stub with a fixed latency.
+    """
+    from app.core import stub_llm
+
+    overrides = {
+        "LLM_PROVIDER": "stub",
+        "STUB_LLM_LATENCY_MS": latency_ms,
+        "STUB_LLM_LATENCY_DIST": "fixed",
+        "STUB_LLM_OUTPUT_TOKENS": output_tokens,
+        "STUB_LLM_ERROR_RATE": 0.0,
+    }
+    stub_llm.build_stub_llm.cache_clear()
+    try:
+        with use_settings(**overrides):
+            yield
+    finally:
+        stub_llm.build_stub_llm.cache_clear()
@@ -0,0 +1,231 @@
+"""
+End-to-end load generator for the upload endpoint (/mentor/analyze).
+
+Drives a running server (or the app in-process with --asgi) either at a fixed
+concurrency (closed loop) or at a target request rate (open loop), then reports
+latency percentiles, throughput and error rates.
+
+    LLM_PROVIDER=stub uvicorn app.main:app --workers 4
+    python -m benchmarks.loadgen --url http://localhost:8000 --concurrency 32 --duration 60
+    python -m benchmarks.loadgen --rps 20 --duration 60 --format pdf --output load.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from . import corpus
+
+_CONTENT_TYPES = {
+    "txt": "text/plain",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+
+
+def _build_payloads(
+    fmt: str, n: int, words: int, pages: int
+) -> List[Tuple[str, bytes]]:
+    taxonomy = corpus.make_taxonomy(200)
+    payloads: List[Tuple[str, bytes]] = []
+    for i in range(n):
+        text = corpus.make_cv_text(words, 0.05, taxonomy, seed=i)
+        # sprinkle real taxonomy skills so the gap report is non-trivial
+        text += " Python SQL Pandas Docker Machine Learning"
+        if fmt == "pdf":
+            data = corpus.make_pdf(text, pages)
+        elif fmt == "docx":
+            data = corpus.make_docx(text)
+        else:
+            data = corpus.make_txt(text)
+        payloads.append((f"cv_{i}.{fmt}", data))
+    return payloads
+
+
+def _percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    idx = min(
+        len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    )
+    return round(sorted_values[idx], 2)
+
+
+class LoadStats:
+    def __init__(self) -> None:
+        self.latencies_ms: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+
+    def record(
+        self, latency_ms: float, status: Optional[int], error: Optional[str]
+    ) -> None:
+        self.latencies_ms.append(latency_ms)
+        if status is not None:
+            self.statuses[status] += 1
+        if error:
+            self.errors[error] += 1
+
+    def summary(self, elapsed_s: float) -> Dict[str, Any]:
+        lat = sorted(self.latencies_ms)
+        total = len(lat)
+        ok = sum(c for s, c in self.statuses.items() if 200 <= s < 300)
+        failed = total - ok
+        return {
+            "requests": total,
+            "ok": ok,
+            "failed": failed,
+            "error_rate": round(failed / total, 4) if total else 0.0,
+            "throughput_rps": round(ok / elapsed_s, 3) if elapsed_s else 0.0,
+            "elapsed_s": round(elapsed_s, 3),
+            "latency_ms": {
+                "p50": _percentile(lat, 50),
+                "p95": _percentile(lat, 95),
+                "p99": _percentile(lat, 99),
+                "max": round(lat[-1], 2) if lat else None,
+                "mean": round(sum(lat) / total, 2) if total else None,
+            },
+            "status_counts": {str(k): v for k, v in sorted(self.statuses.items())},
+            "client_errors": dict(self.errors),
+        }
+
+
+async def _one_request(
+    client: httpx.AsyncClient,
+    payload: Tuple[str, bytes],
+    fmt: str,
+    target_role: str,
+    stats: LoadStats,
+) -> None:
+    filename, data = payload
+    start = time.perf_counter()
+    status: Optional[int] = None
+    error: Optional[str] = None
+    try:
+        resp = await client.post(
+            "/mentor/analyze",
+            files={"file": (filename, data, _CONTENT_TYPES[fmt])},
+            data={"target_role": target_role},
+        )
+        status = resp.status_code
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    stats.record((time.perf_counter() - start) * 1000.0, status, error)
+
+
+async def _closed_loop(client, payloads, args, stats: LoadStats) -> None:
+    deadline = time.perf_counter() + args.duration
+    remaining = [args.requests] if args.requests else None
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await _one_request(
+                client, random.choice(payloads), args.format, args.role, stats
+            )
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+
+async def _open_loop(client, payloads, args, stats: LoadStats) -> None:
+    # Poisson arrivals at the target rate; requests are not gated on earlier ones.
+    deadline = time.perf_counter() + args.duration
+    tasks: List[asyncio.Task] = []
+    sent = 0
+    while time.perf_counter() < deadline:
+        if args.requests and sent >= args.requests:
+            break
+        tasks.append(
+            asyncio.create_task(
+                _one_request(
+                    client, random.choice(payloads), args.format, args.role, stats
+                )
+            )
+        )
+        sent += 1
+        await asyncio.sleep(random.expovariate(args.rps))
+    await asyncio.gather(*tasks)
+
+
+async def run_load(args) -> Dict[str, Any]:
+    payloads = _build_payloads(args.format, args.distinct_cvs, args.words, args.pages)
+    limits = httpx.Limits(max_connections=max(args.concurrency, 1) * 2)
+    timeout = httpx.Timeout(args.timeout)
+
+    if args.asgi:
+        from app.main import app
+
+        transport = httpx.ASGITransport(app=app)
+        client = httpx.AsyncClient(
+            transport=transport, base_url="http://loadgen", timeout=timeout
+        )
+    else:
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=timeout)
+
+    stats = LoadStats()
+    async with client:
+        start = time.perf_counter()
+        if args.rps:
+            await _open_loop(client, payloads, args, stats)
+        else:
+            await _closed_loop(client, payloads, args, stats)
+        elapsed = time.perf_counter() - start
+
+    summary = stats.summary(elapsed)
+    summary["config"] = {
+        "mode": "open" if args.rps else "closed",
+        "concurrency": None if args.rps else args.concurrency,
+        "target_rps": args.rps,
+        "format": args.format,
+        "words": args.words,
+        "pages": args.pages if args.format == "pdf" else None,
+        "target": "asgi" if args.asgi else args.url,
+    }
+    return summary
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="CareerGENAI /mentor/analyze load generator"
+    )
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--asgi", action="store_true", help="drive app.main:app in-process"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=8, help="closed-loop workers"
+    )
+    parser.add_argument("--rps", type=float, default=None, help="open-loop target rate")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument(
+        "--requests", type=int, default=None, help="stop after N requests"
+    )
+    parser.add_argument("--format", choices=sorted(_CONTENT_TYPES), default="txt")
+    parser.add_argument("--words", type=int, default=800)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--distinct-cvs", type=int, default=16)
+    parser.add_argument("--role", default="Data Scientist")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", default=None, help="write the summary JSON here")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_load(args))
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,589 @@
+"""
+Offline service-level benchmarks.
+
+Runs entirely on synthetic data: no network, no database, no LLM key.
+
+    python -m benchmarks.run                       # full run, prints + writes bench_results.json
+    python -m benchmarks.run --quick --cases parser,skills
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json --threshold 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tracemalloc
+from io import BytesIO
+
+# Settings() requires DATABASE_URL at import time; benchmarks never touch the DB.
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from docx import Document  # noqa: E402
+from fastapi import UploadFile  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.schemas.analysis import (  # noqa: E402
+    AnalysisRunOut,
+    GapReport,
+    ProjectRecommendation,
+    SkillProfile,
+)
+from app.services.analysis_service import dump_json  # noqa: E402
+from app.services.candidate_ranking import CandidateIndex  # noqa: E402
+from app.services.docx_extractor import extract_docx_text  # noqa: E402
+from app.services.fuzzy_matcher import (  # noqa: E402
+    FuzzySkillIndex,
+    fuzzy_skill_match,
+)
+from app.services.gap_service import compute_gap_report  # noqa: E402
+from app.services.parser_service import extract_text_from_file  # noqa: E402
+from app.services.pdf_extractor import extract_pdf_text  # noqa: E402
+from app.services.plan_service import PLAN_INSTRUCTIONS, generate_plan  # noqa: E402
+from app.services.prompt_builder import (  # noqa: E402
+    build_prompt,
+    candidate_context,
+)
+from app.services.project_service import (  # noqa: E402
+    PROJECTS_INSTRUCTIONS,
+    _fallback_projects,
+    recommend_projects,
+)
+from app.services.report_service import build_pdf_report  # noqa: E402
+from app.services.skill_cooccurrence import CooccurrenceModel  # noqa: E402
+from app.services.roadmap_service import (  # noqa: E402
+    ROADMAP_INSTRUCTIONS,
+    _fallback_roadmap,
+    generate_roadmap,
+)
+from app.services.skill_service import extract_skills_pipeline  # noqa: E402
+from app.services.structured_output import scan_json  # noqa: E402
+
+from . import corpus  # noqa: E402
+from .harness import (  # noqa: E402
+    CASES,
+    case,
+    compare,
+    load_json,
+    run_cases,
+    use_role_profiles,
+    use_settings,
+    use_stub_llm,
+    use_taxonomy,
+    write_json,
+)
+
+
+def _parse(data: bytes, filename: str) -> str:
+    upload = UploadFile(file=BytesIO(data), filename=filename)
+    return asyncio.run(extract_text_from_file(upload))
+
+
+@case("parser")
+def bench_parser(quick: bool):
+    taxonomy = corpus.make_taxonomy(200)
+    sizes = [500, 5000] if quick else [500, 5000, 20000]
+    for n_words in sizes:
+        text = corpus.make_cv_text(n_words, 0.05, taxonomy)
+        txt = corpus.make_txt(text)
+        docx = corpus.make_docx(text)
+        yield f"txt_{n_words}w", lambda d=txt: _parse(d, "cv.txt"), {"bytes": len(txt)}
+        yield f"docx_{n_words}w", lambda d=docx: _parse(d, "cv.docx"), {
+            "bytes": len(docx)
+        }
+
+    for pages in [1, 5] if quick else [1, 5, 20]:
+        text = corpus.make_cv_text(600, 0.05, taxonomy)
+        pdf = corpus.make_pdf(text, pages)
+        yield f"pdf_{pages}p", lambda d=pdf: _parse(d, "cv.pdf"), {
+            "bytes": len(pdf),
+            "pages": pages,
+        }
+
+
+def _python_docx_text(data: bytes) -> str:
+    # the extraction path used before the streaming extractor
+    return "\n".join(p.text for p in Document(BytesIO(data)).paragraphs)
+
+
+def _peak_kib(fn) -> int:
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+
+
+@case("docx")
+def bench_docx(quick: bool):
+    taxonomy = corpus.make_taxonomy(200)
+    sizes = [500, 5000] if quick else [500, 5000, 50000]
+    for n_words in sizes:
+        data = corpus.make_docx(corpus.make_cv_text(n_words, 0.05, taxonomy))
+        for name, fn in [
+            ("python_docx", _python_docx_text),
+            ("streaming", extract_docx_text),
+        ]:
+            yield (
+                f"{name}_{n_words}w",
+                lambda d=data, f=fn: f(d),
+                {"bytes": len(data), "peak_kib": _peak_kib(lambda: fn(data))},
+            )
+
+
+@case("pdf")
+def bench_pdf(quick: bool):
+    """
+    Per-mode PDF extraction cost; divide by `pages` for the per-page cost.
+    """
+    taxonomy = corpus.make_taxonomy(200)
+    text = corpus.make_cv_text(600, 0.05, taxonomy)
+    for pages in [1, 20] if quick else [1, 20, 60]:
+        pdf = corpus.make_pdf(text, pages)
+        meta = {"pages": pages, "bytes": len(pdf)}
+        yield f"layout_{pages}p", lambda d=pdf: extract_pdf_text(d, "layout"), meta
+        with use_settings(PDF_PARALLEL_MIN_PAGES=10**6):
+            yield f"fast_serial_{pages}p", lambda d=pdf: extract_pdf_text(
+                d, "fast"
+            ), meta
+        if pages > 1:
+            with use_settings(PDF_PARALLEL_MIN_PAGES=2, PDF_PAGES_PER_TASK=5):
+                yield (
+                    f"fast_parallel_{pages}p",
+                    lambda d=pdf: extract_pdf_text(d, "fast"),
+                    meta,
+                )
+
+
+@case("skills")
+def bench_skills(quick: bool):
+    taxonomy_sizes = [100, 1000] if quick else [100, 1000, 5000]
+    for n_skills in taxonomy_sizes:
+        taxonomy = corpus.make_taxonomy(n_skills)
+        with use_taxonomy(taxonomy):
+            for n_words, density in [(800, 0.05), (5000, 0.2)]:
+                text = corpus.make_cv_text(n_words, density, taxonomy)
+                yield (
+                    f"tax{n_skills}_{n_words}w_d{density}",
+                    lambda t=text: extract_skills_pipeline(t),
+                    {"taxonomy_size": n_skills, "words": n_words, "density": density},
+                )
+
+
+@case("fuzzy")
+def bench_fuzzy(quick: bool):
+    taxonomy_sizes = [1000, 5000] if quick else [1000, 5000, 50000]
+    for n_skills in taxonomy_sizes:
+        taxonomy = corpus.make_taxonomy(n_skills, random_names=True)
+        yield (
+            f"build_tax{n_skills}",
+            lambda t=taxonomy: FuzzySkillIndex(t),
+            {"taxonomy_size": n_skills},
+        )
+        with use_taxonomy(taxonomy):
+            text = corpus.make_cv_text(800, 0.05, taxonomy)
+            # the first (warm-up) call builds and caches the index
+            yield (
+                f"match_tax{n_skills}_800w",
+                lambda t=text: fuzzy_skill_match(t),
+                {"taxonomy_size": n_skills, "words": 800},
+            )
+
+
+@case("gap")
+def bench_gap(quick: bool):
+    role_counts = [4, 100] if quick else [4, 100, 2000]
+    for n_roles in role_counts:
+        profiles = corpus.make_role_profiles(n_roles, skills_per_role=20)
+        user_skills = {"validated_skills": [f"skill{i:05d}" for i in range(0, 160, 3)]}
+        # the last role forces a full scan of the profile dict
+        target = f"synthetic role {n_roles - 1}"
+        with use_role_profiles(profiles):
+            yield (
+                f"roles{n_roles}",
+                lambda: compute_gap_report(user_skills, target),
+                {"roles": n_roles},
+            )
+
+
+def _large_gap(n: int):
+    skills = {
+        "raw_skills": [f"Skill{i}" for i in range(n)],
+        "validated_skills": [f"Skill{i}" for i in range(n)],
+        "inferred_domains": ["language", "library", "cloud"],
+    }
+    gap = {
+        "strengths": [f"skill{i}" for i in range(0, n, 2)],
+        "missing_core": [f"skill{i}" for i in range(n, n + n // 2)],
+        "missing_nice_to_have": [f"skill{i}" for i in range(n + n // 2, 2 * n)],
+        "summary": "Synthetic summary. " * 20,
+    }
+    return skills, gap
+
+
+@case("fallback")
+def bench_fallback(quick: bool):
+    for n in [10, 200]:
+        skills, gap = _large_gap(n)
+        skills["validated_skills"] += [
+            "Python",
+            "SQL",
+            "Docker",
+            "LLM",
+            "Machine Learning",
+        ]
+        yield f"roadmap_{n}", lambda s=skills, g=gap: _fallback_roadmap(
+            s, g, "Data Scientist"
+        ), {"skills": n}
+        yield f"projects_{n}", lambda s=skills, g=gap: _fallback_projects(
+            s, g, "Data Scientist"
+        ), {"skills": n}
+
+
+@case("prompts")
+def bench_prompts(quick: bool):
+    # Build time plus token counts (in meta) for small and oversized candidate data;
+    # the large case exercises list trimming against PROMPT_CONTEXT_TOKEN_BUDGET.
+    kinds = [
+        ("roadmap", ROADMAP_INSTRUCTIONS),
+        ("projects", PROJECTS_INSTRUCTIONS),
+        ("plan", PLAN_INSTRUCTIONS),
+    ]
+    for n in [10, 400]:
+        skills, gap = _large_gap(n)
+        scalars, lists = candidate_context(skills, gap, "Data Scientist")
+        for kind, instructions in kinds:
+            built = build_prompt(kind, instructions, scalars, lists)
+            yield (
+                f"{kind}_{n}",
+                lambda k=kind, i=instructions: build_prompt(k, i, scalars, lists),
+                {
+                    "prefix_tokens": built.prefix_tokens,
+                    "context_tokens": built.context_tokens,
+                    "trimmed_items": sum(built.trimmed.values()),
+                },
+            )
+
+
+def _two_calls(skills, gap, role):
+    return (
+        generate_roadmap(skills, gap, role),
+        recommend_projects(skills, gap, role),
+    )
+
+
+@case("plan")
+def bench_plan(quick: bool):
+    # Two-call vs combined generation against the stub provider (fixed latency),
+    # so the difference is round trips plus prompt/parse overhead.
+    latency_ms = 20.0
+    skills, gap = _large_gap(40)
+    with use_stub_llm(latency_ms):
+        yield (
+            "two_calls",
+            lambda: _two_calls(skills, gap, "Data Scientist"),
+            {"llm_calls": 2, "stub_latency_ms": latency_ms},
+        )
+        yield (
+            "combined",
+            lambda: generate_plan(skills, gap, "Data Scientist"),
+            {"llm_calls": 1, "stub_latency_ms": latency_ms},
+        )
+
+
+def _synthetic_run(
+    n_skills: int, n_projects: int, roadmap_lines: int
+) -> AnalysisRunOut:
+    skills, gap = _large_gap(n_skills)
+    projects = [
+        ProjectRecommendation(
+            id=f"p{i}",
+            title=f"Project {i}",
+            description="A realistic portfolio project description. " * 6,
+            skills=[f"Skill{j}" for j in range(8)],
+            difficulty="intermediate",
+            estimated_duration_weeks=3,
+        )
+        for i in range(n_projects)
+    ]
+    roadmap = "\n".join(
+        f"- Phase item {i}: study topic and build a small exercise"
+        for i in range(roadmap_lines)
+    )
+    return AnalysisRunOut(
+        id=1,
+        target_role="Data Scientist",
+        skills=SkillProfile(**skills),
+        gap_report=GapReport(**gap),
+        roadmap_md=roadmap,
+        projects=projects,
+    )
+
+
+@case("report")
+def bench_report(quick: bool):
+    sizes = [(20, 4, 40), (200, 20, 400)]
+    for n_skills, n_projects, roadmap_lines in sizes:
+        run = _synthetic_run(n_skills, n_projects, roadmap_lines)
+        yield (
+            f"pdf_{n_skills}s_{n_projects}p",
+            lambda r=run: build_pdf_report(r),
+            {
+                "skills": n_skills,
+                "projects": n_projects,
+                "roadmap_lines": roadmap_lines,
+            },
+        )
+
+
+@case("serialize")
+def bench_serialize(quick: bool):
+    sizes = (
+        [(20, 4, 40), (200, 20, 400)]
+        if quick
+        else [(20, 4, 40), (200, 20, 400), (2000, 100, 4000)]
+    )
+    for n_skills, n_projects, roadmap_lines in sizes:
+        run = _synthetic_run(n_skills, n_projects, roadmap_lines)
+        payload = run.model_dump()
+        meta = {
+            "skills": n_skills,
+            "projects": n_projects,
+            "roadmap_lines": roadmap_lines,
+            "bytes": len(dump_json(run)),
+        }
+        # previous path: plain dict -> jsonable_encoder -> json.dumps
+        yield (
+            f"jsonable_encoder_{n_skills}s_{n_projects}p",
+            lambda p=payload: JSONResponse(jsonable_encoder(p)).body,
+            meta,
+        )
+        yield (
+            f"model_dump_json_{n_skills}s_{n_projects}p",
+            lambda r=run: dump_json(r),
+            meta,
+        )
+
+
+def _legacy_json_loads(text: str):
+    # pre-structured_output repair: fence strip, then greedy DOTALL regex
+    s = text.strip()
+    if s.startswith("```"):
+        s = re.sub(r"^```[a-zA-Z0-9]*\n?", "", s)
+        s = re.sub(r"\n?```$", "", s).strip()
+    try:
+        return json.loads(s)
+    except json.JSONDecodeError:
+        match = re.search(r"(\{.*\}|\[.*\])", s, re.DOTALL)
+        if match:
+            return json.loads(match.group(1))
+        raise
+
+
+@case("structured")
+def bench_structured(quick: bool):
+    """
+    Recovering a project array from chatty output, and failing on output without
+    JSON (where the greedy regex backtracks). The legacy parser is the baseline.
+    """
+    sizes = [5, 50] if quick else [5, 50, 500]
+    for n in sizes:
+        items = (
+            _fallback_projects(
+                {"validated_skills": ["python", "sql", "docker", "llm"]},
+                {"missing_core": ["machine learning"]},
+                "Data Scientist",
+            )
+            * n
+        )
+        chatty = (
+            "Here are {your} projects [as requested]:\n```json\n"
+            + json.dumps(items, indent=2)
+            + "\n```\nLet me know if you'd like changes."
+        )
+        # unclosed brackets: each start position makes the greedy regex scan to the end
+        prose = "Step {1 of [the plan: " * (40 * n)
+
+        def legacy(text):
+            try:
+                return _legacy_json_loads(text)
+            except ValueError:
+                return None
+
+        def scanner(text):
+            try:
+                return scan_json(text, "array")[0]
+            except ValueError:
+                return None
+
+        meta = {
+            "items": len(items),
+            "chars": len(chatty),
+            "prose_chars": len(prose),
+            # the greedy regex spans from "{your}" to the last "}" and fails fast
+            "legacy_recovers_items": legacy(chatty) == items,
+            "scanner_recovers_items": scanner(chatty) == items,
+        }
+
+        yield (f"legacy_regex_chatty_{len(items)}", lambda t=chatty: legacy(t), meta)
+        yield (f"scanner_chatty_{len(items)}", lambda t=chatty: scanner(t), meta)
+        yield (f"legacy_regex_no_json_{len(items)}", lambda t=prose: legacy(t), meta)
+        yield (f"scanner_no_json_{len(items)}", lambda t=prose: scanner(t), meta)
+
+
+def _python_rank(runs, required, top_k):
+    # per-run set intersection over the stored skill lists: the baseline
+    wanted = {r.lower() for r in required}
+    scored = [
+        (len(wanted & {x.lower() for x in skills}), run_id) for run_id, skills in runs
+    ]
+    return sorted(scored, reverse=True)[:top_k]
+
+
+@case("recruiter")
+def bench_recruiter(quick: bool):
+    """
+    Ranking every stored run against a job description: the candidate x skill
+    matrix vs. a Python loop over the runs' skill lists.
+    """
+    import random
+
+    sizes = [10_000, 100_000] if quick else [10_000, 100_000, 300_000]
+    rng = random.Random(7)
+    vocab = [f"Skill{i:03d}" for i in range(300)]
+    required = rng.sample(vocab, 12)
+    for n in sizes:
+        runs = [(i + 1, rng.sample(vocab, rng.randint(5, 25))) for i in range(n)]
+        index = CandidateIndex()
+        for run_id, skills in runs:
+            index.add(run_id, "Data Scientist", skills)
+        meta = {"runs": n, "jd_skills": len(required), "vocab": len(vocab)}
+        meta.update(index.snapshot())
+        yield (
+            f"matrix_rank_{n}_top20",
+            lambda i=index: i.rank(required, 20),
+            meta,
+        )
+        yield (
+            f"python_loop_{n}_top20",
+            lambda r=runs: _python_rank(r, required, 20),
+            meta,
+        )
+
+
+def _python_next_skills(runs, role, known, limit):
+    # per-query pass over the stored runs: the baseline
+    known = set(known)
+    role_count, together = {}, {}
+    role_runs = 0
+    for run_role, skills in runs:
+        if run_role == role:
+            role_runs += 1
+            for s in skills:
+                role_count[s] = role_count.get(s, 0) + 1
+        if known & set(skills):
+            for s in skills:
+                together[s] = together.get(s, 0) + 1
+    scores = {
+        s: role_count.get(s, 0) / max(role_runs, 1) + together[s] for s in together
+    }
+    return sorted((s for s in scores if s not in known), key=scores.get)[-limit:]
+
+
+@case("cooccurrence")
+def bench_cooccurrence(quick: bool):
+    """
+    Next-skill suggestions: the sparse co-occurrence matrix vs. a Python pass over
+    the runs' skill lists per query.
+    """
+    import random
+
+    sizes = [10_000, 100_000]
+    rng = random.Random(11)
+    vocab = [f"Skill{i:03d}" for i in range(300)]
+    roles = [f"Role{i}" for i in range(20)]
+    known = rng.sample(vocab, 8)
+    for n in sizes:
+        runs = [
+            (rng.choice(roles), rng.sample(vocab, rng.randint(5, 25))) for _ in range(n)
+        ]
+        model = CooccurrenceModel()
+        for run_id, (role, skills) in enumerate(runs, start=1):
+            model.add(run_id, role, skills, fold=False)
+        model.fold()
+        meta = {"runs": n, "known_skills": len(known), "vocab": len(vocab)}
+        meta.update(model.snapshot())
+        yield (
+            f"sparse_suggest_{n}_top10",
+            lambda m=model: m.suggest(roles[0], known, 10),
+            meta,
+        )
+        if quick and n > 10_000:
+            continue
+        yield (
+            f"python_loop_{n}_top10",
+            lambda r=runs: _python_next_skills(r, roles[0], known, 10),
+            meta,
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CareerGENAI offline benchmarks")
+    parser.add_argument(
+        "--cases", default=",".join(CASES), help="comma-separated case names"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="smaller sizes, for CI smoke runs"
+    )
+    parser.add_argument("--repeat", type=int, default=None)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument(
+        "--save-baseline", default=None, help="also write results to this path"
+    )
+    parser.add_argument(
+        "--baseline", default=None, help="compare against a saved results file"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown ratio (0.25 = +25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    selected = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in selected if c not in CASES]
+    if unknown:
+        parser.error(
+            f"unknown cases: {', '.join(unknown)} (available: {', '.join(CASES)})"
+        )
+
+    repeat = args.repeat or (3 if args.quick else 10)
+    results = run_cases(selected, quick=args.quick, repeat=repeat)
+
+    write_json(args.output, results)
+    if args.save_baseline:
+        write_json(args.save_baseline, results)
+
+    if args.baseline:
+        rows = compare(results, load_json(args.baseline), args.threshold)
+        regressed = [r for r in rows if r["regressed"]]
+        print()
+        for r in rows:
+            flag = "REGRESSED" if r["regressed"] else "ok"
+            print(
+                f"{r['case']:<60} {r['baseline_ms']:>10.3f} -> {r['current_ms']:>10.3f} ms  x{r['ratio']:<6} {flag}"
+            )
+        if regressed:
+            print(f"\n{len(regressed)} case(s) regressed beyond +{args.threshold:.0%}")
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
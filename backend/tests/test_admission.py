@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.admission import (
+    AdmissionController,
+    AdmissionMiddleware,
+    SLOT_SCOPE_KEY,
+    Shed,
+    analyze_admission,
+)
+from app.main import app as main_app
+
+
+def test_queue_full_is_shed_immediately():
+    async def scenario():
+        ctl = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout_s=1.0)
+        await ctl.acquire()
+        queued = asyncio.ensure_future(ctl.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Shed) as shed:
+            await ctl.acquire()
+        assert shed.value.reason == "queue_full"
+        assert shed.value.retry_after_s >= 1
+
+        ctl.release(0.5)  # slot goes to the queued request
+        await queued
+        assert ctl.in_flight == 1 and ctl.queue_depth == 0
+        ctl.release(0.5)
+        return ctl.snapshot()
+
+    snap = asyncio.run(scenario())
+    assert snap["admitted"] == 2
+    assert snap["shed_queue_full"] == 1
+    assert snap["in_flight"] == 0
+
+
+def test_queue_deadline_sheds_and_frees_queue_slot():
+    async def scenario():
+        ctl = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout_s=0.05)
+        await ctl.acquire()
+        with pytest.raises(Shed) as shed:
+            await ctl.acquire()
+        assert shed.value.reason == "queue_timeout"
+        assert ctl.queue_depth == 0 and ctl.in_flight == 1
+        return ctl
+
+    ctl = asyncio.run(scenario())
+    assert ctl.shed_timeout == 1
+
+
+def test_waiters_are_admitted_in_fifo_order():
+    async def scenario():
+        ctl = AdmissionController(max_in_flight=1, max_queue=3, queue_timeout_s=1.0)
+        await ctl.acquire()
+        order = []
+
+        async def wait(name):
+            await ctl.acquire()
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(wait(n)) for n in "abc"]
+        await asyncio.sleep(0)
+        for _ in range(3):
+            ctl.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_middleware_returns_503_with_retry_after_only_for_gated_routes():
+    ctl = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout_s=0.1)
+    app = FastAPI()
+
+    @app.post("/mentor/analyze")
+    def analyze():
+        return {"ok": True}
+
+    @app.get("/health")
+    def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware, controller=ctl, routes=[("POST", "/mentor/analyze")]
+    )
+    client = TestClient(app)
+
+    assert client.post("/mentor/analyze").status_code == 200
+    assert ctl.in_flight == 0
+
+    ctl.in_flight = 1  # simulate a running analysis
+    r = client.post("/mentor/analyze")
+    assert r.status_code == 503
+    assert int(r.headers["retry-after"]) >= 1
+    assert r.json()["reason"] == "queue_full"
+    assert client.get("/health").status_code == 200
+
+
+def test_work_holding_the_slot_keeps_it_after_the_response():
+    ctl = AdmissionController(max_in_flight=1, max_queue=0, queue_timeout_s=0.1)
+    app = FastAPI()
+    held = []
+
+    @app.post("/mentor/analyze")
+    def analyze(request: Request):
+        # like a shielded analysis that keeps running after the client is gone
+        slot = request.scope[SLOT_SCOPE_KEY]
+        slot.hold()
+        held.append(slot)
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionMiddleware, controller=ctl, routes=[("POST", "/mentor/analyze")]
+    )
+    client = TestClient(app)
+
+    assert client.post("/mentor/analyze").status_code == 200
+    assert ctl.in_flight == 1
+    assert client.post("/mentor/analyze").status_code == 503
+    held[0].release()
+    assert ctl.in_flight == 0
+
+
+def test_admission_rejections_carry_cors_headers(monkeypatch):
+    monkeypatch.setattr(analyze_admission, "in_flight", analyze_admission.max_in_flight)
+    monkeypatch.setattr(analyze_admission, "max_queue", 0)
+    r = TestClient(main_app).post(
+        "/mentor/analyze", headers={"Origin": "https://app.example.com"}
+    )
+    assert r.status_code == 503
+    assert r.headers["access-control-allow-origin"]
+    assert "retry-after" in r.headers["access-control-expose-headers"].lower()
@@ -0,0 +1,110 @@
+import time
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal
+from app.main import app
+from app.services.response_cache import BytesLRU, analysis_cache, etag_matches
+
+client = TestClient(app)
+
+
+def _create_run(created_at=None) -> int:
+    db = SessionLocal()
+    try:
+        run = AnalysisRun(
+            created_at=created_at,
+            target_role="Data Scientist",
+            skills_json={"validated_skills": ["Python"]},
+            gap_report_json={"missing_core": ["sql"]},
+            projects_json=[{"title": "P"}],
+            roadmap_md="# Roadmap",
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def _delete_run(run_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.query(AnalysisRun).filter(AnalysisRun.id == run_id).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_repeat_reads_are_served_from_cache_with_etag():
+    run_id = _create_run()
+    first = client.get(f"/analysis/{run_id}")
+    assert first.status_code == 200
+    assert first.json()["roadmap_md"] == "# Roadmap"
+    cache_control = first.headers["cache-control"]
+    assert (
+        cache_control.startswith("private, max-age=") and "public" not in cache_control
+    )
+    etag = first.headers["etag"]
+
+    hits = analysis_cache.hits
+    second = client.get(f"/analysis/{run_id}")
+    assert analysis_cache.hits == hits + 1
+    assert second.content == first.content
+    assert second.headers["etag"] == etag
+
+    not_modified = client.get(f"/analysis/{run_id}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+
+def test_runs_due_for_retention_are_not_cached():
+    # past its retention deadline, but the retention job has not run yet
+    run_id = _create_run(created_at=datetime(1990, 3, 5, tzinfo=timezone.utc))
+    r = client.get(f"/analysis/{run_id}")
+    assert r.status_code == 200
+    assert r.headers["cache-control"] == "private, max-age=0"
+    assert analysis_cache.get(run_id) is None
+
+    # once the job has removed it, the next read finds nothing
+    _delete_run(run_id)
+    assert client.get(f"/analysis/{run_id}").status_code == 404
+
+
+def test_missing_run_is_not_cached():
+    assert client.get("/analysis/987654321").status_code == 404
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = BytesLRU(max_entries=2, max_bytes=10)
+    cache.put(1, b"aaaa")
+    cache.put(2, b"bbbb")
+    cache.get(1)
+    cache.put(3, b"cccc")  # evicts 2, the least recently used
+    assert cache.get(2) is None and cache.get(1) is not None
+    cache.put(4, b"dddddddd")  # over max_bytes: evicts until it fits
+    assert len(cache) == 1 and cache.size_bytes == 8
+    assert cache.put(5, b"x" * 11)[0] == b"x" * 11 and cache.get(5) is None
+
+    cache.put(6, b"ee", expires_at=time.time() + 0.05)
+    assert cache.get(6) is not None
+    time.sleep(0.06)
+    assert cache.get(6) is None and cache.size_bytes == 8
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('W/"abc", "def"', '"abc"')
+    assert etag_matches("*", '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_report_renders_from_typed_run():
+    run_id = _create_run()
+    r = client.get(f"/analysis/{run_id}/report")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/pdf"
+    assert r.content.startswith(b"%PDF")
+    assert client.get("/analysis/999999999/report").status_code == 404
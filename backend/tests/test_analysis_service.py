@@ -0,0 +1,28 @@
+import json
+from datetime import datetime, timezone
+
+from app.db.models import AnalysisRun
+from app.services.analysis_service import _to_schema, dump_json
+
+
+def test_orm_row_maps_to_response_model():
+    run = AnalysisRun(
+        id=7,
+        target_role="Data Scientist",
+        skills_json={"validated_skills": ["Python"]},
+        # older rows may hold JSON text
+        gap_report_json=json.dumps({"missing_core": ["sql"], "summary": "s"}),
+        projects_json=[{"title": "P", "skills": ["SQL"]}, {"description": "no title"}],
+        roadmap_md=None,
+        created_at=datetime(2025, 1, 2, tzinfo=timezone.utc),
+    )
+    out = _to_schema(run)
+    assert out.skills.validated_skills == ["Python"]
+    assert out.gap_report.missing_core == ["sql"]
+    assert [p.title for p in out.projects] == ["P"]
+    assert out.roadmap_md == ""
+
+    body = json.loads(dump_json(out))
+    assert body["id"] == 7
+    assert body["created_at"].startswith("2025-01-02")
+    assert "cv_text" not in body
@@ -0,0 +1,16 @@
+from benchmarks import corpus
+from benchmarks.harness import compare
+
+
+def test_synthetic_cv_contains_taxonomy_skills():
+    taxonomy = corpus.make_taxonomy(50)
+    text = corpus.make_cv_text(400, 0.5, taxonomy)
+    assert any(meta["canonical"] in text for meta in taxonomy.values())
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"a": {"median_ms": 10.0}, "b": {"median_ms": 10.0}}}
+    current = {"results": {"a": {"median_ms": 10.5}, "b": {"median_ms": 20.0}}}
+    rows = {r["case"]: r for r in compare(current, baseline, threshold=0.25)}
+    assert not rows["a"]["regressed"]
+    assert rows["b"]["regressed"]
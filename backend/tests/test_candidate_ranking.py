@@ -0,0 +1,140 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.db.migrations import upgrade_schema
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.services import candidate_ranking
+from app.services.candidate_ranking import (
+    CandidateIndex,
+    jd_requirements,
+    sync_candidate_index,
+)
+
+upgrade_schema(engine)
+
+client = TestClient(app)
+
+JD = """
+Senior Data Scientist. You will build models in Python with scikit-learn and
+PyTorch, query data with SQL and ship with Docker.
+"""
+
+
+def test_rank_orders_by_coverage_then_newest_run():
+    index = CandidateIndex(rows=2, cols=2)  # forces row and column growth
+    index.add(1, "Data Scientist", ["Python", "SQL"])
+    index.add(2, "Data Scientist", ["Python"])
+    index.add(3, "ML Engineer", ["python", "sql", "Docker"])
+    index.add(4, "Data Scientist", ["Python", "SQL"])
+    assert index.add(4, "Data Scientist", ["Python"]) is False
+
+    ranked = index.rank(["Python", "SQL", "Docker", "Rust"], top_k=3)
+    assert [r["run_id"] for r in ranked] == [3, 4, 1]
+    assert ranked[0]["score"] == 0.75
+    assert ranked[0]["matched"] == ["Python", "SQL", "Docker"]
+    assert ranked[0]["missing"] == ["Rust"]
+    assert ranked[1]["missing"] == ["Docker", "Rust"]
+
+    only_ds = index.rank(["Docker"], top_k=10, role="data scientist")
+    assert [r["run_id"] for r in only_ds] == [4, 2, 1]
+    assert index.rank(["Python"], top_k=5, role="Unknown role") == []
+
+    index.remove(3)
+    assert [r["run_id"] for r in index.rank(["Docker"], top_k=1)] == [4]
+    assert len(index) == 3
+
+
+def test_jd_skills_are_cached_by_hash():
+    jd = f"{JD} Team {uuid.uuid4()}"
+    key, skills, cached = jd_requirements(jd)
+    assert {"Python", "SQL", "Docker"} <= set(skills)
+    assert cached is False
+
+    # the same JD pasted with different whitespace hits the cache
+    again_key, again_skills, cached = jd_requirements("  " + jd.replace("\n", "\n\n "))
+    assert (again_key, again_skills, cached) == (key, skills, True)
+
+
+def _store_run(role: str, skills, run_id=None) -> int:
+    db = SessionLocal()
+    try:
+        run = AnalysisRun(
+            id=run_id,
+            target_role=role,
+            skills_json={"validated_skills": skills},
+            gap_report_json={},
+            projects_json=[],
+            roadmap_md="# Roadmap",
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def test_rank_endpoint_sees_new_and_skips_deleted_runs():
+    role = f"Recruiter Test {uuid.uuid4()}"
+    strong = _store_run(role, ["Python", "SQL", "Docker", "PyTorch"])
+    weak = _store_run(role, ["Python"])
+
+    r = client.post(
+        "/recruiter/rank",
+        json={"job_description": JD, "top_k": 5, "target_role": role},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert {"Python", "SQL", "Docker"} <= set(body["jd_skills"])
+    assert [c["run_id"] for c in body["candidates"]] == [strong, weak]
+    top = body["candidates"][0]
+    assert top["target_role"] == role
+    assert "Python" in top["matched"] and top["score"] > 0.5
+    assert body["candidates"][1]["missing"]
+
+    # runs added later (e.g. by another worker) are picked up incrementally
+    newest = _store_run(role, ["Python", "SQL", "Docker", "PyTorch"])
+    db = SessionLocal()
+    try:
+        db.query(AnalysisRun).filter(AnalysisRun.id == strong).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    body = client.post(
+        "/recruiter/rank",
+        json={"job_description": JD, "top_k": 5, "target_role": role},
+    ).json()
+    assert body["cached"] is True
+    assert [c["run_id"] for c in body["candidates"]] == [newest, weak]
+
+
+def test_sync_picks_up_runs_committed_out_of_id_order(monkeypatch):
+    index = CandidateIndex()
+    monkeypatch.setattr(candidate_ranking, "_index", index)
+    role = f"Recruiter Test {uuid.uuid4()}"
+    first = _store_run(role, ["Python"])
+    # first + 1 is still being committed (by another worker) when first + 2 is read
+    _store_run(role, ["SQL"], run_id=first + 2)
+    db = SessionLocal()
+    try:
+        sync_candidate_index(db)
+        assert index.synced.synced_id == first + 2 and first + 1 not in index
+
+        _store_run(role, ["Docker"], run_id=first + 1)
+        assert sync_candidate_index(db) == 1
+        assert sync_candidate_index(db) == 0
+    finally:
+        db.close()
+    ranked = index.rank(["Docker"], top_k=1, role=role)
+    assert [r["run_id"] for r in ranked] == [first + 1]
+
+
+def test_rank_validates_input():
+    assert (
+        client.post("/recruiter/rank", json={"job_description": ""}).status_code == 422
+    )
+    r = client.post("/recruiter/rank", json={"job_description": JD, "top_k": 0})
+    assert r.status_code == 422
@@ -0,0 +1,43 @@
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal
+from app.main import app  # noqa: F401  (creates/upgrades the schema)
+from app.services.analysis_service import create_analysis_run, get_cv_text
+
+CV = "Experienced data scientist. Python, pandas, SQL and statistics. " * 50
+
+
+def _run_data():
+    return {
+        "target_role": "Data Scientist",
+        "skills": {"validated_skills": ["Python"]},
+        "gap_report": {"missing_core": []},
+        "roadmap_md": "# R",
+        "projects": [],
+        "cv_text": CV,
+        "page_count": 2,
+    }
+
+
+def test_cv_text_is_compressed_deduplicated_and_lazy():
+    db = SessionLocal()
+    try:
+        first = create_analysis_run(db, _run_data())
+        second = create_analysis_run(db, _run_data())
+        doc = first.cv_document
+        assert second.cv_document_id == first.cv_document_id
+        assert doc.original_size == len(CV.encode())
+        assert doc.compressed_size < doc.original_size / 5
+        assert doc.page_count == 2
+        run_id = first.id
+    finally:
+        db.close()
+
+    db = SessionLocal()
+    try:
+        run = db.get(AnalysisRun, run_id)
+        # neither the document nor its text are loaded with the run
+        assert "cv_document" not in run.__dict__
+        assert "text_compressed" not in run.cv_document.__dict__
+        assert get_cv_text(db, run_id) == CV
+    finally:
+        db.close()
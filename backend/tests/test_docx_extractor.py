@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import zipfile
+from io import BytesIO
+
+from docx import Document
+from docx.oxml import parse_xml
+from fastapi import UploadFile
+
+from app.services import parser_service
+from app.services.docx_extractor import extract_docx_text, iter_docx_blocks
+
+
+def _cv_docx() -> bytes:
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Jane Doe | jane@example.com"
+    doc.add_heading("Experience", level=1)
+    doc.add_paragraph("Data analyst at Acme")
+    doc.add_paragraph("Skills")
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = "Languages"
+    table.cell(0, 1).text = "Python, SQL"
+    table.cell(1, 0).text = "ML"
+    table.cell(1, 1).text = "PyTorch"
+    doc.add_paragraph("Closing line")
+    buffer = BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def test_blocks_are_ordered_and_tagged_by_section():
+    blocks = [(b.kind, b.text, b.section) for b in iter_docx_blocks(_cv_docx())]
+    assert blocks == [
+        ("header", "Jane Doe | jane@example.com", None),
+        ("heading", "Experience", "Experience"),
+        ("paragraph", "Data analyst at Acme", "Experience"),
+        ("heading", "Skills", "Skills"),
+        ("table_row", "Languages | Python, SQL", "Skills"),
+        ("table_row", "ML | PyTorch", "Skills"),
+        ("paragraph", "Closing line", "Skills"),
+    ]
+
+
+def test_table_text_that_python_docx_paragraphs_miss_is_recovered():
+    data = _cv_docx()
+    legacy = "\n".join(p.text for p in Document(BytesIO(data)).paragraphs)
+    assert "PyTorch" not in legacy
+    assert "PyTorch" in extract_docx_text(data)
+
+
+def _raw_docx(body: str) -> bytes:
+    xml = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/'
+        f'2006/main"><w:body>{body}</w:body></w:document>'
+    )
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        zf.writestr("word/document.xml", xml)
+    return buffer.getvalue()
+
+
+def test_text_boxes_and_nested_tables():
+    body = (
+        "<w:p><w:r><w:t>Intro</w:t></w:r><w:r><w:pict><w:txbxContent>"
+        "<w:p><w:r><w:t>Docker</w:t><w:tab/><w:t>Kubernetes</w:t></w:r></w:p>"
+        "</w:txbxContent></w:pict></w:r></w:p>"
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Outer</w:t></w:r></w:p>"
+        "<w:tbl><w:tr><w:tc><w:p><w:r><w:t>Inner</w:t></w:r></w:p></w:tc></w:tr></w:tbl>"
+        "</w:tc></w:tr></w:tbl>"
+    )
+    assert extract_docx_text(_raw_docx(body)).splitlines() == [
+        "Docker\tKubernetes",
+        "Intro",
+        "Outer Inner",
+    ]
+
+
+# One text box as Word 2010+ saves it: the DrawingML copy in mc:Choice and the same
+# text again as VML in mc:Fallback.
+WORD_TEXT_BOX_RUN = """\
+<w:r
+  xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+  xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"
+  xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"
+  xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"
+  xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"
+  xmlns:v="urn:schemas-microsoft-com:vml"><mc:AlternateContent>
+  <mc:Choice Requires="wps"><w:drawing><wp:anchor><wp:docPr id="1" name="Text Box 1"/>
+    <a:graphic><a:graphicData
+      uri="http://schemas.microsoft.com/office/word/2010/wordprocessingShape">
+      <wps:wsp><wps:txbx><w:txbxContent>
+        <w:p><w:r><w:t>Python Docker</w:t></w:r></w:p>
+      </w:txbxContent></wps:txbx></wps:wsp>
+    </a:graphicData></a:graphic>
+  </wp:anchor></w:drawing></mc:Choice>
+  <mc:Fallback><w:pict><v:shape id="Text Box 1"><v:textbox><w:txbxContent>
+    <w:p><w:r><w:t>Python Docker</w:t></w:r></w:p>
+  </w:txbxContent></v:textbox></v:shape></w:pict></mc:Fallback>
+</mc:AlternateContent></w:r>"""
+
+
+def test_text_box_fallback_copy_is_skipped():
+    doc = Document()
+    paragraph = doc.add_paragraph()
+    paragraph._p.append(parse_xml(WORD_TEXT_BOX_RUN))
+    paragraph.add_run("Outer")
+    doc.add_paragraph("Skills")
+    buffer = BytesIO()
+    doc.save(buffer)
+    assert extract_docx_text(buffer.getvalue()).splitlines() == [
+        "Python Docker",
+        "Outer",
+        "Skills",
+    ]
+
+
+def test_upload_is_parsed_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def fake_extract(data):
+        threads.append(threading.current_thread())
+        return "text"
+
+    monkeypatch.setattr(parser_service, "extract_docx_text", fake_extract)
+    upload = UploadFile(BytesIO(b"PK"), filename="cv.docx")
+    assert asyncio.run(parser_service.extract_document(upload)) == ("text", None)
+    assert threads and threads[0] is not threading.main_thread()
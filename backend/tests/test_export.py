@@ -0,0 +1,79 @@
+import json
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import manage
+from app.core.config import settings
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal
+from app.main import app
+
+client = TestClient(app, headers={"X-Admin-Token": "s3cret"})
+ROLE = f"Export Test Role {uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+
+
+@pytest.fixture(scope="module")
+def runs():
+    db = SessionLocal()
+    try:
+        rows = [
+            AnalysisRun(
+                target_role=ROLE,
+                skills_json={"validated_skills": [f"s{i}"]},
+                gap_report_json={},
+                projects_json=[],
+                roadmap_md=f"# {i}",
+            )
+            for i in range(5)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [r.id for r in rows]
+    finally:
+        db.close()
+
+
+def test_ndjson_export_streams_filtered_rows(runs):
+    r = client.get("/export/runs", params={"role": ROLE, "chunk_size": 2})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == runs
+    assert rows[0]["skills"] == {"validated_skills": ["s0"]}
+
+
+def test_export_requires_admin_token(runs, monkeypatch):
+    r = client.get("/export/runs", headers={"X-Admin-Token": "wrong"})
+    assert r.status_code == 403
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")  # no token configured
+    assert client.get("/export/runs").status_code == 403
+
+
+def test_date_filter_and_unknown_format(runs):
+    r = client.get("/export/runs", params={"role": ROLE, "until": "2000-01-01"})
+    assert r.text == ""
+    assert client.get("/export/runs", params={"format": "csv"}).status_code == 422
+
+
+def test_parquet_export_round_trips(runs):
+    pq = pytest.importorskip("pyarrow.parquet")
+    import pyarrow as pa
+
+    r = client.get(
+        "/export/runs", params={"role": ROLE, "format": "parquet", "chunk_size": 2}
+    )
+    table = pq.read_table(pa.BufferReader(r.content))
+    assert table.column("id").to_pylist() == runs
+
+
+def test_cli_writes_ndjson(runs, tmp_path):
+    out = tmp_path / "runs.ndjson"
+    assert manage.main(["export-runs", "--role", ROLE, "--output", str(out)]) == 0
+    assert len(out.read_text().splitlines()) == len(runs)
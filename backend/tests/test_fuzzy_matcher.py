@@ -0,0 +1,48 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.services.fuzzy_matcher import FuzzySkillIndex, candidate_phrases
+
+TAXONOMY = {
+    "pytorch": {"canonical": "PyTorch", "aliases": ["torch"]},
+    "scikit-learn": {"canonical": "Scikit-learn", "aliases": ["sklearn"]},
+    "postgresql": {"canonical": "PostgreSQL", "aliases": ["postgres"]},
+    "pandas": {"canonical": "Pandas", "aliases": []},
+    "r": {"canonical": "R", "aliases": []},
+}
+
+
+def _match(text, threshold=0.75):
+    index = FuzzySkillIndex(TAXONOMY, threshold=0.75)
+    return {c: p for c, p, _ in index.match(candidate_phrases(text), threshold)}
+
+
+def test_matches_misspelled_and_split_variants():
+    found = _match("Built models in Pytorch2 and scikitlearn on Postgre SQL data")
+    assert found["PyTorch"] == "pytorch2"
+    assert found["Scikit-learn"] == "scikitlearn"
+    assert found["PostgreSQL"] == "postgresql"
+
+
+def test_short_names_and_unrelated_words_do_not_match():
+    found = _match("Reading, writing and running marathons")
+    assert found == {}
+
+
+def test_prefix_filter_agrees_with_full_product():
+    index = FuzzySkillIndex(TAXONOMY, threshold=0.6)
+    phrases = candidate_phrases("pytorh sklern postgress pandass torchvision")
+    # thresholds below the index threshold take the exhaustive path
+    filtered = {(c, p) for c, p, _ in index.match(phrases, 0.6)}
+    full = {(c, p) for c, p, s in index.match(phrases, 0.599) if s >= 0.6 - 1e-6}
+    assert filtered == full
+    assert all(0.0 < s <= 1.0 for _, _, s in index.match(phrases, 0.6))
+
+
+def test_ngram_size_is_bounded_by_the_int64_codes():
+    assert FuzzySkillIndex(TAXONOMY, n=5).match(candidate_phrases("pytorch"), 0.75)
+    with pytest.raises(ValueError):
+        FuzzySkillIndex(TAXONOMY, n=8)
+    with pytest.raises(ValidationError):
+        Settings(DATABASE_URL="sqlite://", SKILL_FUZZY_NGRAM=8)
@@ -0,0 +1,159 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.migrations import upgrade_schema
+from app.db.models import AnalysisRun, IdempotencyKey
+from app.db.session import SessionLocal, engine
+from app.schemas.analysis import AnalyzeResponse
+from app.services import idempotency_service as idem
+
+upgrade_schema(engine)
+
+
+def _key() -> str:
+    return f"test-{uuid.uuid4()}"
+
+
+def _create_run() -> int:
+    db = SessionLocal()
+    try:
+        run = AnalysisRun(
+            target_role="Data Scientist",
+            skills_json={"validated_skills": ["Python"]},
+            gap_report_json={"missing_core": ["sql"]},
+            projects_json=[],
+            roadmap_md="# Roadmap",
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def _age(key: str, **delta) -> None:
+    db = SessionLocal()
+    try:
+        old = datetime.now(timezone.utc) - timedelta(**delta)
+        record = db.get(IdempotencyKey, key)
+        record.created_at = record.updated_at = old
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_claim_states():
+    key = _key()
+    assert idem.claim_key(key, "fp") == (idem.OWNER, None)
+    assert idem.claim_key(key, "fp") == (idem.IN_PROGRESS, None)
+    with pytest.raises(idem.KeyReused):
+        idem.claim_key(key, "other")
+
+    idem.finish_key(key, 42)
+    assert idem.claim_key(key, "fp") == (idem.COMPLETED, 42)
+
+
+def test_failed_stale_and_expired_keys_are_taken_over():
+    failed = _key()
+    idem.claim_key(failed, "fp")
+    idem.finish_key(failed, None)
+    assert idem.claim_key(failed, "fp") == (idem.OWNER, None)
+
+    stale = _key()
+    idem.claim_key(stale, "fp")
+    _age(stale, hours=1)
+    assert idem.claim_key(stale, "fp") == (idem.OWNER, None)
+    assert idem.claim_key(stale, "fp") == (idem.IN_PROGRESS, None)
+
+    expired = _key()
+    idem.claim_key(expired, "fp")
+    idem.finish_key(expired, 1)
+    _age(expired, days=2)
+    assert idem.claim_key(expired, "another request") == (idem.OWNER, None)
+
+
+def test_concurrent_duplicates_run_the_pipeline_once():
+    key = _key()
+    run_id = _create_run()
+    calls = []
+
+    async def pipeline():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return AnalyzeResponse(
+            run_id=run_id,
+            target_role="Data Scientist",
+            skills={"validated_skills": ["Python"]},
+            gap_report={},
+            roadmap_md="# Roadmap",
+            reused=True,
+            reused_from={"run_id": 1, "jaccard": 0.9},
+        )
+
+    async def scenario():
+        first = asyncio.ensure_future(idem.execute_once(key, "fp", pipeline))
+        await asyncio.sleep(0.05)
+        second = await idem.execute_once(key, "fp", pipeline)
+        return await first, second, await idem.execute_once(key, "fp", pipeline)
+
+    (first, replayed1), (second, replayed2), (third, replayed3) = asyncio.run(
+        scenario()
+    )
+    assert len(calls) == 1
+    assert (replayed1, replayed2, replayed3) == (False, True, True)
+    assert first == second == third  # replays return the stored response
+    assert second.reused and second.reused_from.jaccard == 0.9
+    assert second.run_id == run_id
+
+
+def test_waiter_takes_over_when_the_first_attempt_fails():
+    key = _key()
+    run_id = _create_run()
+    calls = []
+
+    async def pipeline():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        if len(calls) == 1:
+            raise RuntimeError("LLM down")
+        return AnalyzeResponse(
+            run_id=run_id, target_role="Data Scientist", skills={}, gap_report={}
+        )
+
+    async def scenario():
+        first = asyncio.ensure_future(idem.execute_once(key, "fp", pipeline))
+        await asyncio.sleep(0.02)
+        second = await idem.execute_once(key, "fp", pipeline)
+        with pytest.raises(RuntimeError):
+            await first
+        return second
+
+    response, replayed = asyncio.run(scenario())
+    assert (response.run_id, replayed, len(calls)) == (run_id, False, 2)
+    assert idem.claim_key(key, "fp") == (idem.COMPLETED, run_id)
+
+
+def test_key_of_an_archived_run_is_run_again():
+    key = _key()
+    idem.claim_key(key, "fp")
+    idem.finish_key(key, 999_999_999)  # no such run any more
+    run_id = _create_run()
+
+    async def pipeline():
+        return AnalyzeResponse(
+            run_id=run_id, target_role="Data Scientist", skills={}, gap_report={}
+        )
+
+    response, replayed = asyncio.run(idem.execute_once(key, "fp", pipeline))
+    assert (response.run_id, replayed) == (run_id, False)
+
+
+def test_fingerprint_covers_role_filename_and_content():
+    base = idem.request_fingerprint("Data Scientist", "cv.pdf", b"data")
+    assert base == idem.request_fingerprint("Data Scientist", "cv.pdf", b"data")
+    assert base != idem.request_fingerprint("ML Engineer", "cv.pdf", b"data")
+    assert base != idem.request_fingerprint("Data Scientist", "cv2.pdf", b"data")
+    assert base != idem.request_fingerprint("Data Scientist", "cv.pdf", b"datb")
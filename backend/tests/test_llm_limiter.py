@@ -0,0 +1,38 @@
+import threading
+
+import pytest
+
+from app.core.llm_limiter import ProviderLimiter, RateLimitedError
+
+
+def test_rpm_bucket_rejects_after_budget():
+    limiter = ProviderLimiter("t", rpm=2, tpm=0, max_concurrency=8)
+    limiter.acquire(10, max_wait_s=0).release()
+    limiter.acquire(10, max_wait_s=0).release()
+    with pytest.raises(RateLimitedError):
+        limiter.acquire(10, max_wait_s=0.01)
+    assert limiter.snapshot()["rejected"] == 1
+
+
+def test_aimd_increases_on_success_and_halves_on_429():
+    limiter = ProviderLimiter("t", rpm=0, tpm=0, max_concurrency=16)
+    start = limiter.limit
+    for _ in range(8):
+        limiter.acquire(1, max_wait_s=0).release()
+    grown = limiter.limit
+    assert grown > start
+
+    limiter.acquire(1, max_wait_s=0).release(throttled=True)
+    assert limiter.limit == pytest.approx(max(1.0, grown * 0.5))
+
+
+def test_queued_caller_gets_freed_slot_and_wait_is_reported():
+    limiter = ProviderLimiter("t", rpm=0, tpm=0, max_concurrency=1)
+    limiter.limit = 1.0
+    held = limiter.acquire(1, max_wait_s=0)
+    threading.Timer(0.05, held.release).start()
+
+    permit = limiter.acquire(1, max_wait_s=1.0)
+    assert permit.wait_s >= 0.04
+    permit.release()
+    assert limiter.snapshot()["queue_wait_ms"]["max"] >= 40
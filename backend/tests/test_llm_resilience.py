@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from tenacity import wait_fixed
+
+from app.core import llm_limiter, llm_resilience
+from app.core.llm_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LLMTimeoutError,
+    invoke_llm,
+)
+from app.core.stub_llm import StubLLMError
+from app.services.roadmap_service import generate_roadmap
+
+
+class _FlakyLLM:
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture(autouse=True)
+def _fast_settings(monkeypatch):
+    monkeypatch.setattr(llm_resilience.settings, "LLM_RETRY_BACKOFF_S", 0.001)
+    monkeypatch.setattr(llm_resilience.settings, "LLM_RETRY_BACKOFF_MAX_S", 0.002)
+    monkeypatch.setattr(llm_resilience.settings, "LLM_PROVIDER", "test-provider")
+    llm_resilience._breakers.clear()
+    yield
+    llm_resilience._breakers.clear()
+
+
+def test_retries_only_retryable_errors():
+    flaky = _FlakyLLM([StubLLMError("throttled", 429)])
+    assert invoke_llm("p", get_client=lambda: flaky) == "ok"
+    assert flaky.calls == 2
+
+    bad = _FlakyLLM([StubLLMError("bad request", 400)])
+    with pytest.raises(StubLLMError):
+        invoke_llm("p", get_client=lambda: bad)
+    assert bad.calls == 1
+
+
+def test_attempt_deadline(monkeypatch):
+    monkeypatch.setattr(llm_resilience.settings, "LLM_TIMEOUT_S", 0.05)
+    monkeypatch.setattr(llm_resilience.settings, "LLM_MAX_ATTEMPTS", 1)
+
+    class _Hung:
+        def invoke(self, prompt):
+            time.sleep(0.5)
+
+    with pytest.raises(LLMTimeoutError):
+        invoke_llm("p", get_client=_Hung)
+
+
+def test_breaker_opens_half_opens_and_closes():
+    breaker = CircuitBreaker("x", failure_threshold=2, reset_timeout_s=0.05)
+    breaker.record_failure(RuntimeError())
+    assert breaker.allow()
+    breaker.record_failure(RuntimeError())
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()  # probe
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retry_past_the_deadline_leaves_the_probe_free(monkeypatch):
+    s = llm_resilience.settings
+    monkeypatch.setattr(s, "LLM_BREAKER_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(s, "LLM_BREAKER_RESET_S", 0.01)
+    monkeypatch.setattr(s, "LLM_TOTAL_DEADLINE_S", 0.05)
+    unlimited = llm_limiter.ProviderLimiter("test-provider", 0, 0, max_concurrency=8)
+    monkeypatch.setitem(llm_limiter._limiters, "test-provider", unlimited)
+    # the backoff outlasts both the reset timeout and the total deadline
+    monkeypatch.setattr(
+        llm_resilience, "wait_random_exponential", lambda **kw: wait_fixed(0.06)
+    )
+    flaky = _FlakyLLM([StubLLMError("unavailable", 503)])
+
+    with pytest.raises(LLMTimeoutError):
+        invoke_llm("p", get_client=lambda: flaky)
+    assert flaky.calls == 1
+    breaker = llm_resilience.get_breaker("test-provider")
+    assert breaker.allow()  # the next call gets the half-open probe
+
+
+def test_open_circuit_goes_straight_to_fallback():
+    breaker = llm_resilience.get_breaker("test-provider")
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(RuntimeError("down"))
+
+    with pytest.raises(CircuitOpenError):
+        invoke_llm("p", get_client=lambda: pytest.fail("client must not be built"))
+
+    start = time.perf_counter()
+    roadmap = generate_roadmap({}, {"missing_core": ["sql"]}, "Data Scientist")
+    assert (time.perf_counter() - start) < 0.01
+    assert roadmap.startswith("# Personalized Learning Roadmap")
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from app.core import llm_resilience, llm_router
+from app.core.llm_resilience import CircuitOpenError
+from app.core.llm_router import LLMRouter
+
+
+@pytest.fixture(autouse=True)
+def _settings(monkeypatch):
+    s = llm_router.settings
+    monkeypatch.setattr(s, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(s, "LLM_HEDGE_BUDGET", 1.0)
+    monkeypatch.setattr(s, "LLM_HEDGE_MIN_DELAY_S", 0.01)
+    monkeypatch.setattr(llm_router, "EXPLORE_RATE", 0.0)
+    llm_resilience._breakers.clear()
+    yield
+    llm_resilience._breakers.clear()
+
+
+def _fake_providers(monkeypatch, latency_s, errors=()):
+    calls = []
+
+    def invoke_provider(provider, prompt, json_shape=None):
+        calls.append(provider)
+        time.sleep(latency_s[provider])
+        if provider in errors:
+            raise errors[provider]
+        return provider
+
+    monkeypatch.setattr(llm_router, "invoke_provider", invoke_provider)
+    return calls
+
+
+def _warm(router, provider, latency_s, n=25):
+    for _ in range(n):
+        router.stats[provider].record(latency_s, ok=True)
+
+
+def test_fastest_healthy_provider_is_chosen(monkeypatch):
+    _fake_providers(monkeypatch, {"a": 0.0, "b": 0.0})
+    router = LLMRouter(["a", "b"])
+    assert router.ranked() == ["a", "b"]  # unmeasured: configuration order
+
+    _warm(router, "a", 2.0)
+    _warm(router, "b", 0.5)
+    assert router.ranked() == ["b", "a"]
+    assert router.invoke("p") == "b"
+
+    for _ in range(10):
+        router.stats["b"].record(1.0, ok=False)
+    assert not router.stats["b"].healthy()
+    assert router.ranked() == ["a", "b"]
+
+    router = LLMRouter(["a", "b"])
+    for _ in range(llm_resilience.get_breaker("a").failure_threshold):
+        llm_resilience.get_breaker("a").record_failure(RuntimeError("down"))
+    assert router.ranked() == ["b", "a"]  # open circuit goes last
+
+
+def test_unhealthy_provider_recovers_while_idle(monkeypatch):
+    router = LLMRouter(["a", "b"])
+    _warm(router, "a", 2.0)
+    _warm(router, "b", 0.5)
+    for _ in range(10):
+        router.stats["b"].record(1.0, ok=False)
+    assert router.ranked() == ["a", "b"]
+
+    # no calls reach "b" any more, but its error rate decays with time
+    monkeypatch.setattr(llm_router, "ERROR_HALF_LIFE_S", 0.01)
+    time.sleep(0.1)
+    assert router.stats["b"].error_rate() < 0.01
+    assert router.ranked() == ["b", "a"]
+
+
+def test_slow_primary_is_hedged_to_the_runner_up(monkeypatch):
+    calls = _fake_providers(monkeypatch, {"a": 0.3, "b": 0.01})
+    router = LLMRouter(["a", "b"])
+    _warm(router, "a", 0.02)
+    _warm(router, "b", 0.05)
+
+    started = time.perf_counter()
+    assert router.invoke("p") == "b"
+    assert time.perf_counter() - started < 0.25
+    assert calls == ["a", "b"]
+    assert router.hedged == 1 and router.hedge_wins == 1
+
+
+def test_hedging_is_capped_by_budget(monkeypatch):
+    llm_router.settings.LLM_HEDGE_BUDGET = 0.0
+    calls = _fake_providers(monkeypatch, {"a": 0.1, "b": 0.0})
+    router = LLMRouter(["a", "b"])
+    router._hedge_tokens = 0.0
+    _warm(router, "a", 0.02)
+    _warm(router, "b", 0.05)
+
+    assert router.invoke("p") == "a"
+    assert calls == ["a"]
+    assert router.hedged == 0 and router.hedges_skipped == 1
+
+
+def test_fast_rejections_fail_over(monkeypatch):
+    _fake_providers(
+        monkeypatch, {"a": 0.0, "b": 0.0}, errors={"a": CircuitOpenError("open")}
+    )
+    router = LLMRouter(["a", "b"])
+    assert router.invoke("p") == "b"
+    assert router.failovers == 1
+    assert router.stats["a"].calls == 0  # rejected calls are not latency samples
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from fastapi import UploadFile
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from app.services import parser_service, pdf_extractor
+from app.services.pdf_extractor import extract_pdf_text, page_ranges
+
+
+def _pdf(pages) -> bytes:
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    for text in pages:
+        if text:
+            c.drawString(40, 800, text)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def test_page_ranges_cover_all_pages_in_order():
+    assert page_ranges(17, 8) == [(0, 8), (8, 16), (16, 17)]
+    assert page_ranges(0, 8) == []
+
+
+def test_fast_mode_matches_layout_mode_and_keeps_page_order():
+    data = _pdf([f"Page {i} Python SQL" for i in range(5)])
+    fast, pages = extract_pdf_text(data, "fast")
+    layout, _ = extract_pdf_text(data, "layout")
+    assert pages == 5
+    assert fast.split() == layout.split()
+
+
+def test_only_empty_pages_fall_back_to_pdfplumber(monkeypatch):
+    data = _pdf(["Python", None, "Docker"])
+    calls = []
+    original = pdf_extractor._layout_pages
+    monkeypatch.setattr(
+        pdf_extractor,
+        "_layout_pages",
+        lambda d, idx=None: calls.append(idx) or original(d, idx),
+    )
+    text, pages = extract_pdf_text(data, "fast")
+    assert pages == 3 and calls == [[1]]
+    assert text.split() == ["Python", "Docker"]
+
+
+def test_parallel_ranges_are_reassembled_in_order(monkeypatch):
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_WORKERS", 2)
+    data = _pdf([f"Page{i}" for i in range(5)])
+    text, _ = extract_pdf_text(data, "fast")
+    assert text.split() == [f"Page{i}" for i in range(5)]
+
+
+def test_upload_is_parsed_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def fake_extract(data):
+        threads.append(threading.current_thread())
+        return "text", 1
+
+    monkeypatch.setattr(parser_service, "extract_pdf_text", fake_extract)
+    upload = UploadFile(BytesIO(b"%PDF"), filename="cv.pdf")
+    assert asyncio.run(parser_service.extract_document(upload)) == ("text", 1)
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_in_process_pdfium_calls_are_serialized(monkeypatch):
+    active, peak = [0], [0]
+    original = pdf_extractor.pdfium.PdfDocument
+
+    def document(data):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        time.sleep(0.01)
+        active[0] -= 1
+        return original(data)
+
+    monkeypatch.setattr(pdf_extractor.pdfium, "PdfDocument", document)
+    data = _pdf(["Python"])
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(extract_pdf_text, [data] * 8))
+    assert all(text.split() == ["Python"] for text, _ in results)
+    assert peak[0] == 1
+
+
+class _BrokenPool:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker process died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_broken_process_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(pdf_extractor.settings, "PDF_WORKERS", 2)
+    broken = _BrokenPool()
+    monkeypatch.setattr(pdf_extractor, "_pool", broken)
+
+    text, _ = extract_pdf_text(_pdf([f"Page{i}" for i in range(5)]), "fast")
+    assert text.split() == [f"Page{i}" for i in range(5)]
+    assert pdf_extractor._pool is not broken
@@ -0,0 +1,47 @@
+import json
+
+from app.services import plan_service, structured_output
+
+SKILLS = {"validated_skills": ["Python"], "inferred_domains": ["language"]}
+GAP = {"strengths": ["python"], "missing_core": ["sql"], "missing_nice_to_have": []}
+
+
+def test_combined_response_is_split_and_validated(monkeypatch):
+    payload = {
+        "roadmap_md": "# Roadmap\n## Phase 0 – Foundations",
+        "projects": [
+            {
+                "title": "SQL Analytics",
+                "skills": ["SQL"],
+                "estimated_duration_weeks": 3,
+            },
+            {"title": "Bad weeks", "estimated_duration_weeks": "a few"},
+            {"description": "no title"},
+        ],
+    }
+    monkeypatch.setattr(
+        structured_output, "invoke_llm", lambda prompt, **kw: json.dumps(payload)
+    )
+    roadmap, projects = plan_service.generate_plan(SKILLS, GAP, "Data Scientist")
+    assert roadmap.startswith("# Roadmap")
+    assert [p["title"] for p in projects] == ["SQL Analytics"]
+
+
+def test_only_failed_part_is_re_requested(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        structured_output,
+        "invoke_llm",
+        lambda prompt, **kw: json.dumps({"roadmap_md": "# R"}),
+    )
+    monkeypatch.setattr(
+        plan_service, "generate_roadmap", lambda *a: calls.append("roadmap") or "x"
+    )
+    monkeypatch.setattr(
+        plan_service,
+        "recommend_projects",
+        lambda *a: calls.append("projects") or [{"title": "P"}],
+    )
+    roadmap, projects = plan_service.generate_plan(SKILLS, GAP, "Data Scientist")
+    assert roadmap == "# R"
+    assert calls == ["projects"]
@@ -0,0 +1,104 @@
+import pstats
+import time
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware, profiled
+from app.main import app as main_app
+
+
+@profiled
+def _blocking_work(n: int) -> int:
+    time.sleep(0.01)
+    return sum(i * i for i in range(n))
+
+
+def _profiled_client(tmp_path, sample_rate=0.0):
+    app = FastAPI()
+
+    @app.post("/work")
+    async def work():
+        return {"total": await run_in_threadpool(_blocking_work, 10_000)}
+
+    store = ProfileStore(str(tmp_path), max_files=3)
+    middleware = ProfilingMiddleware(
+        app, store=store, sampled_routes=[("POST", "/work")], sample_rate=sample_rate
+    )
+    return TestClient(middleware), store, middleware
+
+
+def test_admin_header_profiles_request_across_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    client, store, _ = _profiled_client(tmp_path)
+
+    r = client.post("/work", headers={"X-Profile": "s3cret"})
+    assert r.status_code == 200
+    profile_id = r.headers["x-profile-id"]
+
+    [meta] = store.list()
+    assert meta["id"] == profile_id
+    assert meta["trigger"] == "header"
+    assert meta["status"] == 200
+    assert meta["threads"] == 2  # event loop + threadpool call
+
+    stats = pstats.Stats(store.prof_path(profile_id))
+    functions = {name for _, _, name in stats.stats}
+    assert "_blocking_work" in functions
+    assert "_blocking_work" in store.render(profile_id)
+
+
+def test_requests_without_valid_token_are_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    client, store, _ = _profiled_client(tmp_path)
+
+    assert "x-profile-id" not in client.post("/work").headers
+    r = client.post("/work", headers={"X-Profile": "guess"})
+    assert "x-profile-id" not in r.headers
+    assert store.list() == []
+
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "")  # no token configured
+    r = client.post("/work", headers={"X-Profile": ""})
+    assert "x-profile-id" not in r.headers
+
+
+def test_sampling_and_ring_buffer_bound(tmp_path):
+    client, store, middleware = _profiled_client(tmp_path, sample_rate=1.0)
+
+    ids = [client.post("/work").headers["x-profile-id"] for _ in range(5)]
+    assert middleware.saved == 5
+    assert [m["id"] for m in store.list()] == ids[::-1][:3]
+    assert len(list(tmp_path.iterdir())) == 6  # .prof + .json per kept profile
+    assert store.prof_path(ids[0]) is None
+
+
+def test_profiled_is_a_plain_call_outside_profiled_requests():
+    assert _blocking_work(10) == 285
+
+
+def test_admin_profile_endpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "s3cret")
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    client, _, _ = _profiled_client(tmp_path)
+    profile_id = client.post("/work", headers={"X-Profile": "s3cret"}).headers[
+        "x-profile-id"
+    ]
+
+    admin = TestClient(main_app)
+    assert admin.get("/admin/profiles").status_code == 403
+    headers = {"X-Admin-Token": "s3cret"}
+
+    listing = admin.get("/admin/profiles", headers=headers).json()
+    assert [p["id"] for p in listing["profiles"]] == [profile_id]
+
+    r = admin.get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/octet-stream"
+
+    r = admin.get(f"/admin/profiles/{profile_id}?format=text", headers=headers)
+    assert "_blocking_work" in r.text
+
+    r = admin.get("/admin/profiles/..%2Fetc", headers=headers)
+    assert r.status_code == 404
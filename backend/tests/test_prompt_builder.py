@@ -0,0 +1,30 @@
+from app.services.prompt_builder import build_prompt, candidate_context
+from app.services.roadmap_service import ROADMAP_INSTRUCTIONS
+
+
+def _context(n):
+    skills = {"validated_skills": [f"Skill{i}" for i in range(n)]}
+    gap = {
+        "missing_core": [f"core{i}" for i in range(n)],
+        "missing_nice_to_have": [f"nice{i}" for i in range(n)],
+    }
+    return candidate_context(skills, gap, "Data Scientist")
+
+
+def test_static_instructions_are_a_stable_prefix():
+    a = build_prompt("roadmap", ROADMAP_INSTRUCTIONS, *_context(3))
+    b = build_prompt("roadmap", ROADMAP_INSTRUCTIONS, *_context(30))
+    assert a.text.startswith(ROADMAP_INSTRUCTIONS)
+    assert b.text.startswith(ROADMAP_INSTRUCTIONS)
+    assert "['" not in a.text  # lists are not pasted as Python reprs
+
+
+def test_long_lists_are_trimmed_to_budget_least_important_first():
+    prompt = build_prompt("roadmap", ROADMAP_INSTRUCTIONS, *_context(500), budget=300)
+    assert prompt.context_tokens <= 300
+    assert "Missing nice-to-have skills" in prompt.trimmed
+    assert (
+        prompt.trimmed.get("Missing core skills", 0)
+        < prompt.trimmed["Missing nice-to-have skills"]
+    )
+    assert "more)" in prompt.text
@@ -0,0 +1,118 @@
+import gzip
+import json
+import uuid
+import zlib
+from datetime import date, datetime, timezone
+
+from app.db import partitions
+from app.db.models import AnalysisRun, ArchivedAnalysisRun, CVDocument
+from app.db.session import SessionLocal, engine
+from app.main import app  # noqa: F401  (creates/upgrades the schema)
+from app.services.analysis_service import get_or_create_cv_document
+from app.services.retention_service import apply_retention
+
+# far in the past so other tests' rows are never expired
+OLD = datetime(1990, 3, 15, tzinfo=timezone.utc)
+
+
+def _add_runs(created: datetime, n: int):
+    role = f"Retention {uuid.uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        rows = [
+            AnalysisRun(target_role=role, created_at=created, roadmap_md="# R")
+            for _ in range(n)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [r.id for r in rows]
+    finally:
+        db.close()
+
+
+def _remaining(ids):
+    db = SessionLocal()
+    try:
+        return db.query(AnalysisRun).filter(AnalysisRun.id.in_(ids)).count()
+    finally:
+        db.close()
+
+
+def test_month_helpers():
+    assert partitions.add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert partitions.add_months(date(2025, 1, 1), -1) == date(2024, 12, 1)
+    assert partitions.partition_name(date(2025, 2, 1)) == "analysis_runs_p2025_02"
+    assert partitions.parse_partition_name("analysis_runs_p2025_02") == date(2025, 2, 1)
+    assert partitions.parse_partition_name("analysis_runs_default") is None
+    assert partitions.months_between(date(2024, 12, 10), date(2025, 2, 1)) == [
+        date(2024, 12, 1),
+        date(2025, 1, 1),
+    ]
+    assert partitions.partition_bounds(date(2024, 12, 1)) == (
+        "FOR VALUES FROM ('2024-12-01 00:00:00+00') TO ('2025-01-01 00:00:00+00')"
+    )
+
+
+def test_retention_archives_old_runs():
+    ids = _add_runs(OLD, 3)
+    summary = apply_retention(
+        engine, keep_months=1, mode="archive", today=date(1990, 5, 2)
+    )
+    [march] = [m for m in summary if m["month"] == "1990-03"]
+    assert (march["runs"], march["target"]) == (3, "analysis_runs_archive")
+    assert _remaining(ids) == 0
+
+    db = SessionLocal()
+    try:
+        archived = db.get(ArchivedAnalysisRun, ids[0])
+        assert json.loads(zlib.decompress(archived.payload))["roadmap_md"] == "# R"
+    finally:
+        db.close()
+
+
+def test_retention_exports_and_keeps_recent_months(tmp_path):
+    old = _add_runs(datetime(1991, 1, 20, tzinfo=timezone.utc), 2)
+    recent = _add_runs(datetime(1991, 3, 3, tzinfo=timezone.utc), 1)
+    apply_retention(
+        engine,
+        keep_months=1,
+        mode="export",
+        export_dir=str(tmp_path),
+        today=date(1991, 4, 2),
+    )
+    assert _remaining(old) == 0 and _remaining(recent) == 1
+    with gzip.open(tmp_path / "analysis_runs_1991_01.ndjson.gz") as f:
+        assert [json.loads(line)["id"] for line in f] == old
+
+
+def test_retention_deletes_orphaned_cv_documents():
+    tag = uuid.uuid4().hex
+    db = SessionLocal()
+    try:
+        expired = get_or_create_cv_document(db, f"expired CV {tag}")
+        shared = get_or_create_cv_document(db, f"shared CV {tag}")
+        old = datetime(1992, 2, 10, tzinfo=timezone.utc)
+        kept = datetime(1992, 4, 10, tzinfo=timezone.utc)
+        db.add_all(
+            [
+                AnalysisRun(target_role="R", created_at=old, cv_document=expired),
+                AnalysisRun(target_role="R", created_at=old, cv_document=shared),
+                AnalysisRun(target_role="R", created_at=kept, cv_document=shared),
+            ]
+        )
+        db.commit()
+        expired_id, shared_id = expired.id, shared.id
+    finally:
+        db.close()
+
+    summary = apply_retention(
+        engine, keep_months=1, mode="archive", today=date(1992, 5, 2)
+    )
+    assert sum(m["cv_documents"] for m in summary) >= 1
+
+    db = SessionLocal()
+    try:
+        assert db.get(CVDocument, expired_id) is None
+        assert db.get(CVDocument, shared_id) is not None  # a kept run uses it
+    finally:
+        db.close()
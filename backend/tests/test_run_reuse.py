@@ -0,0 +1,85 @@
+import uuid
+
+from app.core.config import settings
+from app.db.migrations import upgrade_schema
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal, engine
+from app.services import run_reuse
+from app.services.run_reuse import (
+    MinHashLSH,
+    adapt_roadmap,
+    find_similar_run,
+    jaccard,
+    run_tokens,
+    sync_reuse_index,
+)
+
+upgrade_schema(engine)
+
+ROLE = "Data Scientist"
+SKILLS = {"validated_skills": [f"skill{i}" for i in range(30)]}
+GAP = {"missing_core": ["sql", "statistics"]}
+
+
+def test_near_duplicate_run_is_found():
+    index = MinHashLSH(num_perm=64, bands=16)
+    index.add(1, ROLE, run_tokens(ROLE, SKILLS, GAP))
+    index.add(2, ROLE, run_tokens(ROLE, {"validated_skills": ["java"]}, GAP))
+
+    similar = {"validated_skills": SKILLS["validated_skills"][:-1]}
+    tokens = run_tokens(ROLE, similar, GAP)
+    run_id, score = index.query(ROLE, tokens, threshold=0.85)
+    assert run_id == 1
+    assert score == jaccard(tokens, run_tokens(ROLE, SKILLS, GAP))
+
+
+def test_other_roles_and_dissimilar_runs_are_not_reused():
+    index = MinHashLSH(num_perm=64, bands=16)
+    index.add(1, ROLE, run_tokens(ROLE, SKILLS, GAP))
+    assert (
+        index.query("ML Engineer", run_tokens("ML Engineer", SKILLS, GAP), 0.5) is None
+    )
+    other = {"validated_skills": [f"other{i}" for i in range(30)]}
+    assert index.query(ROLE, run_tokens(ROLE, other, GAP), 0.5) is None
+
+
+def test_adapted_roadmap_lists_new_core_gaps():
+    roadmap = adapt_roadmap("# Roadmap", {"missing_core": ["SQL", "Docker"]}, GAP)
+    assert roadmap.endswith("- Docker\n")
+    assert "- SQL" not in roadmap
+    assert adapt_roadmap("# Roadmap", GAP, GAP) == "# Roadmap"
+
+
+def _store_run(role: str, roadmap_md="# Roadmap") -> int:
+    db = SessionLocal()
+    try:
+        run = AnalysisRun(
+            target_role=role,
+            skills_json=SKILLS,
+            gap_report_json=GAP,
+            projects_json=[],
+            roadmap_md=roadmap_md,
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def test_lookup_catches_up_on_runs_persisted_after_startup(monkeypatch):
+    monkeypatch.setattr(settings, "RUN_REUSE_ENABLED", True)
+    monkeypatch.setattr(run_reuse, "_index", MinHashLSH(num_perm=64, bands=16))
+    role = f"Reuse Test {uuid.uuid4()}"
+    db = SessionLocal()
+    try:
+        sync_reuse_index(db)  # the pre-forking master, before any run of this role
+        assert find_similar_run(db, role, SKILLS, GAP) is None
+
+        # persisted by another worker; runs without a roadmap are never reused
+        _store_run(role, roadmap_md=None)
+        assert find_similar_run(db, role, SKILLS, GAP) is None
+        run_id = _store_run(role)
+        assert find_similar_run(db, role, SKILLS, GAP) == (run_id, 1.0)
+    finally:
+        db.close()
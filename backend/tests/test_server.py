@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+from app.server import private_memory_mb, worker_count
+
+
+def test_worker_count_defaults_to_cpu_count():
+    assert worker_count(3) == 3
+    assert worker_count(0) == (os.cpu_count() or 1)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_private_memory_is_reported():
+    used = private_memory_mb()
+    assert used is None or used > 0
+    assert private_memory_mb(pid=2**22 + 7) is None
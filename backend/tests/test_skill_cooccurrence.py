@@ -0,0 +1,153 @@
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.db.migrations import upgrade_schema
+from app.db.models import AnalysisRun
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.services import skill_cooccurrence
+from app.services.roadmap_service import _fallback_roadmap
+from app.services.skill_cooccurrence import CooccurrenceModel, sync_cooccurrence
+
+upgrade_schema(engine)
+
+client = TestClient(app)
+
+RUNS = [
+    ("Data Scientist", ["Python", "SQL", "pandas", "scikit-learn"]),
+    ("Data Scientist", ["Python", "pandas", "scikit-learn"]),
+    ("Data Scientist", ["Python", "SQL", "pandas"]),
+    ("Data Scientist", ["SQL", "Tableau"]),
+    ("Backend Developer", ["Python", "Docker", "Kubernetes"]),
+    ("Backend Developer", ["Python", "Docker", "Kubernetes", "SQL"]),
+    ("Backend Developer", ["Docker", "Kubernetes", "Go"]),
+]
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fresh = CooccurrenceModel()
+    monkeypatch.setattr(skill_cooccurrence, "_model", fresh)
+    monkeypatch.setattr(settings, "SKILL_COOCCURRENCE_MIN_RUNS", 2)
+    for run_id, (role, skills) in enumerate(RUNS, start=1):
+        fresh.add(run_id, role, skills)
+    return fresh
+
+
+def test_suggestions_follow_role_and_known_skills(model):
+    assert model.add(1, "Data Scientist", ["Rust"]) is False
+
+    ds = model.suggest("data scientist", ["python"], limit=3)
+    # SQL and pandas tie (3 of 4 role runs, 3 of 5 Python runs): first seen wins
+    assert [s["skill"] for s in ds] == ["SQL", "pandas", "scikit-learn"]
+    assert ds[0]["role_share"] == 0.75 and ds[0]["score"] == ds[1]["score"]
+    assert ds[0]["because"] == "Python"
+
+    backend = model.suggest("Backend Developer", ["Docker"], limit=2)
+    assert [s["skill"] for s in backend] == ["Kubernetes", "Python"]
+
+    # Tableau and Go are below SKILL_COOCCURRENCE_MIN_RUNS
+    names = {s["skill"] for s in model.suggest(None, ["SQL"], limit=20)}
+    assert "Tableau" not in names and "SQL" not in names
+
+    excluded = model.suggest("Data Scientist", ["Python"], exclude=["Pandas"])
+    assert "pandas" not in {s["skill"] for s in excluded}
+
+    assert model.suggest("Unknown role", [], limit=1)[0]["skill"] == "Python"
+
+
+def test_pending_counts_fold_into_sparse_matrix(model, monkeypatch):
+    before = model.suggest("Data Scientist", ["Python"], limit=5)
+    assert model.snapshot()["pending"] > 0  # read directly, not folded by a query
+    model.fold()
+    assert model.snapshot()["pending"] == 0
+    assert model.suggest("Data Scientist", ["Python"], limit=5) == before
+    model.add(99, "Go Developer", ["Go", "gRPC"])  # past the folded matrix's shape
+    assert model.suggest("Go Developer", ["gRPC"], limit=1)[0]["skill"] == "Go"
+
+    monkeypatch.setattr(skill_cooccurrence, "_FOLD_ENTRIES", 1)
+    model.add(100, "Data Scientist", ["Python", "pandas"])  # folded on add
+    model.add(101, "Data Scientist", ["Python", "pandas"])
+    snap = model.snapshot()
+    assert snap["pending"] == 0 and snap["runs"] == len(RUNS) + 3
+    after = model.suggest("Data Scientist", ["Python"], limit=5)
+    assert [before[0]["skill"], after[0]["skill"]] == ["SQL", "pandas"]
+
+
+def test_ties_at_the_cutoff_keep_the_skills_seen_first(monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_COOCCURRENCE_MIN_RUNS", 1)
+    fresh = CooccurrenceModel()
+    tied = [f"skill-{i}" for i in range(200)]
+    fresh.add(1, "Generalist", ["Python"] + tied)
+    picked = fresh.suggest("Generalist", ["Python"], limit=5)
+    assert [s["skill"] for s in picked] == tied[:5]
+
+
+def test_fallback_roadmap_lists_next_skills(model):
+    skills = {"validated_skills": ["Python"]}
+    gap = {"missing_core": ["SQL"], "missing_nice_to_have": []}
+    roadmap = _fallback_roadmap(skills, gap, "Data Scientist")
+    assert "Skills that often come next for profiles like yours:" in roadmap
+    assert "- pandas (often alongside Python)" in roadmap
+    assert "- SQL (often" not in roadmap  # already listed as a core gap
+
+
+def _store_run(role: str, skills, run_id=None) -> int:
+    db = SessionLocal()
+    try:
+        run = AnalysisRun(
+            id=run_id,
+            target_role=role,
+            skills_json={"validated_skills": skills},
+            gap_report_json={},
+            projects_json=[],
+            roadmap_md="# Roadmap",
+        )
+        db.add(run)
+        db.commit()
+        return run.id
+    finally:
+        db.close()
+
+
+def test_next_skills_endpoint_syncs_stored_runs(model, monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_COOCCURRENCE_SYNC_S", 0.0)
+    role = f"Cooccurrence Test {uuid.uuid4()}"
+    for _ in range(3):
+        _store_run(role, ["Python", "Airflow", "dbt"])
+
+    r = client.get(
+        "/mentor/next-skills",
+        params={"target_role": role, "skills": ["Python", "dbt"], "limit": 3},
+    )
+    assert r.status_code == 200
+    body = r.json()
+    assert body["runs"] >= len(RUNS) + 3
+    top = body["suggestions"][0]
+    assert top["skill"] == "Airflow" and top["role_share"] == 1.0
+    assert top["because"] in ("Python", "dbt")
+
+    assert client.get("/mentor/next-skills", params={"limit": 0}).status_code == 422
+
+
+def test_sync_counts_runs_committed_out_of_id_order(monkeypatch):
+    model = CooccurrenceModel()
+    monkeypatch.setattr(skill_cooccurrence, "_model", model)
+    role = f"Cooccurrence Test {uuid.uuid4()}"
+    first = _store_run(role, ["Python"])
+    _store_run(role, ["SQL"], run_id=first + 2)
+    db = SessionLocal()
+    try:
+        sync_cooccurrence(db, force=True)
+        runs = model.runs
+        assert model.synced.synced_id == first + 2
+
+        _store_run(role, ["Docker"], run_id=first + 1)
+        assert sync_cooccurrence(db, force=True) == 1
+        assert sync_cooccurrence(db, force=True) == 0
+    finally:
+        db.close()
+    assert model.runs == runs + 1
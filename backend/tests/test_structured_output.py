@@ -0,0 +1,97 @@
+import json
+import time
+
+import pytest
+
+from app.core import llm_resilience
+from app.core.llm_resilience import invoke_llm
+from app.schemas.analysis import ProjectRecommendation
+from app.services import project_service, structured_output
+from app.services.structured_output import (
+    StructuredOutputError,
+    scan_json,
+    validate_items,
+)
+
+ITEMS = [{"title": "A", "skills": ["SQL"]}, {"title": "B [draft]", "skills": []}]
+
+
+def test_clean_and_fenced_output():
+    assert scan_json(json.dumps(ITEMS), "array") == (ITEMS, "direct")
+    fenced = "```json\n" + json.dumps(ITEMS) + "\n```"
+    assert scan_json(fenced, "array") == (ITEMS, "scanned")
+
+
+def test_prose_stray_brackets_and_quotes_are_skipped():
+    text = (
+        'Sure! Here are "your" projects [see below]: '
+        + json.dumps(ITEMS)
+        + " Let me know if you'd like {more}."
+    )
+    assert scan_json(text, "array") == (ITEMS, "scanned")
+    obj = {"roadmap_md": "# R {x}", "projects": ITEMS}
+    text = "Plan: {not json} " + json.dumps(obj) + " [trailing]"
+    assert scan_json(text, "object") == (obj, "scanned")
+
+
+def test_wrapped_array_is_found_inside_object():
+    assert scan_json(json.dumps({"projects": ITEMS}), "array")[0] == ITEMS
+
+
+def test_truncated_array_keeps_complete_items():
+    text = json.dumps(ITEMS + [{"title": "C"}])[:-12]
+    assert scan_json(text, "array") == (ITEMS, "truncated")
+    with pytest.raises(StructuredOutputError):
+        scan_json('{"roadmap_md": "cut', "object")
+    with pytest.raises(StructuredOutputError):
+        scan_json("no json here", "array")
+
+
+def test_scanner_is_linear_on_adversarial_output():
+    # the old greedy (\{.*\}|\[.*\]) regex backtracks quadratically on these
+    for text in ("[" * 20000 + "x", '{"a": "' + "\\" * 40001, "[{" * 10000):
+        started = time.perf_counter()
+        with pytest.raises(StructuredOutputError):
+            scan_json(text, "array")
+        assert time.perf_counter() - started < 0.5
+
+
+def test_items_are_validated_individually():
+    raw = [ITEMS[0], "text", {"title": "W", "estimated_duration_weeks": "a few"}]
+    valid, dropped = validate_items(raw, ProjectRecommendation)
+    assert [p.title for p in valid] == ["A"]
+    assert dropped == 2
+
+
+def test_projects_fall_back_and_count_it(monkeypatch):
+    monkeypatch.setattr(
+        structured_output, "invoke_llm", lambda prompt, **kw: "Sorry, I can't."
+    )
+    before = structured_output.output_stats.snapshot().get("projects", {})
+    projects = project_service.recommend_projects(
+        {"validated_skills": ["Python"]}, {"missing_core": ["sql"]}, "Data Scientist"
+    )
+    after = structured_output.output_stats.snapshot()["projects"]
+    assert projects == project_service._fallback_projects(
+        {"validated_skills": ["Python"]}, {"missing_core": ["sql"]}, "Data Scientist"
+    )
+    assert after["fallbacks"] == before.get("fallbacks", 0) + 1
+    assert after["parse_failures"] == before.get("parse_failures", 0) + 1
+    assert 0 < after["fallback_rate"] <= 1
+
+
+def test_json_mode_options_are_passed_to_the_provider(monkeypatch):
+    seen = []
+
+    class _LLM:
+        def invoke(self, prompt, **options):
+            seen.append(options)
+            return json.dumps({"roadmap_md": "# R", "projects": ITEMS})
+
+    monkeypatch.setattr(llm_resilience.settings, "LLM_PROVIDER", "openai")
+    invoke_llm("p", get_client=_LLM, json_shape="object")
+    invoke_llm("p", get_client=_LLM, json_shape="array")
+    assert seen == [
+        {"response_format": {"type": "json_object"}},
+        {},  # OpenAI JSON mode cannot return arrays
+    ]
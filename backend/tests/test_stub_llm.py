@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from app.core.stub_llm import StubChatModel, StubLLMError
+
+
+def test_stub_returns_parseable_projects_json():
+    llm = StubChatModel(latency_ms=0, latency_dist="fixed", output_tokens=80)
+    resp = llm.invoke("Return only a valid JSON array, nothing else.")
+    items = json.loads(resp.content)
+    assert isinstance(items, list) and items[0]["title"]
+
+
+def test_stub_error_rate_raises_with_status():
+    llm = StubChatModel(latency_ms=0, latency_dist="fixed", error_rate=1.0, seed=1)
+    with pytest.raises(StubLLMError) as exc:
+        llm.invoke("roadmap please")
+    assert exc.value.status_code in (429, 500, 503)
+
+
+def test_stub_stream_reassembles_full_text():
+    llm = StubChatModel(latency_ms=0, latency_dist="fixed", output_tokens=60)
+    streamed = "".join(chunk.content for chunk in llm.stream("roadmap please"))
+    assert streamed == llm.invoke("roadmap please").content
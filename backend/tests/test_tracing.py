@@ -0,0 +1,129 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import log_error, log_event, read_spans, slowest_traces, span
+from app.db.migrations import upgrade_schema
+from app.db.session import engine
+from app.main import app
+from benchmarks.harness import use_stub_llm
+
+upgrade_schema(engine)
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(settings, "TRACING_ENABLED", True)
+    monkeypatch.setattr(settings, "TRACE_FILE", str(path))
+    yield path
+    tracing.get_exporter().close()
+
+
+def _spans(path):
+    return list(read_spans(str(path)))
+
+
+def test_spans_nest_and_are_exported_as_json_lines(trace_file):
+    with span("analysis", role="Data Scientist") as root:
+        with span("skills") as child:
+            child.set(skills_found=3)
+
+    skills, analysis = _spans(trace_file)
+    assert analysis["name"] == "analysis" and analysis["parent_id"] is None
+    assert skills["trace_id"] == analysis["trace_id"] == root.trace_id
+    assert skills["parent_id"] == analysis["span_id"]
+    assert skills["attributes"] == {"skills_found": 3}
+    assert analysis["duration_ms"] >= skills["duration_ms"]
+
+
+def test_exception_marks_span_failed(trace_file):
+    with pytest.raises(ValueError):
+        with span("persist"):
+            raise ValueError("db gone")
+
+    [record] = _spans(trace_file)
+    assert record["status"] == "error"
+    assert "db gone" in record["events"][0]["stack"]
+
+
+def test_log_error_carries_trace_id(trace_file, capsys):
+    with span("roadmap") as s:
+        log_error("ROADMAP_LLM_ERROR", RuntimeError("boom"))
+
+    assert f"ROADMAP_LLM_ERROR: trace_id={s.trace_id}" in capsys.readouterr().out
+    [record] = _spans(trace_file)
+    assert record["status"] == "ok"  # handled
+    assert record["events"] == [
+        {"name": "ROADMAP_LLM_ERROR", "error": "RuntimeError('boom')"}
+    ]
+
+
+def test_log_event_carries_trace_id(trace_file, capsys):
+    with span("persist") as s:
+        log_event("ANALYSIS_PERSISTED", run_id=7, target_role="Data Scientist")
+
+    out = capsys.readouterr().out
+    assert f"ANALYSIS_PERSISTED: trace_id={s.trace_id} run_id=7" in out
+    [record] = _spans(trace_file)
+    assert record["events"] == [
+        {"name": "ANALYSIS_PERSISTED", "run_id": 7, "target_role": "Data Scientist"}
+    ]
+
+
+def test_disabled_tracing_exports_nothing(trace_file, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    with span("analysis") as s:
+        s.set(ignored=True)
+        log_error("ANALYZE_ERROR", RuntimeError("x"))
+    assert s.trace_id is None
+    assert not trace_file.exists()
+
+
+def test_analysis_request_is_traced_end_to_end(trace_file, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_GENERATION", False)
+    monkeypatch.setattr(settings, "RUN_REUSE_ENABLED", False)
+    cv = b"Python, SQL, pandas and scikit-learn. Built dashboards with Tableau."
+
+    with use_stub_llm(latency_ms=1):
+        r = TestClient(app).post(
+            "/mentor/analyze",
+            files={"file": ("cv.txt", cv, "text/plain")},
+            data={"target_role": "Data Scientist"},
+        )
+    assert r.status_code == 200
+    trace_id = r.headers["x-trace-id"]
+
+    spans = [s for s in _spans(trace_file) if s["trace_id"] == trace_id]
+    names = [s["name"] for s in spans]
+    for stage in ("parse", "skills", "gap", "roadmap", "projects", "persist"):
+        assert stage in names
+    assert names[-1] == "analysis"
+    assert names.count("llm.attempt") >= 2
+
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["analysis"]["attributes"]["run_id"] == r.json()["run_id"]
+    assert by_name["skills"]["attributes"]["skills_found"] >= 2
+    assert by_name["roadmap"]["attributes"]["fallback"] is False
+    assert by_name["llm.attempt"]["attributes"]["provider"] == "stub"
+
+    [slowest] = slowest_traces(str(trace_file))
+    assert slowest["trace_id"] == trace_id
+    assert {"parse", "llm.attempt", "persist"} <= set(slowest["stages_ms"])
+
+
+def test_exporter_rotates_past_max_size(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    exporter = tracing.JsonLinesExporter(str(path), max_bytes=200)
+    for i in range(10):
+        exporter.export({"i": i, "pad": "x" * 40})
+    exporter.close()
+    rotated = tmp_path / "spans.jsonl.1"
+    assert rotated.exists()
+    assert path.stat().st_size < 200
+    kept = [json.loads(line)["i"] for line in path.read_text().splitlines()]
+    assert kept == list(range(10 - len(kept), 10))
+    assert exporter.exported == 10
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core import warmup
+from app.core.config import settings
+from app.core.warmup import run_warmup, warmup_state
+from app.main import app
+
+
+def test_warmup_runs_all_steps(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    monkeypatch.setattr(settings, "LLM_PROVIDERS", [])
+
+    assert run_warmup() is True
+    state = warmup_state.snapshot()
+    assert state["ready"] is True
+    assert set(state["steps"]) == {"indexes", "db", "pipeline", "report", "llm"}
+    assert all(step["ok"] for step in state["steps"].values())
+
+
+def test_optional_step_failure_does_not_block_readiness(monkeypatch):
+    def broken():
+        raise RuntimeError("no fonts")
+
+    monkeypatch.setattr(warmup, "render_dummy_report", broken)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+
+    assert run_warmup() is True
+    report = warmup_state.snapshot()["steps"]["report"]
+    assert report["ok"] is False
+    assert "no fonts" in report["error"]
+
+
+def test_required_step_is_retried_until_it_succeeds(monkeypatch):
+    calls = []
+
+    def flaky_db():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("db not up yet")
+
+    monkeypatch.setattr(warmup, "fill_db_pool", flaky_db)
+    monkeypatch.setattr(settings, "WARMUP_RETRY_S", 0.01)
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+
+    assert run_warmup() is True
+    db = warmup_state.snapshot()["steps"]["db"]
+    assert db["ok"] is True and db["attempts"] == 3
+    assert "error" not in db
+
+
+def test_stop_abandons_warmup_without_becoming_ready(monkeypatch):
+    def down():
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(warmup, "fill_db_pool", down)
+    monkeypatch.setattr(settings, "WARMUP_RETRY_S", 0.01)
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+
+    assert run_warmup(stop) is False
+    assert warmup_state.snapshot()["ready"] is False
+
+
+def test_ready_endpoint_turns_200_after_warmup(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "stub")
+    release = threading.Event()
+    load = warmup.load_indexes
+
+    def slow_indexes():
+        release.wait(5)
+        load()
+
+    monkeypatch.setattr(warmup, "load_indexes", slow_indexes)
+
+    with TestClient(app) as client:
+        r = client.get("/ready")
+        assert r.status_code == 503
+        assert r.json()["status"] == "warming_up"
+        assert client.get("/health").status_code == 200
+
+        release.set()
+        deadline = time.monotonic() + 10
+        while client.get("/ready").status_code != 200:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        body = client.get("/ready").json()
+        assert body["status"] == "ready"
+        assert body["steps"]["indexes"]["ok"] is True